@@ -20,12 +20,29 @@ DEFAULT_OUTPUT_FILE = None  # Set to None to use the input filename with .pdf ex
 # Can be absolute (e.g., "D:/images") or relative to JSON file (e.g., "Pictures")
 DEFAULT_IMAGES_PATH = "Pictures"
  
+# Threads reading image sizes before layout starts (0 = read them on demand)
+IMAGE_PREFETCH_WORKERS = 4
+
+# Parse segment HTML with selectolax's Lexbor parser when installed (final_pdf.py).
+# Off by default: Lexbor's HTML5 tree fixes can change text breaks and styling
+USE_LEXBOR_PARSER = False
+
 # Whether to always show file dialog for input regardless of DEFAULT_INPUT_FILE setting
 ALWAYS_SHOW_INPUT_DIALOG = True
 
 # Whether to always show file dialog for output regardless of DEFAULT_OUTPUT_FILE setting
 ALWAYS_SHOW_OUTPUT_DIALOG = False
 
+# Whether to show informational confirmation boxes (quiz setup summary etc.)
+# Errors and the final "Saved" message are always shown
+VERBOSE_DIALOGS = False
+
+# PDF export settings (ignored where the Scribus build lacks the option)
+PDF_COMPRESS = True         # Compress page content streams
+PDF_IMAGE_QUALITY = 1       # Image compression quality: 0 = maximum ... 4 = minimum
+PDF_RESOLUTION = 150        # Export resolution (dpi)
+PDF_DOWNSAMPLE = 150        # Downsample images above this dpi (0 = keep originals)
+
 # ────────────────────────────────────────────────────────────────────────────────
 # ─────────── PAGE LAYOUT SETTINGS ─────────────
 # ────────────────────────────────────────────────────────────────────────────────
@@ -40,6 +57,7 @@ COLUMN_COUNT = 2  # Number of columns
 COLUMN_GAP = 20  # Gap between columns (in points) - increased to prevent overlap
 BALANCE_COLUMNS = True  # Balance text height across columns for equal fill
 AGGRESSIVE_BALANCING = True  # Force aggressive column balancing to minimize wasted space
+BALANCE_INTERVAL = 8  # Re-balance the current page's text frames every N modules
 
 # Calculate column width based on full page width (like in the example image)
 COLUMN_WIDTH = (PAGE_WIDTH - MARGINS[0] - MARGINS[2] - ((COLUMN_COUNT - 1) * COLUMN_GAP)) / COLUMN_COUNT
@@ -10,6 +10,10 @@ to its content so nothing ever overruns the bottom margin.
 import os
 import re
 import json
+import zlib
+import struct
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import scribus
 from bs4 import BeautifulSoup
 
@@ -38,19 +42,125 @@ try:
     SECTION_TO_SECTION_SPACING
 except NameError:
     SECTION_TO_SECTION_SPACING = 8
+try:
+    VERBOSE_DIALOGS
+except NameError:
+    VERBOSE_DIALOGS = False
+try:
+    BALANCE_INTERVAL
+except NameError:
+    BALANCE_INTERVAL = 8
+try:
+    IMAGE_PREFETCH_WORKERS
+except NameError:
+    IMAGE_PREFETCH_WORKERS = 4
+try:
+    PDF_COMPRESS, PDF_IMAGE_QUALITY, PDF_RESOLUTION, PDF_DOWNSAMPLE
+except NameError:
+    PDF_COMPRESS, PDF_IMAGE_QUALITY, PDF_RESOLUTION, PDF_DOWNSAMPLE = True, 1, 150, 150
 
 try:
     from PIL import Image
 except ImportError:
     Image = None
 
+# Optional: orjson parses the content JSON in C; stdlib json otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+# Area/topic walk lives in the scribus-free half so it can also be run
+# ahead of time under PyPy/Nuitka; prepare_plan.py ships next to this script
+from prepare_plan import (PLAN_VERSION, flatten_areas as _flatten_areas,
+                          validate as _validate, template_images as _template_images)
+
+# Optional: imagesize reads only the first bytes of PNG/JPEG/GIF headers
+try:
+    import imagesize
+except ImportError:
+    imagesize = None
+
+# Optional: numba compiles the scalar frame-height math; plain Python otherwise
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 # Add image size cache and helper function
 IMAGE_SIZE_CACHE = {}
+# Size reported for missing or unreadable files; callers that must tell a
+# real size from a miss compare with `is`
+UNKNOWN_IMAGE_SIZE = (300, 200)
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def _header_image_size(img_path):
+    """
+    (width, height) read straight from a PNG IHDR or JPEG SOFn header, or
+    None for other formats; used when imagesize is not installed.
+    """
+    with open(img_path, "rb") as f:
+        head = f.read(24)
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:2] != b"\xff\xd8":
+            return None
+        # Walk the JPEG segments until a start-of-frame marker
+        f.seek(2)
+        while True:
+            byte = f.read(1)
+            if not byte:
+                return None
+            if byte != b"\xff":
+                continue
+            marker = f.read(1)
+            while marker == b"\xff":  # fill bytes
+                marker = f.read(1)
+            if not marker:
+                return None
+            code = marker[0]
+            if code == 0x01 or 0xD0 <= code <= 0xD9:
+                continue  # standalone markers carry no length
+            seg = f.read(2)
+            if len(seg) < 2:
+                return None
+            length = struct.unpack(">H", seg)[0]
+            if code in _JPEG_SOF_MARKERS:
+                frame = f.read(5)
+                if len(frame) < 5:
+                    return None
+                height, width = struct.unpack(">HH", frame[1:5])
+                return width, height
+            f.seek(length - 2, 1)
 
 def get_image_size(img_path):
     """Return (width, height) of image, using cache to avoid repeated disk I/O."""
     if img_path in IMAGE_SIZE_CACHE:
         return IMAGE_SIZE_CACHE[img_path]
+    if imagesize:
+        try:
+            width, height = imagesize.get(img_path)
+            if width > 0 and height > 0:
+                size = (width, height)
+                IMAGE_SIZE_CACHE[img_path] = size
+                return size
+        except:
+            pass
+    else:
+        try:
+            size = _header_image_size(img_path)
+            if size and size[0] > 0 and size[1] > 0:
+                IMAGE_SIZE_CACHE[img_path] = size
+                return size
+        except:
+            pass
     if Image:
         try:
             with Image.open(img_path) as im:
@@ -60,9 +170,19 @@ def get_image_size(img_path):
         except:
             pass
     # Fallback if PIL is not available or image can't be opened
-    size = (300, 200)
-    IMAGE_SIZE_CACHE[img_path] = size
-    return size
+    IMAGE_SIZE_CACHE[img_path] = UNKNOWN_IMAGE_SIZE
+    return UNKNOWN_IMAGE_SIZE
+
+def prefetch_image_sizes(img_paths, max_workers=4):
+    """
+    Fill IMAGE_SIZE_CACHE on worker threads before layout starts. Only image
+    headers are read here; every Scribus call stays on the main thread.
+    """
+    pending = [p for p in set(img_paths) if p not in IMAGE_SIZE_CACHE]
+    if max_workers <= 0 or len(pending) < 2:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as ex:
+        list(ex.map(get_image_size, pending))
 
 # Define common Myriad font variants to use across all headers and banners
 MYRIAD_VARIANTS = ["Myriad Pro", "MyriadPro", "Myriad Pro Condensed", "MyriadPro-Cond", "Myriad"]
@@ -111,6 +231,68 @@ except:
     # If we can't check available fonts, use a safe default
     QUIZ_ACTUAL_FONT = FONT_CANDIDATES[0]  # Use first available font as fallback
 
+# Resolve once which font quiz frames can actually be set to, so the per-frame
+# code doesn't need nested try/except fallbacks for every question
+try:
+    _quiz_font_names = scribus.getFontNames()
+    if QUIZ_ACTUAL_FONT in _quiz_font_names:
+        QUIZ_FRAME_FONT = QUIZ_ACTUAL_FONT
+    elif DEFAULT_FONT in _quiz_font_names:
+        QUIZ_FRAME_FONT = DEFAULT_FONT
+    else:
+        QUIZ_FRAME_FONT = _quiz_font_names[0] if _quiz_font_names else None
+except:
+    QUIZ_FRAME_FONT = None
+
+# Resolve the header/banner font once instead of probing MYRIAD_VARIANTS with
+# try/except on every frame. Falls back through DEFAULT_FONT, FONT_CANDIDATES
+# and the generic Arial/Times/Courier chain. None when none of them is
+# installed; the frame then keeps the document default font.
+try:
+    _header_font_names = set(scribus.getFontNames())
+    _RESOLVED_MYRIAD = next(
+        (f for f in MYRIAD_VARIANTS + [DEFAULT_FONT] + list(FONT_CANDIDATES) + ["Arial", "Times", "Courier"]
+         if f in _header_font_names),
+        None
+    )
+except:
+    _RESOLVED_MYRIAD = DEFAULT_FONT
+
+def _set_header_font(frame):
+    """Apply _RESOLVED_MYRIAD to frame; a missing font leaves the frame as is."""
+    if _RESOLVED_MYRIAD:
+        try:
+            scribus.setFont(_RESOLVED_MYRIAD, frame)
+        except:
+            pass
+
+# Scripter capabilities differ between Scribus versions; probe them once so hot
+# paths can branch on a flag instead of raising and catching AttributeError
+_HAS_SET_BASELINE = hasattr(scribus, 'setBaseline')
+_HAS_GET_TEXT_DISTANCES = hasattr(scribus, 'getTextDistances')
+_HAS_LAYOUT_TEXT = hasattr(scribus, 'layoutText')
+_HAS_GET_TEXT_WIDTH = hasattr(scribus, 'getTextWidth')
+
+# What a scripter call raises for bad input or a missing object (its
+# subclasses cover the scripter failures); anything else in the styling path
+# is a bug and should not be swallowed
+_SCRIBUS_ERRORS = tuple(
+    e for e in (getattr(scribus, 'ScribusException', None),) if e
+) + (ValueError,)
+
+# Style keys handle_text_styles treats as text; other value types are dropped
+# when the style segments are built
+_STYLE_TEXT_KEYS = frozenset(("font", "font-family", "font-weight", "font-style",
+                              "color", "font_size", "vertical_align"))
+
+def _checked_style(style):
+    """Return style without text-valued keys whose value is not a str."""
+    for key, value in style.items():
+        if key in _STYLE_TEXT_KEYS and not isinstance(value, str):
+            return {k: v for k, v in style.items()
+                    if k not in _STYLE_TEXT_KEYS or isinstance(v, str)}
+    return style
+
 # ────────────────────────────────────────────────────────────────────────────────
 # ─────────── RUNTIME STATE VARIABLES ────────────
 # ────────────────────────────────────────────────────────────────────────────────
@@ -119,6 +301,7 @@ global_template_count = 0
 limit_reached         = False
 CURRENT_COLOR         = BACKGROUND_COLORS[0]
 current_topic_text    = None    # Currently active topic text
+current_topic_display = None    # Spaced, upper-cased banner text for the active topic
 current_topic_color   = None    # Color for the current topic banner
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -862,6 +1045,48 @@ def enforce_margin_boundary():
     if y_offset > safe_boundary:
         y_offset = safe_boundary
 
+# Nesting depth of suspend_redraw() calls; repainting resumes at depth 0
+_redraw_suspend_depth = 0
+
+def suspend_redraw():
+    """Stop Scribus repainting the canvas while a batch of objects is created."""
+    global _redraw_suspend_depth
+    _redraw_suspend_depth += 1
+    if _redraw_suspend_depth == 1:
+        try:
+            scribus.setRedraw(False)
+        except:
+            pass
+
+def resume_redraw():
+    """Re-enable repainting once the outermost batch has finished."""
+    global _redraw_suspend_depth
+    _redraw_suspend_depth = max(0, _redraw_suspend_depth - 1)
+    if _redraw_suspend_depth == 0:
+        try:
+            scribus.setRedraw(True)
+            scribus.docChanged(True)
+        except:
+            pass
+
+# Document color table, re-read from Scribus only after a color was defined
+_COLOR_NAMES_CACHE = None
+_COLOR_NAMES_DIRTY = True
+
+def define_color(name, r, g, b):
+    """scribus.defineColor that also invalidates the cached color table."""
+    global _COLOR_NAMES_DIRTY
+    _COLOR_NAMES_DIRTY = True
+    scribus.defineColor(name, r, g, b)
+
+def document_color_names():
+    """Set of color names in the current document, cached until it changes."""
+    global _COLOR_NAMES_CACHE, _COLOR_NAMES_DIRTY
+    if _COLOR_NAMES_DIRTY or _COLOR_NAMES_CACHE is None:
+        _COLOR_NAMES_CACHE = set(scribus.getColorNames())
+        _COLOR_NAMES_DIRTY = False
+    return _COLOR_NAMES_CACHE
+
 def simple_boundary_check(element_height):
     """
     Simple boundary check - create new page if element won't fit.
@@ -914,6 +1139,21 @@ def simple_constrain_element(element_obj):
     except:
         return False
 
+# Elements whose bottom-margin clamp is deferred to one pass per template
+_pending_constraints = []
+
+def defer_constrain_element(element_obj):
+    """Queue element_obj for simple_constrain_element at the next flush."""
+    _pending_constraints.append(element_obj)
+
+def flush_pending_constraints():
+    """Clamp every queued element in one pass (must run before the page changes)."""
+    if not _pending_constraints:
+        return
+    for element_obj in _pending_constraints:
+        simple_constrain_element(element_obj)
+    del _pending_constraints[:]
+
 def can_place_element_safely(element_height, min_safe_margin=22):
     """Check if an element can be placed without exceeding bottom margin with page number buffer."""
     global y_offset
@@ -961,6 +1201,14 @@ def can_fit_content(content_height, min_required=MIN_SPACE_THRESHOLD):
         
     return False
 
+@njit("float64(int64, float64, float64, float64, float64)", cache=True)
+def _estimate_frame_height(num_lines, line_spacing, top, bottom, max_allowed):
+    """Exact frame height for num_lines of text, capped at max_allowed (if > 0)."""
+    height = num_lines * line_spacing + top + bottom
+    if max_allowed > 0.0 and height > max_allowed:
+        height = max_allowed
+    return height
+
 def measure_text_height(text, width, in_template=False, font_size=8):
     """
     More accurate text height measurement using actual Scribus measurement.
@@ -1066,14 +1314,14 @@ def new_page():
     """Create a new page in the document and reset the y position."""
     global y_offset, column_mgr
     global quiz_heading_placed_on_page
+    # Positions are page-relative, so clamp queued elements before switching
+    flush_pending_constraints()
     scribus.newPage(-1)
     y_offset = MARGINS[1]
 
     # Reset column manager for new page
     column_mgr.reset_for_new_page()
 
-    # Force refresh to show live page creation updates
-    scribus.redrawAll()
     # Reset quiz header flag for new page - each page gets its own quiz header
     quiz_heading_placed_on_page = False
     # Add vertical topic banner to the new page if we have an active topic
@@ -1148,17 +1396,15 @@ def place_roadsigns_grid(images, base_path, start_y, max_height=None, frame_x=No
     for img in images:
         # Check if this might be an attention sign (typically larger/different aspect ratio)
         if img and Image:
-            try:
-                img_path = os.path.join(base_path, img)
-                with Image.open(img_path) as im:
-                    w, h = im.size
-                    aspect_ratio = w / h if h > 0 else 1
-                    # Attention signs are often square or have specific aspect ratios
-                    # and may be larger than typical road signs
-                    if (0.8 <= aspect_ratio <= 1.2) or w > 200 or h > 200:
-                        attention_signs.append(img)
-            except:
-                pass
+            size = get_image_size(os.path.join(base_path, img))
+            if size is UNKNOWN_IMAGE_SIZE:
+                continue  # unreadable files are not classified
+            w, h = size
+            aspect_ratio = w / h if h > 0 else 1
+            # Attention signs are often square or have specific aspect ratios
+            # and may be larger than typical road signs
+            if (0.8 <= aspect_ratio <= 1.2) or w > 200 or h > 200:
+                attention_signs.append(img)
 
     # Available width for images - use frame width if provided, otherwise column width
     if frame_width is not None:
@@ -1187,14 +1433,7 @@ def place_roadsigns_grid(images, base_path, start_y, max_height=None, frame_x=No
         widths = []
         for rel in row_images:
             img_path = os.path.join(base_path, rel)
-            if Image:
-                try:
-                    with Image.open(img_path) as im:
-                        orig_w, orig_h = im.size
-                except:
-                    orig_w, orig_h = (300, 200)
-            else:
-                orig_w, orig_h = (300, 200)
+            orig_w, orig_h = get_image_size(img_path)
             scaled_w = (orig_w / orig_h) * target_height if orig_h else 150
             widths.append(scaled_w)
 
@@ -1234,7 +1473,7 @@ def place_roadsigns_grid(images, base_path, start_y, max_height=None, frame_x=No
             scribus.setScaleImageToFrame(True, True, img_frame)
             scribus.setLineColor("None", img_frame)
             # Simple boundary enforcement for image
-            simple_constrain_element(img_frame)
+            defer_constrain_element(img_frame)
             
             # Enable shaped text wrap for roadsigns
             if scribus.getObjectType(img_frame) == "ImageFrame":
@@ -1486,6 +1725,7 @@ def place_text_block_flow(html_text, font_size=8, bold=False, in_template=False,
         pos = 0
         for txt, sty in normalized_segments:
             if len(txt) > 0:
+                sty = _checked_style(sty)
                 # Ensure text is visible against the current background
                 if in_template and "color" not in sty:
                     # For template text with no specified color, force high contrast
@@ -1540,9 +1780,6 @@ def place_text_block_flow(html_text, font_size=8, bold=False, in_template=False,
 
         # PROVEN OVERFLOW HANDLING from working file
         try:
-            # Force text refresh to ensure all styling is applied
-            scribus.redrawAll()
-
             # Step 1: Ensure no overflow first with minimal expansion
             scribus.layoutText(frame)
 
@@ -1565,8 +1802,10 @@ def place_text_block_flow(html_text, font_size=8, bold=False, in_template=False,
 
                 if num_lines > 0:
                     # Calculate exact height: (lines × spacing) + padding
-                    exact_text_height = num_lines * line_spacing
-                    exact_frame_height = exact_text_height + top + bottom
+                    exact_frame_height = _estimate_frame_height(
+                        int(num_lines), float(line_spacing), float(top), float(bottom),
+                        0.0
+                    )
 
                     # Resize to exact height
                     current_w, current_h = scribus.getSize(frame)
@@ -1646,8 +1885,13 @@ def is_dark_color(color_name):
     return True
 
 # ───────── TEXT + IMAGE COMBINED LAYOUT ─────────
-def place_roadsigns_on_right(roadsign_list, base_path):
-    """Places road signs horizontally on the right side with bounding boxes and text flow."""
+def place_roadsigns_on_right(roadsign_list, base_path, pics_set=None):
+    """Places road signs horizontally on the right side with bounding boxes and text flow.
+
+    pics_set, when given, is the pre-listed contents of base_path and replaces
+    the per-sign stat() for plain file names that are in it. A miss still
+    stat()s, so case-insensitive filesystems find differently-cased names.
+    """
     global y_offset
 
     if not roadsign_list:
@@ -1698,7 +1942,11 @@ def place_roadsigns_on_right(roadsign_list, base_path):
     for roadsign in valid_signs:
         try:
             img_path = os.path.join(base_path, roadsign)
-            if os.path.exists(img_path):
+            if pics_set is not None and os.sep not in roadsign and "/" not in roadsign:
+                sign_exists = roadsign in pics_set or os.path.exists(img_path)
+            else:
+                sign_exists = os.path.exists(img_path)
+            if sign_exists:
                 sign_frame = scribus.createImage(
                     current_sign_x,
                     block_y + box_padding,
@@ -1774,6 +2022,12 @@ def strip_html_tags(text):
         return text
     return re.sub(r'<[^>]+>', '', text)
 
+@functools.lru_cache(maxsize=64)
+def _single_line_capacity(width, font_size, is_header=False):
+    """Largest character count that check_text_overflow treats as a single line."""
+    chars_per_line = width / (font_size * (0.45 if is_header else 0.42))
+    return int(chars_per_line * 0.85)
+
 def place_quiz(arr, in_template=True, group_image=None, base_path=None):
     global y_offset, CURRENT_COLOR
     global quiz_heading_placed_on_page
@@ -1823,9 +2077,9 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
     if not quiz_heading_placed_on_page:
         # Define colors if not exists
         try:
-            scribus.defineColor("Cyan", 0, 160, 224)  # Blue color
-            scribus.defineColor("Yellow", 255, 255, 0)
-            scribus.defineColor("NumBoxBlue", 210, 235, 255)
+            define_color("Cyan", 0, 160, 224)  # Blue color
+            define_color("Yellow", 255, 255, 0)
+            define_color("NumBoxBlue", 210, 235, 255)
         except:
             pass
 
@@ -1885,6 +2139,10 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
     # Add the exact text overflow function from quiz_from_csv.py
     def check_text_overflow(text, width, font_size, default_height, is_header=False):
         """Check if text will overflow and calculate required height if needed"""
+        # Fast path: short text always fits on one line
+        if len(text) <= _single_line_capacity(width, font_size, is_header):
+            return default_height
+
         # More conservative estimation to ensure no overflow
         if is_header:
             # Headers: more conservative estimate
@@ -1893,11 +2151,6 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
             # Regular text: use copy6.py original values
             chars_per_line = width / (font_size * 0.42)  # Copy6.py original value
 
-        # Check if text truly needs multiple lines
-        # Use copy6.py original threshold
-        if len(text) <= chars_per_line * 0.85:  # Copy6.py original 85% threshold
-            return default_height  # Single line - use compact height
-
         # Calculate actual lines needed
         lines_needed = int(len(text) / chars_per_line) + 1
 
@@ -1916,221 +2169,221 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
         # Return calculated height
         return max(default_height, calculated_height)
 
-    # Process each question as a table row (from quiz_from_csv.py)
-    for idx, qa in enumerate(filtered_arr):
-        # Use simple y_offset like dopy.py
-        current_quiz_y = y_offset
+    # Bind the Scribus calls issued for every row to locals once
+    _createRect = scribus.createRect
+    _createText = scribus.createText
+    _setText = scribus.setText
+    _setFillColor = scribus.setFillColor
+    _setLineColor = scribus.setLineColor
+    _setLineWidth = scribus.setLineWidth
+    _setFont = scribus.setFont
+    _setFontSize = scribus.setFontSize
+    _setTextColor = scribus.setTextColor
+    _setTextAlignment = scribus.setTextAlignment
+    _setTextDistances = scribus.setTextDistances
+
+    # Row geometry is the same for every question - compute it once
+    text_start_x = MARGINS[0] + 2
+    text_end_x = MARGINS[0] + quiz_width - 40  # Leave space for V/F boxes (38 + 2 margin)
+    text_width = text_end_x - text_start_x
+    q_frame_x = text_start_x + 2
+    q_frame_width = text_width - 4
+    v_box_x = MARGINS[0] + quiz_width - 38
+    f_box_x = MARGINS[0] + quiz_width - 18
+    row_bottom_limit = PAGE_HEIGHT - MARGINS[3] - 20  # Same boundary as enforce_margin_boundary
+
+    # V/F text colors indexed by int(is_true): the correct answer is highlighted in cyan
+    v_text_colors = ("Black", "Cyan")
+    f_text_colors = ("Cyan", "Black")
+
+    suspend_redraw()
+    try:
+        # Process each question as a table row (from quiz_from_csv.py)
+        for idx, qa in enumerate(filtered_arr):
+            # Use simple y_offset like dopy.py
+            current_quiz_y = y_offset
+
+            question = qa.get('que', '')
+            is_true = qa.get('is_true', False)
+            answer_idx = int(bool(is_true))  # Index into the V/F text color tables
+
+            # Keep it very simple - just remove HTML tags and show plain text
+            # (skip the regex scans entirely when there is nothing to replace)
+            if '<' in question:
+                formatted_question = re.sub(r'<[^>]+>', '', question)
+            else:
+                formatted_question = question
+            cleaned_question_for_calc = formatted_question
 
-        question = qa.get('que', '')
-        is_true = qa.get('is_true', False)
-
-        # Keep it very simple - just remove HTML tags and show plain text
-        formatted_question = re.sub(r'<[^>]+>', '', question)
-        cleaned_question_for_calc = formatted_question
-
-        # Apply superscript conversion for height calculation too
-        display_question_for_calc = re.sub(r'cm(\d)', lambda m: 'cm' + {'0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴', '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹'}[m.group(1)], cleaned_question_for_calc)
-
-        # Calculate row height using corrected text width (matches the fixed positioning)
-        text_width = quiz_width - 42  # Adjusted to match the new text box positioning
-        current_row_height = check_text_overflow(display_question_for_calc, text_width, 8, row_height, is_header=False)
-
-        # Simple boundary check
-        simple_boundary_check(current_row_height)
-
-        # Draw answer row exactly like copy 6 (from quiz_from_csv.py)
-        # Remove number box background - no numbering needed
-        # num_box_bg = scribus.createRect(MARGINS[0] + 2, y_offset, 12, current_row_height - 1)
-        # scribus.setFillColor("NumBoxBlue", num_box_bg)
-        # scribus.setLineColor("Cyan", num_box_bg)
-        # scribus.setLineWidth(0.5, num_box_bg)
-
-        # Remove the number box completely - no numbering needed
-        # num_box_height = current_row_height - 2
-        # text_y_offset = 1
-        # num_box = scribus.createText(MARGINS[0] + 2, y_offset + text_y_offset, 12, num_box_height)
-
-        # Answer text box - ensure it stays within margins
-        text_start_x = MARGINS[0] + 2
-        text_end_x = MARGINS[0] + quiz_width - 40  # Leave space for V/F boxes (38 + 2 margin)
-        text_width = text_end_x - text_start_x
-        text_box_bg = scribus.createRect(text_start_x, current_quiz_y, text_width, current_row_height - 1)
-
-        # Alternate row colors like copy6.py
-        if idx % 2 == 0:
-            scribus.setFillColor("White", text_box_bg)
-        else:
+            # Apply superscript conversion for height calculation too
+            if 'cm' in cleaned_question_for_calc:
+                display_question_for_calc = _RE_CM_DIGIT.sub(lambda m: 'cm' + m.group(1).translate(_SUP_TABLE), cleaned_question_for_calc)
+            else:
+                display_question_for_calc = cleaned_question_for_calc
+
+            # Calculate row height using the same width the text box is placed with
+            current_row_height = check_text_overflow(display_question_for_calc, text_width, 8, row_height, is_header=False)
+
+            # Simple boundary check
+            simple_boundary_check(current_row_height)
+
+            # Draw answer row exactly like copy 6 (from quiz_from_csv.py)
+            # Remove number box background - no numbering needed
+            # num_box_bg = scribus.createRect(MARGINS[0] + 2, y_offset, 12, current_row_height - 1)
+            # scribus.setFillColor("NumBoxBlue", num_box_bg)
+            # scribus.setLineColor("Cyan", num_box_bg)
+            # scribus.setLineWidth(0.5, num_box_bg)
+
+            # Remove the number box completely - no numbering needed
+            # num_box_height = current_row_height - 2
+            # text_y_offset = 1
+            # num_box = scribus.createText(MARGINS[0] + 2, y_offset + text_y_offset, 12, num_box_height)
+
+            # Answer text box - ensure it stays within margins
+            text_box_bg = _createRect(text_start_x, current_quiz_y, text_width, current_row_height - 1)
+
+            # Alternate row colors like copy6.py
+            if idx % 2 == 0:
+                _setFillColor("White", text_box_bg)
+            else:
+                try:
+                    define_color("VeryLightCyan", 245, 252, 255)
+                    _setFillColor("VeryLightCyan", text_box_bg)
+                except:
+                    _setFillColor("LightGray", text_box_bg)
+            _setLineColor("Cyan", text_box_bg)
+            _setLineWidth(0.5, text_box_bg)
+
+            # Question text frame - adjusted positioning to remove numbering space
+            q_frame = _createText(q_frame_x, current_quiz_y + 1, q_frame_width, current_row_height - 2)
+            _setText(formatted_question, q_frame)
+            if QUIZ_FRAME_FONT:
+                _setFont(QUIZ_FRAME_FONT, q_frame)
+            # Set the correct font size to match actual quiz text (matching dopy.py)
             try:
-                scribus.defineColor("VeryLightCyan", 245, 252, 255)
-                scribus.setFillColor("VeryLightCyan", text_box_bg)
+                _setFontSize(9, q_frame)
             except:
-                scribus.setFillColor("LightGray", text_box_bg)
-        scribus.setLineColor("Cyan", text_box_bg)
-        scribus.setLineWidth(0.5, text_box_bg)
+                pass
+            _setTextColor("Black", q_frame)
 
-        # Question text frame - adjusted positioning to remove numbering space
-        q_frame = scribus.createText(text_start_x + 2, current_quiz_y + 1, text_width - 4, current_row_height - 2)
-        scribus.setText(formatted_question, q_frame)
-        try:
-            scribus.setFont(QUIZ_ACTUAL_FONT, q_frame)
-        except:
+            # Enable proper text alignment and centering like dopy.py
             try:
-                scribus.setFont(DEFAULT_FONT, q_frame)
-            except:
-                # If both fail, try first available font
+                _setTextDistances(0, 0, 0, 0, q_frame)  # No padding for perfect centering like V/F boxes
+                # Set line spacing based on row height - increased for better readability
+                if current_row_height > 14:
+                    scribus.setLineSpacing(9, q_frame)  # Increased spacing for multi-line
+                else:
+                    scribus.setLineSpacing(8, q_frame)  # Increased spacing for single line
+
+                # Set horizontal alignment
+                _setTextAlignment(0, q_frame)  # Left align
+
+                # Try to set vertical alignment to middle like dopy.py
                 try:
-                    available_fonts = scribus.getFontNames()
-                    if available_fonts:
-                        scribus.setFont(available_fonts[0], q_frame)
+                    scribus.setTextVerticalAlignment(1, q_frame)  # 1 = middle alignment
                 except:
-                    pass
-        # Set the correct font size to match actual quiz text (matching dopy.py)
-        try:
-            scribus.setFontSize(9, q_frame)
-        except:
-            pass
-        scribus.setTextColor("Black", q_frame)
+                    try:
+                        # Alternative method for vertical centering from dopy.py
+                        scribus.setTextBehaviour(q_frame, 1)  # Try different behavior
+                    except:
+                        pass
 
-        # Enable proper text alignment and centering like dopy.py
-        try:
-            scribus.setTextDistances(0, 0, 0, 0, q_frame)  # No padding for perfect centering like V/F boxes
-            # Set line spacing based on row height - increased for better readability
-            if current_row_height > 14:
-                scribus.setLineSpacing(9, q_frame)  # Increased spacing for multi-line
-            else:
-                scribus.setLineSpacing(8, q_frame)  # Increased spacing for single line
+                # Force text to stay within bounds - comprehensive dopy.py approach
+                try:
+                    scribus.setTextBehaviour(q_frame, 0)  # Force text in frame
+                except:
+                    pass
 
-            # Set horizontal alignment
-            scribus.setTextAlignment(0, q_frame)  # Left align
+                # Additional overflow protection from dopy.py
+                try:
+                    scribus.setTextToFrameOverflow(q_frame, False)  # Disable overflow
+                except:
+                    pass
 
-            # Try to set vertical alignment to middle like dopy.py
-            try:
-                scribus.setTextVerticalAlignment(1, q_frame)  # 1 = middle alignment
-            except:
+                # Enable text wrapping like dopy.py
                 try:
-                    # Alternative method for vertical centering from dopy.py
-                    scribus.setTextBehaviour(q_frame, 1)  # Try different behavior
+                    scribus.setTextFlowMode(q_frame, 0)  # Enable text flow
                 except:
                     pass
+            except:
+                pass
 
-            # Force text to stay within bounds - comprehensive dopy.py approach
+            # Define checkbox colors if they don't exist
             try:
-                scribus.setTextBehaviour(q_frame, 0)  # Force text in frame
+                define_color("CheckBoxColor", 240, 255, 240)  # Light green tint for V
+                define_color("CheckBoxColor2", 255, 240, 240)  # Light red tint for F
             except:
                 pass
 
-            # Additional overflow protection from dopy.py
+            # V checkbox box - adjusted position since no number box
+            v_box_bg = _createRect(v_box_x, current_quiz_y, 18, current_row_height - 1)
             try:
-                scribus.setTextToFrameOverflow(q_frame, False)  # Disable overflow
+                _setFillColor("CheckBoxColor", v_box_bg)
             except:
-                pass
+                _setFillColor("White", v_box_bg)
+            _setLineColor("Cyan", v_box_bg)
+            _setLineWidth(0.5, v_box_bg)
+
+            # V checkbox text - adjusted position
+            checkbox_box_height = current_row_height - 2  # Use almost full row height with 1pt padding
+            checkbox_y_offset = 1  # Minimal top padding
+            v_box = _createText(v_box_x, current_quiz_y + checkbox_y_offset, 18, checkbox_box_height)
+            _setText("V", v_box)
+            if QUIZ_FRAME_FONT:
+                _setFont(QUIZ_FRAME_FONT, v_box)
+            _setFontSize(10, v_box)  # Increased V/F box font size (matching dopy.py)
+            _setTextAlignment(1, v_box)  # Center align horizontally
 
-            # Enable text wrapping like dopy.py
+            # Try to set vertical alignment to middle like dopy.py
             try:
-                scribus.setTextFlowMode(q_frame, 0)  # Enable text flow
+                scribus.setTextVerticalAlignment(1, v_box)  # 1 = middle alignment
             except:
                 pass
-        except:
-            pass
+            # Set proper text distances for centering
+            _setTextDistances(0, 0, 0, 0, v_box)  # No padding for perfect centering
 
-        # Define checkbox colors if they don't exist
-        try:
-            scribus.defineColor("CheckBoxColor", 240, 255, 240)  # Light green tint for V
-            scribus.defineColor("CheckBoxColor2", 255, 240, 240)  # Light red tint for F
-        except:
-            pass
+            # Set V box color based on correctness - cyan if true answer
+            _setTextColor(v_text_colors[answer_idx], v_box)
 
-        # V checkbox box - adjusted position since no number box
-        v_box_bg = scribus.createRect(MARGINS[0] + quiz_width - 38, current_quiz_y, 18, current_row_height - 1)
-        try:
-            scribus.setFillColor("CheckBoxColor", v_box_bg)
-        except:
-            scribus.setFillColor("White", v_box_bg)
-        scribus.setLineColor("Cyan", v_box_bg)
-        scribus.setLineWidth(0.5, v_box_bg)
-
-        # V checkbox text - adjusted position
-        checkbox_box_height = current_row_height - 2  # Use almost full row height with 1pt padding
-        checkbox_y_offset = 1  # Minimal top padding
-        v_box = scribus.createText(MARGINS[0] + quiz_width - 38, current_quiz_y + checkbox_y_offset, 18, checkbox_box_height)
-        scribus.setText("V", v_box)
-        try:
-            scribus.setFont(QUIZ_ACTUAL_FONT, v_box)
-        except:
+            # F checkbox box - adjusted position
+            f_box_bg = _createRect(f_box_x, current_quiz_y, 18, current_row_height - 1)
             try:
-                scribus.setFont(DEFAULT_FONT, v_box)
+                _setFillColor("CheckBoxColor2", f_box_bg)
             except:
-                try:
-                    available_fonts = scribus.getFontNames()
-                    if available_fonts:
-                        scribus.setFont(available_fonts[0], v_box)
-                except:
-                    pass
-        scribus.setFontSize(10, v_box)  # Increased V/F box font size (matching dopy.py)
-        scribus.setTextAlignment(1, v_box)  # Center align horizontally
-
-        # Try to set vertical alignment to middle like dopy.py
-        try:
-            scribus.setTextVerticalAlignment(1, v_box)  # 1 = middle alignment
-        except:
-            pass
-        # Set proper text distances for centering
-        scribus.setTextDistances(0, 0, 0, 0, v_box)  # No padding for perfect centering
-
-        # Set V box color based on correctness - cyan if true answer
-        if is_true:
-            scribus.setTextColor("Cyan", v_box)
-        else:
-            scribus.setTextColor("Black", v_box)
-
-        # F checkbox box - adjusted position
-        f_box_bg = scribus.createRect(MARGINS[0] + quiz_width - 18, current_quiz_y, 18, current_row_height - 1)
-        try:
-            scribus.setFillColor("CheckBoxColor2", f_box_bg)
-        except:
-            scribus.setFillColor("White", f_box_bg)
-        scribus.setLineColor("Cyan", f_box_bg)
-        scribus.setLineWidth(0.5, f_box_bg)
+                _setFillColor("White", f_box_bg)
+            _setLineColor("Cyan", f_box_bg)
+            _setLineWidth(0.5, f_box_bg)
+
+            # F checkbox text - adjusted position
+            f_box = _createText(f_box_x, current_quiz_y + checkbox_y_offset, 18, checkbox_box_height)
+            _setText("F", f_box)
+            if QUIZ_FRAME_FONT:
+                _setFont(QUIZ_FRAME_FONT, f_box)
+            _setFontSize(10, f_box)  # Increased V/F box font size (matching dopy.py)
+            _setTextAlignment(1, f_box)  # Center align horizontally
 
-        # F checkbox text - adjusted position
-        f_box = scribus.createText(MARGINS[0] + quiz_width - 18, current_quiz_y + checkbox_y_offset, 18, checkbox_box_height)
-        scribus.setText("F", f_box)
-        try:
-            scribus.setFont(QUIZ_ACTUAL_FONT, f_box)
-        except:
+            # Try to set vertical alignment to middle like dopy.py
             try:
-                scribus.setFont(DEFAULT_FONT, f_box)
+                scribus.setTextVerticalAlignment(1, f_box)  # 1 = middle alignment
             except:
-                try:
-                    available_fonts = scribus.getFontNames()
-                    if available_fonts:
-                        scribus.setFont(available_fonts[0], f_box)
-                except:
-                    pass
-        scribus.setFontSize(10, f_box)  # Increased V/F box font size (matching dopy.py)
-        scribus.setTextAlignment(1, f_box)  # Center align horizontally
+                pass
+            # Set proper text distances for centering
+            _setTextDistances(0, 0, 0, 0, f_box)  # No padding for perfect centering
 
-        # Try to set vertical alignment to middle like dopy.py
-        try:
-            scribus.setTextVerticalAlignment(1, f_box)  # 1 = middle alignment
-        except:
-            pass
-        # Set proper text distances for centering
-        scribus.setTextDistances(0, 0, 0, 0, f_box)  # No padding for perfect centering
+            # Set F box color based on correctness - cyan if false answer
+            _setTextColor(f_text_colors[answer_idx], f_box)
 
-        # Set F box color based on correctness - cyan if false answer
-        if not is_true:
-            scribus.setTextColor("Cyan", f_box)
-        else:
-            scribus.setTextColor("Black", f_box)
+            # Simple boundary enforcement for quiz elements
+            defer_constrain_element(q_frame)
+            defer_constrain_element(text_box_bg)
 
-        # Simple boundary enforcement for quiz elements
-        simple_constrain_element(q_frame)
-        simple_constrain_element(text_box_bg)
+            # Move to next row - simple approach like dopy.py
+            # (inline clamp; the full enforce_margin_boundary runs once after the loop)
+            y_offset = min(y_offset + current_row_height, row_bottom_limit)
+    finally:
+        resume_redraw()
 
-        # Move to next row - simple approach like dopy.py
-        y_offset += current_row_height
-        enforce_margin_boundary()
+    enforce_margin_boundary()
 
     # No additional spacing after quiz section - questions should be compact
 
@@ -2210,552 +2463,165 @@ def measure_quiz_group_height(group, group_image, base_path):
     total_height = (quiz_bar_height + 1) + card_height + card_top_margin + 1
     return total_height
 
-def process_template(tmpl, base_path):
-    global y_offset, CURRENT_COLOR, global_template_count
-    # Check if we have enough space for at least the template header (with page number buffer)
-    # If not, start a new page
-    safe_boundary = PAGE_HEIGHT - MARGINS[3] - 22  # Page number buffer
-    if y_offset + 10 > safe_boundary:
-        new_page()
+# ────────────────────────────────────────────────────────────────────────────────
+# ─────────── TEMPLATE PROCESSING ────────────
+# ────────────────────────────────────────────────────────────────────────────────
+def place_images_grid(images, base_path, start_y, max_height=None, max_images=None):
+    """
+    Place images in a grid pattern where:
+    - First 3 images are in a row at the top
+    - 4th and 5th images are placed below centered
+    - Pattern repeats for 6th image onwards
+    
+    This only applies to regular images, not roadsigns.
+    All images in a group will have the same height for visual consistency.
+    
+    Args:
+        images: List of image paths
+        base_path: Base path for images
+        start_y: Starting Y coordinate
+        max_height: Maximum height constraint (optional)
+        max_images: Maximum number of images to place (optional, for partial placement)
+    
+    Returns:
+        The final Y position after placing images
+    """
+    global y_offset
+    
+    if not images:
+        return start_y
+    
+    # If max_images is specified, only place that many images
+    if max_images and max_images > 0:
+        images = images[:max_images]
+    
+    # Set default target height
+    target_height = min(150, max_height) if max_height else 150
+
+    # Available width for images - use column width if columns are enabled
+    available_width = column_mgr.get_column_width()
+
+    # Determine optimal images per row based on available width
+    # For narrow columns (< 200pts), use 1-2 images per row
+    # For wider areas, use the original 3-2 pattern
+    if available_width < 200:
+        # Single column layout - use 1-2 images per row
+        images_per_row = 1 if available_width < 120 else 2
+        max_group_size = images_per_row * 3  # 3 rows max per group
     else:
-        # Add spacing between templates only if we're not at the top of a page
-        if y_offset > MARGINS[1]:
-            y_offset += TEMPLATE_TO_TEMPLATE_SPACING
-            enforce_margin_boundary()
+        # Wide layout - use original 3-2 pattern
+        images_per_row = 3
+        max_group_size = 5  # Original: 3 + 2 = 5
 
-        # Set fixed line spacing for consistent measurement (documentation-based approach)
-        try:
-            scribus.setLineSpacing(default_font_size * 1.1, frame)
-        except: pass
+    # Divide images into appropriate groups
+    image_groups = []
+    for i in range(0, len(images), max_group_size):
+        group = images[i:i+max_group_size]
+        image_groups.append(group)
+    
+    current_y = start_y
+    
+    suspend_redraw()
+    try:
+        # Process each group
+        for group in image_groups:
+            # First gather all image aspect ratios and determine one consistent height
+            all_widths = []
+            all_aspect_ratios = []
         
-        # Enable text flow mode for wrapping around images - EXACTLY like final_pdf copy
-        try:
-            scribus.setTextFlowMode(frame, TEXT_FLOW_INTERACTIVE)
-        except:
-            pass
+            # Calculate aspect ratio for all images in the group
+            for rel in group:
+                img_path = os.path.join(base_path, rel)
+                orig_w, orig_h = get_image_size(img_path)
+            
+                aspect_ratio = float(orig_w) / float(orig_h) if orig_h else 1.5
+                all_aspect_ratios.append(aspect_ratio)
+        
+            # Calculate initial widths based on target height
+            for ratio in all_aspect_ratios:
+                width = ratio * target_height
+                all_widths.append(width)
+        
+            # Calculate rows for flexible layout
+            rows = []
+            img_idx = 0
+            while img_idx < len(group):
+                if available_width < 200:
+                    # Narrow column: use dynamic images_per_row
+                    row_images = group[img_idx:img_idx + images_per_row]
+                    row_widths = all_widths[img_idx:img_idx + images_per_row]
+                else:
+                    # Wide layout: first row gets 3, subsequent rows get 2
+                    if len(rows) == 0:
+                        row_images = group[img_idx:img_idx + 3]
+                        row_widths = all_widths[img_idx:img_idx + 3]
+                    else:
+                        row_images = group[img_idx:img_idx + 2]
+                        row_widths = all_widths[img_idx:img_idx + 2]
 
-        scribus.setText(remaining, frame)
+                if row_images:
+                    rows.append((row_images, row_widths))
+                    img_idx += len(row_images)
+                else:
+                    break
 
-        # Initially assume all text will be processed
-        # We'll adjust this later if there's overflow that can't be handled
-        chunk = remaining
-        chunk_len = len(remaining)
+            # Calculate scaling needed for all rows
+            scaling_ratio = 1.0
+            for row_images, row_widths in rows:
+                if row_widths:
+                    row_total_width = sum(row_widths) + (len(row_widths) - 1) * BLOCK_SPACING
+                    if row_total_width > available_width:
+                        row_ratio = available_width / row_total_width
+                        scaling_ratio = min(scaling_ratio, row_ratio)
+
+            # Apply scaling to all images
+            adjusted_height = target_height * scaling_ratio
+            all_widths = [width * scaling_ratio for width in all_widths]
+        
+            # Place all rows using flexible layout
+            img_idx = 0
+            for row_images, row_widths in rows:
+                if not row_images:
+                    continue
 
-        # Apply DEFAULT_FONT first, then try font candidates if it fails
-        try:
-            scribus.setFont(DEFAULT_FONT, frame)
-            scribus.setFontSize(default_font_size, frame)
-        except:
-            # Fall back to font candidates if DEFAULT_FONT fails
-            for f in FONT_CANDIDATES:
-                try:
-                    scribus.setFont(f, frame)
-                    scribus.setFontSize(default_font_size, frame)
-                    break
-                except:
-                    pass
-
-        for start, txt, seg_sty in seg_index:
-            end = start + len(txt)
-            ov_s = max(start, base_offset)
-            ov_e = min(end, base_offset + chunk_len)
-            if ov_e <= ov_s:
-                continue
-            rel_off = ov_s - base_offset
-            rel_len = ov_e - ov_s
-            try:
-                scribus.selectText(rel_off, rel_len, frame)
-                if "font_size" in seg_sty:
-                    size_str = seg_sty["font_size"]
-                    if "%" in size_str:
-                        pct = float(re.sub(r'[^\d.]','', size_str)) / 100.0
-                        sz = int(default_font_size * pct)
-                    else:
-                        # Scale down JSON-specified sizes to maintain hierarchy
-                        # If JSON says 10pt, reduce it proportionally
-                        original_size = float(re.sub(r'[^\d.]','', size_str))
-                        # Apply a scaling factor (0.9 = 90% of original)
-                        sz = int(original_size * 0.9)
-                        # Ensure minimum size
-                        sz = max(sz, 7)
-                    scribus.setFontSize(sz, frame)
-                if "font" in seg_sty:
-                    scribus.setFont(seg_sty["font"], frame)
-                if "color" in seg_sty:
-                    scribus.setTextColor(seg_sty["color"].capitalize(), frame)
-                
-                # Handle vertical alignment for superscript/subscript
-                if "vertical_align" in seg_sty:
-                    try:
-                        v_align = seg_sty["vertical_align"]
-                        # Get current position and size
-                        x, y = scribus.getTextDistances(frame)
-                        curr_size = scribus.getFontSize(frame)
-                        
-                        # Apply superscript/subscript
-                        if "%" in v_align and int(re.sub(r'[^\d.]', '', v_align)) > 0:
-                            # Positive percentage = superscript
-                            offset = int(curr_size * 0.4)
-                            scribus.setTextOffset(frame, x, offset)  # Positive for up in Scribus
-                            # Superscripts are typically smaller
-                            if "font_size" not in seg_sty:
-                                scribus.setFontSize(int(curr_size * 0.7), frame)
-                        elif "sub" in v_align or (("%" in v_align) and int(re.sub(r'[^\d.]', '', v_align)) < 0):
-                            # Negative percentage or "sub" = subscript
-                            offset = int(curr_size * 0.2)
-                            scribus.setTextOffset(frame, x, offset)  # Positive for down
-                            # Subscripts are typically smaller
-                            if "font_size" not in seg_sty:
-                                scribus.setFontSize(int(curr_size * 0.7), frame)
-                    except: 
-                        pass
-                
-                # Apply bold
-                if seg_sty.get("bold"):
-                    try: 
-                        scribus.setFontSize(scribus.getFontSize(frame)+2, frame)
-                    except: 
-                        pass
-            except:
-                pass
+                # Get the actual widths for this row (after scaling)
+                row_scaled_widths = all_widths[img_idx:img_idx + len(row_images)]
+                row_total_width = sum(row_scaled_widths) + (len(row_scaled_widths) - 1) * BLOCK_SPACING
 
-        # Place images with proper text wrapping
-        if not placed_images and image_list:
-            # Calculate appropriate image size for text wrapping
-            img_width = min(frame_w * 0.35, 100)  # Use 35% of column width, max 100pt
-
-            if len(image_list) == 1:
-                # Single image with proper text wrapping
-                img_path = os.path.join(base_path, image_list[0])
-
-                # Get real image dimensions
-                if Image:
-                    try:
-                        with Image.open(img_path) as im:
-                            orig_w, orig_h = im.size
-                    except:
-                        orig_w, orig_h = (300, 200)
+                # Calculate starting position (left-aligned for narrow columns, centered for wide)
+                if available_width < 200:
+                    # Left-aligned for narrow columns
+                    x = column_mgr.get_column_x()
                 else:
-                    orig_w, orig_h = (300, 200)
-
-                # Calculate height maintaining aspect ratio
-                img_height = (orig_h / orig_w) * img_width if orig_w > 0 else img_width
-
-                # Limit image height to reasonable size
-                max_img_height = min(frame_h * 0.6, 80)
-                if img_height > max_img_height:
-                    img_height = max_img_height
-                    img_width = (orig_w / orig_h) * img_height if orig_h > 0 else img_width
-
-                # Position image on the right side with margin
-                margin_right = 8
-                margin_top = 5
-                img_x = frame_x + frame_w - img_width - margin_right
-                img_y = frame_y + margin_top
-
-                # Create and configure image frame
-                img_frame = scribus.createImage(img_x, img_y, img_width, img_height)
-                scribus.loadImage(img_path, img_frame)
-                scribus.setScaleImageToFrame(True, True, img_frame)
-                scribus.setLineColor("None", img_frame)
-
-                # Configure text wrapping around the image
-                try:
-                    # Set the image to allow text flow around it
-                    scribus.setTextFlowMode(img_frame, scribus.TEXTFLOW_USEBOUNDINGBOX)
-                except:
-                    try:
-                        scribus.setTextFlowMode(img_frame, TEXT_FLOW_OBJECTBOUNDINGBOX)
-                    except:
-                        pass
-
-                # Boundary enforcement
-                simple_constrain_element(img_frame)
-
-            else:
-                # Multiple images - create a small grid on the right side
-                images_per_row = 2 if len(image_list) <= 4 else 3
-                img_size = frame_w * 0.15  # Smaller for multiple images
-
-                for i, img_rel in enumerate(image_list[:6]):  # Limit to 6 images
-                    row = i // images_per_row
-                    col = i % images_per_row
-
-                    img_path = os.path.join(base_path, img_rel)
-
-                    img_x = frame_x + frame_w - (images_per_row - col) * (img_size + 2)
-                    img_y = frame_y + 5 + row * (img_size + 2)
-
-                    img_frame = scribus.createImage(img_x, img_y, img_size, img_size)
+                    # Centered for wide areas
+                    x = column_mgr.get_column_x() + (available_width - row_total_width) / 2
+
+                # Place images in this row
+                for i, rel in enumerate(row_images):
+                    img_path = os.path.join(base_path, rel)
+                    w_i = row_scaled_widths[i]
+                    h_i = adjusted_height
+                    img_frame = scribus.createImage(x, current_y, w_i, h_i)
                     scribus.loadImage(img_path, img_frame)
                     scribus.setScaleImageToFrame(True, True, img_frame)
                     scribus.setLineColor("None", img_frame)
 
-                    # Enable text wrapping for each image
+                    # Try to eliminate gaps
                     try:
-                        scribus.setTextFlowMode(img_frame, TEXT_FLOW_OBJECTBOUNDINGBOX)
+                        scribus.setScaleFrameToImage(img_frame)
                     except:
                         pass
 
-                    simple_constrain_element(img_frame)
-
-            placed_images = True
-
-        # Calculate the height of content for this frame
-        used_h = measure_text_height(chunk, frame_w, in_template, default_font_size)
-        
-        # Add one line of space at the bottom to prevent text from being cut off
-        line_height = default_font_size * 1.2  # Approximate line height
-        used_h += line_height
-        
-        # If we have images, text flows around them and may need extra height
-        if placed_images:
-            # Text flowing around images typically needs 20-30% more height
-            text_height_adjustment = used_h * 0.25
-            used_h = used_h + text_height_adjustment
-            
-        # Final overflow check using documentation-based approach
-        try:
-            # Force text refresh to ensure all styling is applied and show live updates
-            scribus.redrawAll()
-
-            # Official Scribus method for precise text fitting based on documentation
-            scribus.layoutText(frame)
-
-            # Calculate boundary limits before expansion
-            frame_x, frame_y = scribus.getPosition(frame)
-            minimal_buffer = 10
-            max_allowed = PAGE_HEIGHT - MARGINS[3] - frame_y - minimal_buffer
-
-            # Expand minimally to ensure all text is visible, but respect boundaries
-            while scribus.textOverflows(frame):
-                current_w, current_h = scribus.getSize(frame)
-                new_height = current_h + 3
-
-                # Stop if we'd exceed the boundary
-                if new_height > max_allowed:
-                    break
-
-                scribus.sizeObject(current_w, new_height, frame)
-                scribus.layoutText(frame)
-
-            # Calculate exact height using official Scribus methods
-            try:
-                # Get actual text metrics
-                num_lines = scribus.getTextLines(frame)
-                line_spacing = scribus.getLineSpacing(frame)
-                left, right, top, bottom = scribus.getTextDistances(frame)
-
-                if num_lines > 0:
-                    # Calculate exact height: (lines × spacing) + padding
-                    exact_text_height = num_lines * line_spacing
-                    exact_frame_height = exact_text_height + top + bottom
-
-                    # For frames with images, add extra space for text flow
-                    if placed_images:
-                        # Add more space for complex template image layouts
-                        exact_frame_height += default_font_size * 2  # Add two lines for better image flow
-
-                    # Calculate maximum allowed height with minimal buffer
-                    frame_x, frame_y = scribus.getPosition(frame)
-                    minimal_buffer = 10
-                    max_allowed = PAGE_HEIGHT - MARGINS[3] - frame_y - minimal_buffer
-
-                    # Resize to exact height, but respect page boundaries
-                    current_w, current_h = scribus.getSize(frame)
-                    safe_height = min(exact_frame_height, max_allowed)
-                    scribus.sizeObject(current_w, safe_height, frame)
-                    scribus.layoutText(frame)
+                    # Strict boundary enforcement for image
+                    defer_constrain_element(img_frame)
+                    x += w_i + BLOCK_SPACING
 
-                    # Verify no overflow after exact sizing (only expand if within boundaries)
-                    if scribus.textOverflows(frame) and safe_height < max_allowed:
-                        # For frames with images, may need more aggressive expansion
-                        if placed_images:
-                            # Add more space for complex image flow
-                            expanded_height = min(exact_frame_height + line_spacing * 2, max_allowed)
-                            scribus.sizeObject(current_w, expanded_height, frame)
-                        else:
-                            # Add minimal space for regular text
-                            expanded_height = min(exact_frame_height + line_spacing * 0.1, max_allowed)
-                            scribus.sizeObject(current_w, expanded_height, frame)
-                        scribus.layoutText(frame)
-
-                        # Final check - if still overflowing, expand more (but stay within boundaries)
-                        if scribus.textOverflows(frame) and expanded_height < max_allowed:
-                            final_height = min(exact_frame_height + line_spacing * 3, max_allowed)
-                            scribus.sizeObject(current_w, final_height, frame)
-                            scribus.layoutText(frame)
-            except:
-                # If official method fails, minimal fallback
-                pass
-        except:
-            # Basic fallback overflow handling if documentation approach fails completely
-            fallback_iterations = 0
-            frame_x, frame_y = scribus.getPosition(frame)
-            minimal_buffer = 10
-            max_allowed = PAGE_HEIGHT - MARGINS[3] - frame_y - minimal_buffer
-
-            while scribus.textOverflows(frame) and fallback_iterations < 10:
-                try:
-                    current_w, current_h = scribus.getSize(frame)
-                    new_height = current_h + default_font_size
-
-                    # Stop expanding if we'd exceed boundaries
-                    if new_height > max_allowed:
-                        break
-
-                    scribus.sizeObject(current_w, new_height, frame)
-                    fallback_iterations += 1
-                except:
-                    break
-
-        # Final check - if text still overflows after all attempts to fit it
-        # This only happens when frame is at maximum allowed size
-        if scribus.textOverflows(frame):
-            # Frame is at maximum size but text still overflows - need to split
-            # Check if we've reached the page boundary
-            frame_x, frame_y = scribus.getPosition(frame)
-            current_w, current_h = scribus.getSize(frame)
-            minimal_buffer = 10
-            max_allowed = PAGE_HEIGHT - MARGINS[3] - frame_y - minimal_buffer
-
-            # Only split if frame is at or near maximum height
-            if current_h >= max_allowed - 5:  # Within 5 points of max
-                # Use find_fit to determine how much text actually fits
-                actual_fit = find_fit(remaining, frame)
-                if actual_fit < len(remaining):
-                    # Split the text - keep what fits, send rest to next page
-                    chunk = remaining[:actual_fit]
-                    chunk_len = actual_fit
-
-                    # Re-apply the text for the truncated portion
-                    scribus.setText(chunk, frame)
-
-                    # Re-apply font settings after text change
-                    try:
-                        scribus.setFont(DEFAULT_FONT, frame)
-                        scribus.setFontSize(default_font_size, frame)
-                    except:
-                        for f in FONT_CANDIDATES:
-                            try:
-                                scribus.setFont(f, frame)
-                                scribus.setFontSize(default_font_size, frame)
-                                break
-                            except:
-                                pass
-
-                    # Re-apply text segments for the truncated text
-                    for start, txt, seg_sty in seg_index:
-                        end = start + len(txt)
-                        ov_s = max(start, base_offset)
-                        ov_e = min(end, base_offset + chunk_len)
-                        if ov_e <= ov_s:
-                            continue
-                        rel_off = ov_s - base_offset
-                        rel_len = ov_e - ov_s
-                        try:
-                            scribus.selectText(rel_off, rel_len, frame)
-                            if "font_size" in seg_sty:
-                                size_str = seg_sty["font_size"]
-                                if "%" in size_str:
-                                    pct = float(re.sub(r'[^\d.]','', size_str)) / 100.0
-                                    sz = int(default_font_size * pct)
-                                else:
-                                    original_size = float(re.sub(r'[^\d.]','', size_str))
-                                    sz = int(original_size * 0.9)
-                                    sz = max(sz, 7)
-                                scribus.setFontSize(sz, frame)
-                        except:
-                            pass
-
-        # Use actual frame height for y_offset calculation
-        try:
-            actual_frame_height = scribus.getSize(frame)[1]
-            new_y = frame_y + actual_frame_height + BLOCK_SPACING
-            column_mgr.set_current_y(new_y)
-            y_offset = new_y  # Keep backward compatibility
-        except:
-            # Fallback to estimated height if getting actual height fails
-            new_y = frame_y + used_h + BLOCK_SPACING
-            column_mgr.set_current_y(new_y)
-            y_offset = new_y
-        enforce_margin_boundary()
-        remaining = remaining[chunk_len:]
-        base_offset += chunk_len
-
-        if remaining:
-            # Store if we placed images on the first page
-            had_images = placed_images
-            # Switch to next column or page for continued content
-            column_mgr.switch_column()
-
-            # Optimize spacing for continued content
-            if not column_mgr.enabled:
-                y_offset = MARGINS[1] + BLOCK_SPACING  # Use standard block spacing at top of new page
-
-
-# ────────────────────────────────────────────────────────────────────────────────
-# ─────────── TEMPLATE PROCESSING ────────────
-# ────────────────────────────────────────────────────────────────────────────────
-def place_images_grid(images, base_path, start_y, max_height=None, max_images=None):
-    """
-    Place images in a grid pattern where:
-    - First 3 images are in a row at the top
-    - 4th and 5th images are placed below centered
-    - Pattern repeats for 6th image onwards
-    
-    This only applies to regular images, not roadsigns.
-    All images in a group will have the same height for visual consistency.
-    
-    Args:
-        images: List of image paths
-        base_path: Base path for images
-        start_y: Starting Y coordinate
-        max_height: Maximum height constraint (optional)
-        max_images: Maximum number of images to place (optional, for partial placement)
-    
-    Returns:
-        The final Y position after placing images
-    """
-    global y_offset
-    
-    if not images:
-        return start_y
-    
-    # If max_images is specified, only place that many images
-    if max_images and max_images > 0:
-        images = images[:max_images]
-    
-    # Set default target height
-    target_height = min(150, max_height) if max_height else 150
-
-    # Available width for images - use column width if columns are enabled
-    available_width = column_mgr.get_column_width()
-
-    # Determine optimal images per row based on available width
-    # For narrow columns (< 200pts), use 1-2 images per row
-    # For wider areas, use the original 3-2 pattern
-    if available_width < 200:
-        # Single column layout - use 1-2 images per row
-        images_per_row = 1 if available_width < 120 else 2
-        max_group_size = images_per_row * 3  # 3 rows max per group
-    else:
-        # Wide layout - use original 3-2 pattern
-        images_per_row = 3
-        max_group_size = 5  # Original: 3 + 2 = 5
-
-    # Divide images into appropriate groups
-    image_groups = []
-    for i in range(0, len(images), max_group_size):
-        group = images[i:i+max_group_size]
-        image_groups.append(group)
-    
-    current_y = start_y
-    
-    # Process each group
-    for group in image_groups:
-        # First gather all image aspect ratios and determine one consistent height
-        all_widths = []
-        all_aspect_ratios = []
-        
-        # Calculate aspect ratio for all images in the group
-        for rel in group:
-            img_path = os.path.join(base_path, rel)
-            if Image:
-                try:
-                    with Image.open(img_path) as im:
-                        orig_w, orig_h = im.size
-                except:
-                    orig_w, orig_h = (300, 200)
-            else:
-                orig_w, orig_h = (300, 200)
-            
-            aspect_ratio = float(orig_w) / float(orig_h) if orig_h else 1.5
-            all_aspect_ratios.append(aspect_ratio)
-        
-        # Calculate initial widths based on target height
-        for ratio in all_aspect_ratios:
-            width = ratio * target_height
-            all_widths.append(width)
-        
-        # Calculate rows for flexible layout
-        rows = []
-        img_idx = 0
-        while img_idx < len(group):
-            if available_width < 200:
-                # Narrow column: use dynamic images_per_row
-                row_images = group[img_idx:img_idx + images_per_row]
-                row_widths = all_widths[img_idx:img_idx + images_per_row]
-            else:
-                # Wide layout: first row gets 3, subsequent rows get 2
-                if len(rows) == 0:
-                    row_images = group[img_idx:img_idx + 3]
-                    row_widths = all_widths[img_idx:img_idx + 3]
-                else:
-                    row_images = group[img_idx:img_idx + 2]
-                    row_widths = all_widths[img_idx:img_idx + 2]
-
-            if row_images:
-                rows.append((row_images, row_widths))
+                # Update position for next row
+                current_y += adjusted_height + BLOCK_SPACING
                 img_idx += len(row_images)
-            else:
-                break
-
-        # Calculate scaling needed for all rows
-        scaling_ratio = 1.0
-        for row_images, row_widths in rows:
-            if row_widths:
-                row_total_width = sum(row_widths) + (len(row_widths) - 1) * BLOCK_SPACING
-                if row_total_width > available_width:
-                    row_ratio = available_width / row_total_width
-                    scaling_ratio = min(scaling_ratio, row_ratio)
-
-        # Apply scaling to all images
-        adjusted_height = target_height * scaling_ratio
-        all_widths = [width * scaling_ratio for width in all_widths]
-        
-        # Place all rows using flexible layout
-        img_idx = 0
-        for row_images, row_widths in rows:
-            if not row_images:
-                continue
-
-            # Get the actual widths for this row (after scaling)
-            row_scaled_widths = all_widths[img_idx:img_idx + len(row_images)]
-            row_total_width = sum(row_scaled_widths) + (len(row_scaled_widths) - 1) * BLOCK_SPACING
-
-            # Calculate starting position (left-aligned for narrow columns, centered for wide)
-            if available_width < 200:
-                # Left-aligned for narrow columns
-                x = column_mgr.get_column_x()
-            else:
-                # Centered for wide areas
-                x = column_mgr.get_column_x() + (available_width - row_total_width) / 2
-
-            # Place images in this row
-            for i, rel in enumerate(row_images):
-                img_path = os.path.join(base_path, rel)
-                w_i = row_scaled_widths[i]
-                h_i = adjusted_height
-                img_frame = scribus.createImage(x, current_y, w_i, h_i)
-                scribus.loadImage(img_path, img_frame)
-                scribus.setScaleImageToFrame(True, True, img_frame)
-                scribus.setLineColor("None", img_frame)
-
-                # Try to eliminate gaps
-                try:
-                    scribus.setScaleFrameToImage(img_frame)
-                except:
-                    pass
-
-                # Strict boundary enforcement for image
-                simple_constrain_element(img_frame)
-                x += w_i + BLOCK_SPACING
+    finally:
+        resume_redraw()
 
-            # Update position for next row
-            current_y += adjusted_height + BLOCK_SPACING
-            img_idx += len(row_images)
-    
     # Return the final y position
     return current_y
 
@@ -2775,7 +2641,36 @@ def group_quiz_by_image(quiz_entries):
     return {None: quiz_entries}
 
 
-def process_template(tmpl, base_path):
+# Multi-image rows: never shrink below _MIN_IMG_H (image quality), keep
+# _IMG_BUFFER free under the row, and break the page below _SPACE_THRESHOLD
+_MIN_IMG_H = 80
+_IMG_BUFFER = 10
+_SPACE_THRESHOLD = _MIN_IMG_H + _IMG_BUFFER
+
+# Image alignments cycled through by template ID for variety
+_TEMPLATE_ALIGNMENTS = ("C", "TC", "BC")
+# (color index, alignment index) per template ID, computed once per ID
+_TEMPLATE_INDEX_CACHE = {}
+
+def _template_indices(tid):
+    """
+    Index into BACKGROUND_COLORS and _TEMPLATE_ALIGNMENTS for a template ID:
+    numeric IDs cycle through both, others get a stable CRC-based color and
+    the centered alignment.
+    """
+    key = str(tid)
+    indices = _TEMPLATE_INDEX_CACHE.get(key)
+    if indices is None:
+        try:
+            number = int(tid)
+            indices = (number % len(BACKGROUND_COLORS), number % len(_TEMPLATE_ALIGNMENTS))
+        except (TypeError, ValueError, OverflowError):
+            indices = (zlib.crc32(key.encode('utf-8')) % len(BACKGROUND_COLORS), 0)
+        _TEMPLATE_INDEX_CACHE[key] = indices
+    return indices
+
+
+def process_template(tmpl, base_path, pics_set=None):
     global y_offset, CURRENT_COLOR, global_template_count
     # Check if we have enough space for at least the template header (with page number buffer)
     # If not, start a new page
@@ -2790,10 +2685,7 @@ def process_template(tmpl, base_path):
     
     # Set color based on template ID (for text styling, but no background)
     tid = tmpl.get("id","0")
-    try:
-        idx = int(tid) % len(BACKGROUND_COLORS)
-    except:
-        idx = hash(tid) % len(BACKGROUND_COLORS)
+    idx, aid = _template_indices(tid)
     CURRENT_COLOR = BACKGROUND_COLORS[idx]
     
     # Get text content
@@ -2815,12 +2707,7 @@ def process_template(tmpl, base_path):
     
     # Determine alignment for images based on template ID for variety
     # Alternate between center, top, and bottom alignments
-    alignments = ["C", "TC", "BC"]
-    try:
-        aid = int(tid) % len(alignments)
-    except:
-        aid = 0
-    template_alignment = alignments[aid]
+    template_alignment = _TEMPLATE_ALIGNMENTS[aid]
     
     # Place text using regular template style
     if cleaned_txt:
@@ -2829,7 +2716,7 @@ def process_template(tmpl, base_path):
 
     # If we have road signs, place them on the right side with bounding boxes
     if rs:
-        place_roadsigns_on_right(rs, base_path)
+        place_roadsigns_on_right(rs, base_path, pics_set)
     
     # Place videos
     for v in tmpl.get("videos", []):
@@ -2843,140 +2730,128 @@ def process_template(tmpl, base_path):
     
     # Check if we have images to place
     if imgs:
-        # Get available space
-        available_space = space_left_on_page()
+        suspend_redraw()
+        try:
+            # Get available space
+            available_space = space_left_on_page()
             
-        # Normal height for images - this will be consistent across pages
-        standard_image_height = 150
+            # Normal height for images - this will be consistent across pages
+            standard_image_height = 150
         
-        # Special case: For single image templates, always use the standard size
-        if len(imgs) == 1:
-            # For single images, be more flexible with available space
-            # Allow fitting if at least 60% of the standard height is available
-            min_height_for_single = standard_image_height * 0.6  # 60% of standard height
+            # Special case: For single image templates, always use the standard size
+            if len(imgs) == 1:
+                # For single images, be more flexible with available space
+                # Allow fitting if at least 60% of the standard height is available
+                min_height_for_single = standard_image_height * 0.6  # 60% of standard height
             
-            if available_space >= min_height_for_single:
-                # Single image - place at left margin with adjusted height to fit available space
-                img_path = os.path.join(base_path, imgs[0])
-                if Image:
-                    try:
-                        with Image.open(img_path) as im:
-                            orig_w, orig_h = im.size
-                    except:
-                        orig_w, orig_h = (300, 200)
-                else:
-                    orig_w, orig_h = (300, 200)
+                if available_space >= min_height_for_single:
+                    # Single image - place at left margin with adjusted height to fit available space
+                    img_path = os.path.join(base_path, imgs[0])
+                    orig_w, orig_h = get_image_size(img_path)
                 
-                # Use either standard height or adjusted to fit available space
-                actual_height = min(standard_image_height, available_space - 5) # Leave minimal margin
+                    # Use either standard height or adjusted to fit available space
+                    actual_height = min(standard_image_height, available_space - 5) # Leave minimal margin
                 
-                # Scale image maintaining aspect ratio with the chosen height
-                scale = float(actual_height) / float(orig_h) if orig_h else 1.0
-                new_w = orig_w * scale
+                    # Scale image maintaining aspect ratio with the chosen height
+                    scale = float(actual_height) / float(orig_h) if orig_h else 1.0
+                    new_w = orig_w * scale
                 
-                # Position using column manager
-                x = column_mgr.get_column_x()
-                current_y = column_mgr.get_current_y()
+                    # Position using column manager
+                    x = column_mgr.get_column_x()
+                    current_y = column_mgr.get_current_y()
 
-                img_frame = scribus.createImage(x, current_y, new_w, actual_height)
-                scribus.loadImage(img_path, img_frame)
-                scribus.setScaleImageToFrame(True, True, img_frame)
-                scribus.setLineColor("None", img_frame)
+                    img_frame = scribus.createImage(x, current_y, new_w, actual_height)
+                    scribus.loadImage(img_path, img_frame)
+                    scribus.setScaleImageToFrame(True, True, img_frame)
+                    scribus.setLineColor("None", img_frame)
 
-                # Try to eliminate gaps - test without custom function
-                try:
-                    scribus.setScaleFrameToImage(img_frame)
-                except:
-                    pass
+                    # Try to eliminate gaps - test without custom function
+                    try:
+                        scribus.setScaleFrameToImage(img_frame)
+                    except:
+                        pass
 
-                # Use actual frame height for position calculation after precise fitting
-                try:
-                    actual_frame_height = scribus.getSize(img_frame)[1]
-                    new_y = current_y + actual_frame_height + BLOCK_SPACING
-                    column_mgr.set_current_y(new_y)
-                except:
-                    # Fallback to estimated height if getting actual height fails
-                    new_y = current_y + actual_height + BLOCK_SPACING
-                    column_mgr.set_current_y(new_y)
-                enforce_margin_boundary()
-            else:
-                # Not enough space, move to next page
-                new_page()
-                # Single image - place at left margin with standard height
-                img_path = os.path.join(base_path, imgs[0])
-                if Image:
+                    # Use actual frame height for position calculation after precise fitting
                     try:
-                        with Image.open(img_path) as im:
-                            orig_w, orig_h = im.size
+                        actual_frame_height = scribus.getSize(img_frame)[1]
+                        new_y = current_y + actual_frame_height + BLOCK_SPACING
+                        column_mgr.set_current_y(new_y)
                     except:
-                        orig_w, orig_h = (300, 200)
+                        # Fallback to estimated height if getting actual height fails
+                        new_y = current_y + actual_height + BLOCK_SPACING
+                        column_mgr.set_current_y(new_y)
+                    enforce_margin_boundary()
                 else:
-                    orig_w, orig_h = (300, 200)
+                    # Not enough space, move to next page
+                    new_page()
+                    # Single image - place at left margin with standard height
+                    img_path = os.path.join(base_path, imgs[0])
+                    orig_w, orig_h = get_image_size(img_path)
                 
-                # Scale image maintaining aspect ratio with standard height
-                scale = float(standard_image_height) / float(orig_h) if orig_h else 1.0
-                new_w = orig_w * scale
+                    # Scale image maintaining aspect ratio with standard height
+                    scale = float(standard_image_height) / float(orig_h) if orig_h else 1.0
+                    new_w = orig_w * scale
                 
-                # Position using column manager
-                x = column_mgr.get_column_x()
-                current_y = column_mgr.get_current_y()
+                    # Position using column manager
+                    x = column_mgr.get_column_x()
+                    current_y = column_mgr.get_current_y()
 
-                img_frame = scribus.createImage(x, current_y, new_w, standard_image_height)
-                scribus.loadImage(img_path, img_frame)
-                scribus.setScaleImageToFrame(True, True, img_frame)
-                scribus.setLineColor("None", img_frame)
+                    img_frame = scribus.createImage(x, current_y, new_w, standard_image_height)
+                    scribus.loadImage(img_path, img_frame)
+                    scribus.setScaleImageToFrame(True, True, img_frame)
+                    scribus.setLineColor("None", img_frame)
 
-                # Try to eliminate gaps - test without custom function
-                try:
-                    scribus.setScaleFrameToImage(img_frame)
-                except:
-                    pass
+                    # Try to eliminate gaps - test without custom function
+                    try:
+                        scribus.setScaleFrameToImage(img_frame)
+                    except:
+                        pass
 
-                # Use actual frame height for position calculation after precise fitting
-                try:
-                    actual_frame_height = scribus.getSize(img_frame)[1]
-                    new_y = current_y + actual_frame_height + BLOCK_SPACING
-                    column_mgr.set_current_y(new_y)
-                except:
-                    # Fallback to estimated height if getting actual height fails
-                    new_y = current_y + standard_image_height + BLOCK_SPACING
+                    # Use actual frame height for position calculation after precise fitting
+                    try:
+                        actual_frame_height = scribus.getSize(img_frame)[1]
+                        new_y = current_y + actual_frame_height + BLOCK_SPACING
+                        column_mgr.set_current_y(new_y)
+                    except:
+                        # Fallback to estimated height if getting actual height fails
+                        new_y = current_y + standard_image_height + BLOCK_SPACING
+                        column_mgr.set_current_y(new_y)
+                    enforce_margin_boundary()
+            else:
+                # For multiple images, we need to decide if we can fit at least one row
+                if available_space < _SPACE_THRESHOLD:
+                    # Not enough space for even one row at acceptable size, move to next page
+                    new_page()
+                    # Place all images with standard height
+                    new_y = place_images_grid(imgs, base_path, column_mgr.get_current_y(), standard_image_height)
                     column_mgr.set_current_y(new_y)
-                enforce_margin_boundary()
-        else:
-            # For multiple images, we need to decide if we can fit at least one row
-            # Calculate how many images we can fit in the first row
-            first_row_count = min(3, len(imgs))
-            
-            # If we have enough space for at least one row at a reasonable size
-            # We'll use a minimum height of 80 points to ensure image quality
-            min_acceptable_height = 80
-            
-            if available_space >= min_acceptable_height + 10:
-                # We can fit at least one row
-                # Place first row of images with adjusted height to fit available space
-                # but not smaller than minimum acceptable height
-                adjusted_height = max(min_acceptable_height, min(standard_image_height, available_space - 10))
+                    enforce_margin_boundary()
+                else:
+                    # Calculate how many images we can fit in the first row
+                    first_row_count = min(3, len(imgs))
+
+                    # We can fit at least one row
+                    # Place first row of images with adjusted height to fit available space
+                    # but not smaller than minimum acceptable height
+                    adjusted_height = max(_MIN_IMG_H, min(standard_image_height, available_space - _IMG_BUFFER))
                 
-                # Place just the first row
-                new_y = place_images_grid(imgs[:first_row_count], base_path, column_mgr.get_current_y(), adjusted_height)
-                column_mgr.set_current_y(new_y)
-                enforce_margin_boundary()
+                    # Place just the first row
+                    cur_y = column_mgr.get_current_y()
+                    new_y = place_images_grid(imgs[:first_row_count], base_path, cur_y, adjusted_height)
+
+                    # If more images, continue on next page (new_page resets the
+                    # cursor, so the first row's end position never needs storing)
+                    if len(imgs) > first_row_count:
+                        new_page()
+                        cur_y = column_mgr.get_current_y()
+                        # Critical: use the SAME adjusted_height for consistency
+                        # This ensures images on the next page match the size of those on the previous page
+                        new_y = place_images_grid(imgs[first_row_count:], base_path, cur_y, adjusted_height)
 
-                # If more images, continue on next page
-                if len(imgs) > first_row_count:
-                    new_page()
-                    # Critical: use the SAME adjusted_height for consistency
-                    # This ensures images on the next page match the size of those on the previous page
-                    new_y = place_images_grid(imgs[first_row_count:], base_path, column_mgr.get_current_y(), adjusted_height)
                     column_mgr.set_current_y(new_y)
                     enforce_margin_boundary()
-            else:
-                # Not enough space for even one row at acceptable size, move to next page
-                new_page()
-                # Place all images with standard height
-                new_y = place_images_grid(imgs, base_path, column_mgr.get_current_y(), standard_image_height)
-                column_mgr.set_current_y(new_y)
-                enforce_margin_boundary()
+        finally:
+            resume_redraw()
     
     # Place quiz section using global constants - only if quizzes are enabled
     if "quiz" in tmpl and PRINT_QUIZZES:
@@ -3011,9 +2886,15 @@ def process_template(tmpl, base_path):
     
     global_template_count += 1
 
+    # One boundary pass for everything this template placed
+    flush_pending_constraints()
+
 # ────────────────────────────────────────────────────────────────────────────────
 # ─────────── VERTICAL TOPIC BANNER FUNCTIONS ────────────
 # ────────────────────────────────────────────────────────────────────────────────
+# Banner color per topic name, computed once per topic
+_TOPIC_COLOR_CACHE = {}
+
 def add_vertical_topic_banner(topic_name):
     """
     Creates a vertical rectangle with topic text on the side of the page.
@@ -3021,20 +2902,20 @@ def add_vertical_topic_banner(topic_name):
     Parameters:
     - topic_name: The name of the topic to display vertically
     """
-    global current_topic_text, current_topic_color
+    global current_topic_text, current_topic_color, current_topic_display
     
     # Store the current topic for use when creating new pages
     current_topic_text = topic_name
+    # Build the banner text once here; it is redrawn on every new page
+    current_topic_display = " ".join(topic_name.upper())
     
     # Assign a consistent color to this topic based on topic name
-    # This ensures the same topic always gets the same color
-    try:
-        # Use hash of topic name to get a consistent color index
-        color_idx = hash(topic_name) % len(BACKGROUND_COLORS)
-        current_topic_color = BACKGROUND_COLORS[color_idx]
-    except:
-        # Fallback to first color if there's an issue
-        current_topic_color = BACKGROUND_COLORS[0]
+    # This ensures the same topic always gets the same color, across runs too
+    color = _TOPIC_COLOR_CACHE.get(topic_name)
+    if color is None:
+        color = BACKGROUND_COLORS[zlib.crc32(str(topic_name).encode('utf-8')) % len(BACKGROUND_COLORS)]
+        _TOPIC_COLOR_CACHE[topic_name] = color
+    current_topic_color = color
     
     # Add the vertical topic banner to the current page
     create_vertical_topic_banner()
@@ -3068,7 +2949,7 @@ def create_vertical_topic_banner():
     scribus.setLineColor("None", rect)
 
     # Prepare and place banner text
-    display_text = " ".join(current_topic_text.upper())
+    display_text = current_topic_display
     banner_center_y = banner_y + (rect_height / 2)
     text_height = rect_height * BANNER_TEXT_HEIGHT_PERCENT
 
@@ -3077,16 +2958,12 @@ def create_vertical_topic_banner():
         scribus.setText(display_text, text_frame)
         
         # Apply font settings
-        font_applied = False
-        for myriad_font in MYRIAD_VARIANTS:
-            try:
-                scribus.setFont(myriad_font, text_frame)
-                scribus.setFontSize(BANNER_TEXT_FONT_SIZE)
-                font_applied = True
-                break
-            except:
-                continue
-                
+        _set_header_font(text_frame)
+        try:
+            scribus.setFontSize(BANNER_TEXT_FONT_SIZE, text_frame)
+        except:
+            pass
+
         # Apply text properties
         scribus.setTextAlignment(scribus.ALIGN_CENTERED, text_frame)
         scribus.setTextColor("White", text_frame)
@@ -3107,16 +2984,49 @@ def create_vertical_topic_banner():
 # ────────────────────────────────────────────────────────────────────────────────
 # ─────────── SUPERSCRIPT MAP & NORMALIZATION ───────────
 # ────────────────────────────────────────────────────────────────────────────────
-_SUP_MAP = {
-    '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
-    '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹'
-}
-
-# Unicode map for subscript digits
-_SUB_MAP = {
-    '0': '₀', '1': '₁', '2': '₂', '3': '₃', '4': '₄',
-    '5': '₅', '6': '₆', '7': '₇', '8': '₈', '9': '₉'
-}
+# Digit -> Unicode superscript/subscript translation tables, shared by every
+# converter so digit runs go through str.translate in one C-level pass
+_SUP_TABLE = str.maketrans('0123456789', '⁰¹²³⁴⁵⁶⁷⁸⁹')
+_SUB_TABLE = str.maketrans('0123456789', '₀₁₂₃₄₅₆₇₈₉')
+
+# Plain-text "cm3" style units in quiz questions
+_RE_CM_DIGIT = re.compile(r'cm(\d)')
+
+# <sup>/<sub> tag patterns (also used to locate runs in apply_quiz_superscripts)
+_RE_SUP_TAG = re.compile(r'<sup>(\d+)</sup>')
+_RE_SUB_TAG = re.compile(r'<sub>(\d+)</sub>')
+
+# All superscript/subscript markup forms as one alternation, so handle_superscripts
+# scans the text once instead of once per form. Alternatives are listed in the
+# order the forms used to be replaced; each group name selects the conversion.
+_SUPERSCRIPT_RE = re.compile(
+    # Unit closing its own span, digits in the next S-T span: "cm</span><span class="S-T2" style="vertical-align:super">3</span>"
+    r'(?P<unit_span>(?<![a-zA-Z])(?P<unit_span_unit>[a-zA-Z]+)</span><span\s+class=["\']S-T\d+["\']\s+style=["\'][^"\']*vertical-align[^"\']*["\']>\s*(?P<unit_span_digits>\d+)\s*</span>)'
+    # Plain S-T span: <span class="S-T18">3</span>
+    r'|(?P<st_span><span\s+class=(?:["\']|\")S-T[^"\'>]*(?:["\']|\")(?:\s*[^>]*)?>(?P<st_span_digits>\d+)</span>)'
+    # Unit followed by an S-T span with vertical-align, any case
+    r'|(?P<unit_valign>(?<![a-zA-Z])(?P<unit_valign_unit>[a-zA-Z]+)(?i:<span\s+class=["\\\']S-T[^"\\\']*["\\\'][^>]*vertical-align[^>]*>)(?P<unit_valign_digits>\d+)(?i:</span>))'
+    # S-T span with backslash-escaped quotes
+    r'|(?P<st_span_esc><span\s+class=["\\\']S-T[^"\\\']*["\\\'](?:\s*[^>]*)?>(?P<st_span_esc_digits>\d+)</span>)'
+    r'|(?P<sup><sup>(?P<sup_digits>\d+)</sup>)'
+    r'|(?P<sub><sub>(?P<sub_digits>\d+)</sub>)'
+    r'|(?P<valign_sup>(?i:<span[^>]*vertical-align:\s*super[^>]*>)(?P<valign_sup_digits>\d+)(?i:</span>))'
+    r'|(?P<valign_sub>(?i:<span[^>]*vertical-align:\s*sub[^>]*>)(?P<valign_sub_digits>\d+)(?i:</span>))'
+)
+
+# Alternatives that keep their leading unit text, and those that produce subscripts
+_SUPERSCRIPT_UNIT_GROUPS = frozenset(("unit_span", "unit_valign"))
+_SUBSCRIPT_GROUPS = frozenset(("sub", "valign_sub"))
+
+def _superscript_repl(m):
+    """Convert one _SUPERSCRIPT_RE match to Unicode superscript/subscript digits."""
+    kind = m.lastgroup
+    digits = m.group(kind + "_digits")
+    if kind in _SUBSCRIPT_GROUPS:
+        return digits.translate(_SUB_TABLE)
+    if kind in _SUPERSCRIPT_UNIT_GROUPS:
+        return m.group(kind + "_unit") + digits.translate(_SUP_TABLE)
+    return digits.translate(_SUP_TABLE)
 
 def apply_quiz_superscripts(text_frame, original_text, cleaned_text):
     """
@@ -3128,11 +3038,8 @@ def apply_quiz_superscripts(text_frame, original_text, cleaned_text):
         
     try:
         # Find all superscript and subscript patterns
-        sup_pattern = r'<sup>(\d+)</sup>'
-        sub_pattern = r'<sub>(\d+)</sub>'
-        
-        sup_matches = list(re.finditer(sup_pattern, original_text))
-        sub_matches = list(re.finditer(sub_pattern, original_text))
+        sup_matches = list(_RE_SUP_TAG.finditer(original_text))
+        sub_matches = list(_RE_SUB_TAG.finditer(original_text))
         
         # Create a list of all formatting to apply
         format_list = []
@@ -3157,24 +3064,27 @@ def apply_quiz_superscripts(text_frame, original_text, cleaned_text):
                 format_list.append((start_pos, len(digits), 'sub'))
                 offset = start_pos + len(digits)
         
-        # Apply formatting
+        if not format_list:
+            return
+        
+        # Merge overlapping/adjacent runs so each contiguous region is styled once
+        format_list.sort()
+        merged = []
         for start_pos, length, format_type in format_list:
-            try:
-                scribus.selectText(start_pos, length, text_frame)
-                
-                # Get current font size for the selection
-                current_size = scribus.getFontSize(text_frame)
-                
-                if format_type == 'sup':
-                    # Superscript: smaller font size
-                    scribus.setFontSize(int(current_size * 0.75), text_frame)
-                elif format_type == 'sub':
-                    # Subscript: smaller font size  
-                    scribus.setFontSize(int(current_size * 0.75), text_frame)
-                    
-            except:
-                # If this particular formatting fails, continue with others
-                continue
+            if merged and merged[-1][2] == format_type and start_pos <= merged[-1][0] + merged[-1][1]:
+                prev_start, prev_length, _ = merged[-1]
+                merged[-1] = (prev_start, max(prev_length, start_pos + length - prev_start), format_type)
+            else:
+                merged.append((start_pos, length, format_type))
+        
+        # Superscripts and subscripts both use a smaller font size; quiz text has a
+        # single base size, so read it once for the whole batch
+        reduced_size = int(scribus.getFontSize(text_frame) * 0.75)
+        
+        # Apply formatting
+        for start_pos, length, format_type in merged:
+            scribus.selectText(start_pos, length, text_frame)
+            scribus.setFontSize(reduced_size, text_frame)
                 
     except:
         # If the entire function fails, just continue - text will display without formatting
@@ -3191,77 +3101,17 @@ def handle_superscripts(text):
     """
     if not text or not isinstance(text, str):
         return text
-    
-    original_text = text
-    
-    # Handle special HTML span pattern for digit superscripts with any unit
-    text = re.sub(
-        r'([a-zA-Z]+)</span><span\s+class=["\']S-T\d+["\']\s+style=["\'][^"\']*vertical-align[^"\']*["\']>\s*(\d+)\s*</span>',
-        lambda m: m.group(1) + ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(2)),
-        text
-    )
-    
-    # Handle text followed by S-T span (e.g., "cm<span class="S-T18">3</span>") - FIRST
-    # For quiz questions, convert to simple format that apply_quiz_superscripts can handle
-    text = re.sub(
-        r'([a-zA-Z]+)<span\s+class=(?:["\']|\")S-T[^"\'>]*(?:["\']|\")(?:\s*[^>]*)?>(\d+)</span>',
-        lambda m: m.group(1) + '<sup>' + m.group(2) + '</sup>',
-        text
-    )
-    
-    # Also handle the simple case - convert to <sup> format
-    text = re.sub(
-        r'<span\s+class=(?:["\']|\")S-T[^"\'>]*(?:["\']|\")(?:\s*[^>]*)?>(\d+)</span>',
-        lambda m: '<sup>' + m.group(1) + '</sup>',
-        text
-    )
-    
-    # Handle complex S-T spans with style attributes (vertical-align for superscripts)
-    text = re.sub(
-        r'([a-zA-Z]+)<span\s+class=["\\\']S-T[^"\\\']*["\\\'][^>]*vertical-align[^>]*>(\d+)</span>',
-        lambda m: m.group(1) + ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(2)),
-        text,
-        flags=re.IGNORECASE
-    )
-    
-    # Replace any remaining standalone <span class="S-T...">digits</span> (superscripts)
-    text = re.sub(
-        r'<span\s+class=["\\\']S-T[^"\\\']*["\\\'](?:\s*[^>]*)?>(\d+)</span>',
-        lambda m: ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(1)),
-        text
-    )
-    
-    # Replace <sup>digits</sup> (superscripts)
-    text = re.sub(
-        r'<sup>(\d+)</sup>',
-        lambda m: ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(1)),
-        text
-    )
-    
-    # Replace <sub>digits</sub> (subscripts)
-    text = re.sub(
-        r'<sub>(\d+)</sub>',
-        lambda m: ''.join(_SUB_MAP.get(ch, ch) for ch in m.group(1)),
-        text
-    )
-    
-    # Handle span elements with vertical-align style for superscripts
-    text = re.sub(
-        r'<span[^>]*vertical-align:\s*super[^>]*>(\d+)</span>',
-        lambda m: ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(1)),
-        text,
-        flags=re.IGNORECASE
-    )
-    
-    # Handle span elements with vertical-align style for subscripts
-    text = re.sub(
-        r'<span[^>]*vertical-align:\s*sub[^>]*>(\d+)</span>',
-        lambda m: ''.join(_SUB_MAP.get(ch, ch) for ch in m.group(1)),
-        text,
-        flags=re.IGNORECASE
-    )
-    
-    return text
+    # Every pattern starts at a <sup>, <sub> or <span> tag, so plain text
+    # (and markup without any of those tags) can skip the regex entirely
+    if '<' not in text or ('<s' not in text and '<S' not in text):
+        return text
+
+    return _convert_superscripts(text)
+
+@functools.lru_cache(maxsize=4096)
+def _convert_superscripts(text):
+    """Cached conversion for handle_superscripts; repeated snippets are only scanned once."""
+    return _SUPERSCRIPT_RE.sub(_superscript_repl, text)
 
 # ────────────────────────────────────────────────────────────────────────────────
 # ─────────── MAIN DRIVER FUNCTION ────────────
@@ -3295,56 +3145,25 @@ def create_styled_header(text, font_size, bold, bg_color, text_color, padding):
         except:
             pass
         # Simple boundary enforcement for background rectangle
-        simple_constrain_element(bg_rect)
+        defer_constrain_element(bg_rect)
     else:
         bg_rect = None
     # Create text frame with padding
+    # Frame geometry is tracked locally so it never has to be read back via getSize
+    current_w = frame_w - (actual_padding * 2)
+    current_h = text_h - (actual_padding * 2)
     text_frame = scribus.createText(
         MARGINS[0] + actual_padding,
         y_offset + actual_padding,
-        frame_w - (actual_padding * 2),
-        text_h - (actual_padding * 2)
+        current_w,
+        current_h
     )
     scribus.setText(text, text_frame)
-    try:
-        scribus.setLineColor("None", text_frame)
-    except:
-        pass
-    font_applied = False
-    for myriad_font in MYRIAD_VARIANTS:
-        try:
-            scribus.setFont(myriad_font, text_frame)
-            scribus.setFontSize(font_size, text_frame)
-            scribus.textColor(text_color, text_frame)
-            font_applied = True
-            break
-        except:
-            continue
-    if not font_applied:
-        try:
-            scribus.setFont(DEFAULT_FONT, text_frame)
-            scribus.setFontSize(font_size, text_frame)
-            scribus.textColor(text_color, text_frame)
-        except:
-            success = False
-            for f in FONT_CANDIDATES:
-                try:
-                    scribus.setFont(f, text_frame)
-                    scribus.setFontSize(font_size, text_frame)
-                    scribus.textColor(text_color, text_frame)
-                    success = True
-                    break
-                except:
-                    pass
-            if not success:
-                for f in ["Arial", "Times", "Courier"]:
-                    try:
-                        scribus.setFont(f, text_frame)
-                        scribus.setFontSize(font_size, text_frame)
-                        scribus.textColor(text_color, text_frame)
-                        break
-                    except:
-                        pass
+    scribus.setLineColor("None", text_frame)
+    _set_header_font(text_frame)
+    scribus.setFontSize(font_size, text_frame)
+    if text_color in document_color_names():
+        scribus.setTextColor(text_color, text_frame)
     if bold:
         try:
             scribus.setFontSize(font_size + 2, text_frame)
@@ -3361,76 +3180,84 @@ def create_styled_header(text, font_size, bold, bg_color, text_color, padding):
     if not bg_rect:
         # Official Scribus method for precise text fitting based on documentation
         try:
-            # Force text refresh to ensure all styling is applied and show live updates
-            scribus.redrawAll()
-
-            # Step 1: Ensure no overflow first with minimal expansion
-            scribus.layoutText(text_frame)
-
-            # Expand minimally to ensure all text is visible
-            while scribus.textOverflows(text_frame):
-                current_w, current_h = scribus.getSize(text_frame)
-                # Check if expanding would exceed bottom margin (with minimal buffer)
-                minimal_buffer = 10  # Just enough for page numbers
-                max_allowed_height = (PAGE_HEIGHT - MARGINS[3] - minimal_buffer) - y_offset  # Minimal buffer
-                if current_h + 3 > max_allowed_height:
-                    break  # Don't expand if it would exceed margins
-                scribus.sizeObject(current_w, current_h + 3, text_frame)
+            # Without layoutText, a repaint is what forces the styled text to lay out
+            if not _HAS_LAYOUT_TEXT:
+                scribus.redrawAll()
+
+            # Step 1: Open the frame up to the tallest height the margins allow and
+            # lay out once, so every line that can fit is counted in a single pass
+            # (instead of growing 3pt at a time with a full reflow per step)
+            minimal_buffer = 10  # Just enough for page numbers
+            max_allowed_height = (PAGE_HEIGHT - MARGINS[3] - minimal_buffer) - y_offset  # Minimal buffer
+            if max_allowed_height > current_h:
+                scribus.sizeObject(current_w, max_allowed_height, text_frame)
+            if _HAS_LAYOUT_TEXT:
                 scribus.layoutText(text_frame)
 
             # Step 2: Calculate exact height using official Scribus methods
             try:
-                # Get actual text metrics
+                # Get actual text metrics - read once, reused for all arithmetic below
                 num_lines = scribus.getTextLines(text_frame)
                 line_spacing = scribus.getLineSpacing(text_frame)
                 left, right, top, bottom = scribus.getTextDistances(text_frame)
 
                 if num_lines > 0:
                     # Calculate exact height: (lines × spacing) + padding
-                    exact_text_height = num_lines * line_spacing
-                    exact_frame_height = exact_text_height + top + bottom
+                    exact_frame_height = _estimate_frame_height(
+                        int(num_lines), float(line_spacing), float(top), float(bottom),
+                        float(max_allowed_height)
+                    )
 
                     # Resize to exact height
-                    current_w, current_h = scribus.getSize(text_frame)
                     scribus.sizeObject(current_w, exact_frame_height, text_frame)
-                    scribus.layoutText(text_frame)
+                    if _HAS_LAYOUT_TEXT:
+                        scribus.layoutText(text_frame)
+                    current_h = exact_frame_height
 
                     # Verify no overflow after exact sizing
                     if scribus.textOverflows(text_frame):
                         # Add minimal space if needed
-                        scribus.sizeObject(current_w, exact_frame_height + line_spacing * 0.1, text_frame)
-                        scribus.layoutText(text_frame)
+                        current_h = exact_frame_height + line_spacing * 0.1
+                        scribus.sizeObject(current_w, current_h, text_frame)
+                        if _HAS_LAYOUT_TEXT:
+                            scribus.layoutText(text_frame)
+                elif max_allowed_height > current_h:
+                    # Nothing measured - don't leave the frame at its opened-up height
+                    scribus.sizeObject(current_w, current_h, text_frame)
             except:
-                # If official method fails, minimal fallback
-                pass
+                # Metrics unavailable - shrink back from the opened-up height
+                # as the nothing-measured branch does
+                if max_allowed_height > current_h:
+                    try:
+                        scribus.sizeObject(current_w, current_h, text_frame)
+                    except:
+                        pass
         except:
             # Basic fallback if documentation approach fails
             pass
 
-        # Adjust width if needed
-        text_width = 0
-        try:
+        # Adjust width if needed (getTextWidth is missing from most scripter builds)
+        if _HAS_GET_TEXT_WIDTH:
             text_width = scribus.getTextWidth(text_frame)
             if text_width > 0:
                 text_width += 20
                 text_width = max(text_width, 200)
                 text_width = min(text_width, frame_w)
-                scribus.sizeObject(text_width, scribus.getSize(text_frame)[1], text_frame)
-        except:
-            pass
-    spacing_after = BLOCK_SPACING
-    y_offset += text_h + spacing_after
+                scribus.sizeObject(text_width, current_h, text_frame)
+    # Advance past the header with a single y_offset write: clamp to the
+    # page-number buffer, then add the inter-element gap (the header never moves
+    # the column cursor, so only y_offset needs the margin clamp here)
+    safe_boundary = PAGE_HEIGHT - MARGINS[3] - 20
+    y_offset = min(y_offset + text_h + BLOCK_SPACING, safe_boundary) + BLOCK_SPACING
     
     # Simple final constraint
-    simple_constrain_element(text_frame)
+    defer_constrain_element(text_frame)
     
     # Text overflow is already handled by the documentation-based approach above
-    
-    # Enforce strict margin boundary
-    enforce_margin_boundary()
 
-    # Ensure no overlaps after header creation
-    ensure_no_overlaps()
+    # Ensure no overlaps: break the page if the header left us too close to the bottom
+    if y_offset > PAGE_HEIGHT - MARGINS[3] - 50:  # 50pt buffer
+        new_page()
 
     return text_frame
 
@@ -3456,236 +3283,292 @@ def create_topic_header(topic_name):
         TOPIC_PADDING
     )
 
+# Text distances per frame, read from Scribus on first touch and kept in sync
+# as the sub/superscript path writes them (cleared per document)
+_td_cache = {}
+
+def _td(frame):
+    """Cached (left, right, top, bottom) text distances of frame."""
+    v = _td_cache.get(frame)
+    if v is None:
+        v = _td_cache[frame] = tuple(scribus.getTextDistances(frame))
+    return v
+
+# Sub/superscript sizing per base font size: (reduced size, raise, lower).
+# Documents use a handful of sizes, so each triple is computed once.
+_SHIFT_CACHE = {}
+
+def _shift_sizes(curr_size):
+    """(70% size, 40% raise, 20% drop) for a sub/superscript at curr_size."""
+    v = _SHIFT_CACHE.get(curr_size)
+    if v is None:
+        v = _SHIFT_CACHE[curr_size] = (curr_size * 0.7, curr_size * 0.4, curr_size * 0.2)
+    return v
+
+# Size strings and hex colors repeat across thousands of segments, so parse each once
+_RE_NUM = re.compile(r'[^\d.]')
+_RE_SIGNED_NUM = re.compile(r'[^\d.-]')
+
+@functools.lru_cache(maxsize=256)
+def _parse_size(size_str, default_size):
+    """Convert a CSS font-size (pt/px/em/%) to the point size used in frames."""
+    # Handle various formats: ##pt, ##px, ##em, ##%
+    if "pt" in size_str:
+        # Scale down to maintain hierarchy
+        size = float(size_str.replace("pt", "").strip()) * 0.9
+    elif "px" in size_str:
+        # Approximate px to pt (0.75 factor) then scale down
+        size = float(size_str.replace("px", "").strip()) * 0.75 * 0.9
+    elif "em" in size_str:
+        size = float(size_str.replace("em", "").strip()) * default_size
+    elif "%" in size_str:
+        size = default_size * (float(_RE_NUM.sub('', size_str)) / 100.0)
+    else:
+        # Scale down non-percentage sizes
+        size = float(_RE_NUM.sub('', size_str)) * 0.9
+    # Ensure minimum readable size
+    return max(size, 7)
+
+@functools.lru_cache(maxsize=256)
+def _hex_to_rgb(color_value):
+    """Return (color_name, r, g, b) for a #RGB / #RRGGBB color string."""
+    color_name = f"Color_{color_value.replace('#', '')}"
+    if len(color_value) == 4:  # Short hex: #RGB
+        r = int(color_value[1] + color_value[1], 16)
+        g = int(color_value[2] + color_value[2], 16)
+        b = int(color_value[3] + color_value[3], 16)
+    else:  # Normal hex: #RRGGBB
+        r = int(color_value[1:3], 16)
+        g = int(color_value[3:5], 16)
+        b = int(color_value[5:7], 16)
+    return color_name, r, g, b
+
 def handle_text_styles(frame, style_segments, default_size):
     """Apply text styles based on parsed style segments."""
     # Skip empty text or if frame is not valid
     if not style_segments or not frame:
         return
-    
+
+    # Bind the Scribus calls issued for every segment to locals once
+    _selectText = scribus.selectText
+    _setFont = scribus.setFont
+    _setFontSize = scribus.setFontSize
+    _setTextColor = scribus.setTextColor
+    _getFont = scribus.getFont
+    _getFontSize = scribus.getFontSize
+    _setBaseline = scribus.setBaseline if _HAS_SET_BASELINE else None
+    _getTextDistances = _td if _HAS_GET_TEXT_DISTANCES else None
+    _setTextDistances = scribus.setTextDistances
+
+    # Other code may have changed this frame's distances since we last saw it
+    _td_cache.pop(frame, None)
+
     # Set default font and size first before applying specific styles
     try:
-        scribus.setFont(DEFAULT_FONT, frame)
-        scribus.setFontSize(default_size, frame)
+        _setFont(DEFAULT_FONT, frame)
+        _setFontSize(default_size, frame)
     except:
         # Try font candidates if DEFAULT_FONT fails
         for f in FONT_CANDIDATES:
             try:
-                scribus.setFont(f, frame)
-                scribus.setFontSize(default_size, frame)
+                _setFont(f, frame)
+                _setFontSize(default_size, frame)
                 break
             except:
                 continue
     
+    # Group segments by style: segments never overlap, so identical styles give
+    # identical results and back-to-back runs of one style can share a selection
+    style_groups = {}
     for start, length, style_dict in style_segments:
         if length <= 0:
             continue
-            
         try:
-            scribus.selectText(start, length, frame)
+            style_key = tuple(sorted(style_dict.items()))
+        except TypeError:
+            style_key = id(style_dict)
+        group = style_groups.get(style_key)
+        if group is None:
+            group = style_groups[style_key] = (style_dict, [])
+        ranges = group[1]
+        if ranges and ranges[-1][0] + ranges[-1][1] == start:
+            ranges[-1][1] += length
+        else:
+            ranges.append([start, length])
+
+    for style_dict, ranges in style_groups.values():
+        for start, length in ranges:
+            try:
+                _selectText(start, length, frame)
             
-            # Apply font family if specified in style
-            font_applied = False
-            if "font" in style_dict:
-                # First try the detected full font name
-                try:
-                    scribus.setFont(style_dict["font"], frame)
-                    font_applied = True
-                except:
-                    # If that fails, use the font detection logic with any available style info
+                # Apply font family if specified in style
+                font_applied = False
+                if "font" in style_dict:
+                    # First try the detected full font name
                     try:
-                        font_family = style_dict.get("font-family", style_dict["font"])
-                        font_weight = style_dict.get("font-weight", None)
-                        font_style = style_dict.get("font-style", None)
+                        _setFont(style_dict["font"], frame)
+                        font_applied = True
+                    except:
+                        # If that fails, use the font detection logic with any available style info
+                        try:
+                            font_family = style_dict.get("font-family", style_dict["font"])
+                            font_weight = style_dict.get("font-weight", None)
+                            font_style = style_dict.get("font-style", None)
                         
-                        # Apply bold/italic flags
-                        if style_dict.get("bold", False) and not font_weight:
-                            font_weight = "bold"
-                        if style_dict.get("italic", False) and not font_style:
-                            font_style = "italic"
+                            # Apply bold/italic flags
+                            if style_dict.get("bold", False) and not font_weight:
+                                font_weight = "bold"
+                            if style_dict.get("italic", False) and not font_style:
+                                font_style = "italic"
                             
-                        # Get best matching font = get_font_with_style(font_family, font_weight, font_style)
-                        best_font = get_font_with_style(font_family, font_weight, font_style)
+                            # Get best matching font = get_font_with_style(font_family, font_weight, font_style)
+                            best_font = get_font_with_style(font_family, font_weight, font_style)
                         
-                        # Apply the font
-                        scribus.setFont(best_font, frame)
-                        font_applied = True
-                    except Exception as e:
-                        # If all else fails, try the DEFAULT_FONT
-                        try:
-                            scribus.setFont(DEFAULT_FONT, frame)
+                            # Apply the font
+                            _setFont(best_font, frame)
                             font_applied = True
-                        except:
-                            pass
+                        except Exception as e:
+                            # If all else fails, try the DEFAULT_FONT
+                            try:
+                                _setFont(DEFAULT_FONT, frame)
+                                font_applied = True
+                            except:
+                                pass
             
-            # If no font was specified or applied yet, try to set best font based on style attributes
-            if not font_applied and (style_dict.get("bold", False) or style_dict.get("italic", False)):
-                try:
-                    current_font = None
+                # If no font was specified or applied yet, try to set best font based on style attributes
+                if not font_applied and (style_dict.get("bold", False) or style_dict.get("italic", False)):
                     try:
-                        # Try to get current font
-                        current_font = scribus.getFont(frame)
-                    except:
-                        current_font = DEFAULT_FONT
-                        
-                    # Apply styling to current font
-                    font_weight = "bold" if style_dict.get("bold", False) else None
-                    font_style = "italic" if style_dict.get("italic", False) else None
-                    
-                    best_font = get_font_with_style(current_font, font_weight, font_style)
-                    scribus.setFont(best_font, frame)
-                except:
-                    pass
-            
-            # Apply font size if specified
-            if "font_size" in style_dict:
-                size_str = style_dict["font_size"]
-                try:
-                    # Handle various formats: ##pt, ##px, ##em, ##%
-                    if "pt" in size_str:
-                        size = float(size_str.replace("pt", "").strip())
-                        # Scale down to maintain hierarchy
-                        size = size * 0.9
-                    elif "px" in size_str:
-                        # Approximate px to pt (0.75 factor) then scale down
-                        size = float(size_str.replace("px", "").strip()) * 0.75 * 0.9
-                    elif "em" in size_str:
-                        size = float(size_str.replace("em", "").strip()) * default_size
-                    elif "%" in size_str:
-                        pct = float(re.sub(r'[^\d.]','', size_str)) / 100.0
-                        size = default_size * pct
-                    else:
-                        size = float(re.sub(r'[^\d.]','', size_str))
-                        # Scale down non-percentage sizes
-                        size = size * 0.9
-                    
-                    # Ensure minimum readable size
-                    size = max(size, 7)
-                    scribus.setFontSize(size, frame)
-                except:
-                    pass
-            
-            # Apply color if specified
-            if "color" in style_dict:
-                try:
-                    color_value = style_dict["color"]
-                    
-                    # Handle various formats: named colors or hex values
-                    if color_value.startswith("#"):
-                        color_name = f"Color_{color_value.replace('#', '')}"
-                        
-                        # Check if color exists or needs to be defined
-                        color_exists = False
+                        current_font = None
                         try:
-                            if color_name in scribus.getColorNames():
-                                color_exists = True
+                            # Try to get current font
+                            current_font = _getFont(frame)
                         except:
-                            pass
-                            
-                        if not color_exists:
-                            # Convert hex to RGB
-                            if len(color_value) == 4:  # Short hex: #RGB
-                                r = int(color_value[1] + color_value[1], 16)
-                                g = int(color_value[2] + color_value[2], 16)
-                                b = int(color_value[3] + color_value[3], 16)
-                            else:  # Normal hex: #RRGGBB
-                                r = int(color_value[1:3], 16)
-                                g = int(color_value[3:5], 16)
-                                b = int(color_value[5:7], 16)
-                                
-                            # Define the color
-                            try:
-                                scribus.defineColor(color_name, r, g, b)
-                            except:
-                                pass
+                            current_font = DEFAULT_FONT
                         
-                        # Apply the color
-                        scribus.setTextColor(color_name, frame)
-                    else:
-                        # For named colors
-                        scribus.setTextColor(color_value, frame)
-                except:
-                    # If color application fails, try with capitalized variant
+                        # Apply styling to current font
+                        font_weight = "bold" if style_dict.get("bold", False) else None
+                        font_style = "italic" if style_dict.get("italic", False) else None
+                    
+                        best_font = get_font_with_style(current_font, font_weight, font_style)
+                        _setFont(best_font, frame)
+                    except:
+                        pass
+            
+                # Apply font size if specified
+                if "font_size" in style_dict:
                     try:
-                        capitalized = style_dict["color"].capitalize()
-                        scribus.setTextColor(capitalized, frame)
+                        _setFontSize(_parse_size(style_dict["font_size"], default_size), frame)
                     except:
                         pass
             
-            # Apply bold if specified but no styled font was applied
-            # Some Scribus versions don't have true bold, so we increase font size
-            if style_dict.get("bold", False) and not font_applied:
-                try:
-                    current_size = scribus.getFontSize(frame)
-                    scribus.setFontSize(current_size + 1, frame)
-                except:
-                    pass
-                    
-            # Handle superscript/subscript vertical alignment
-            if "vertical_align" in style_dict:
-                try:
-                    v_align = style_dict["vertical_align"]
-                    
-                    # Get current size
-                    curr_size = scribus.getFontSize(frame)
-                    
-                    # Try to determine if this is a superscript or subscript
-                    is_super = False
-                    is_sub = False
-                    
-                    # Check text values like "super", "sup", "subscript", etc.
-                    if any(x in v_align.lower() for x in ["super", "sup"]):
-                        is_super = True
-                    elif any(x in v_align.lower() for x in ["sub", "subscript"]):
-                        is_sub = True
-                    # Check percentage values
-                    elif "%" in v_align:
-                        try:
-                            pct_value = float(re.sub(r'[^\d.-]', '', v_align))
-                            is_super = pct_value > 0
-                            is_sub = pct_value < 0
-                        except:
-                            pass
+                # Apply color if specified
+                if "color" in style_dict:
+                    try:
+                        color_value = style_dict["color"]
                     
-                    # Apply the appropriate styling
-                    if is_super:
-                        # Make superscript smaller and try to raise it
-                        reduced_size = curr_size * 0.7
-                        scribus.setFontSize(reduced_size, frame)
+                        # Handle various formats: named colors or hex values
+                        if color_value.startswith("#"):
+                            color_name, r, g, b = _hex_to_rgb(color_value)
                         
-                        # Try different methods to raise the text
-                        try:
-                            # First try with baseline offset if available
-                            scribus.setBaseline(-curr_size * 0.4, frame)
-                        except:
+                            # Check if color exists or needs to be defined
+                            color_exists = False
                             try:
-                                # Try with text distance instead
-                                l, r, t, b = scribus.getTextDistances(frame)
-                                scribus.setTextDistances(l, r, t - curr_size * 0.4, b, frame)
+                                if color_name in document_color_names():
+                                    color_exists = True
                             except:
                                 pass
-                    
-                    elif is_sub:
-                        # Make subscript smaller and try to lower it
-                        reduced_size = curr_size * 0.7
-                        scribus.setFontSize(reduced_size, frame)
+                            
+                            if not color_exists:
+                                # Define the color
+                                try:
+                                    define_color(color_name, r, g, b)
+                                except:
+                                    pass
                         
-                        # Try different methods to lower the text
+                            # Apply the color
+                            _setTextColor(color_name, frame)
+                        else:
+                            # For named colors
+                            _setTextColor(color_value, frame)
+                    except:
+                        # If color application fails, try with capitalized variant
                         try:
-                            # First try with baseline offset if available
-                            scribus.setBaseline(curr_size * 0.2, frame)
+                            capitalized = style_dict["color"].capitalize()
+                            _setTextColor(capitalized, frame)
                         except:
+                            pass
+            
+                # Apply bold if specified but no styled font was applied
+                # Some Scribus versions don't have true bold, so we increase font size
+                if style_dict.get("bold", False) and not font_applied:
+                    try:
+                        current_size = _getFontSize(frame)
+                        _setFontSize(current_size + 1, frame)
+                    except:
+                        pass
+                    
+                # Handle superscript/subscript vertical alignment
+                if "vertical_align" in style_dict:
+                    try:
+                        v_align = style_dict["vertical_align"].lower()
+
+                        # Classify once: "super"/"sup" raise (+1), "sub"/"subscript"
+                        # lower (-1), otherwise the sign of a percentage decides
+                        if "sup" in v_align:
+                            shift = 1
+                        elif "sub" in v_align:
+                            shift = -1
+                        elif "%" in v_align:
                             try:
-                                # Try with text distance instead
-                                l, r, t, b = scribus.getTextDistances(frame)
-                                scribus.setTextDistances(l, r, t, b + curr_size * 0.2, frame)
-                            except:
-                                pass
-                except Exception as e:
-                    pass
+                                pct_value = float(_RE_SIGNED_NUM.sub('', v_align))
+                            except ValueError:
+                                pct_value = 0
+                            shift = (pct_value > 0) - (pct_value < 0)
+                        else:
+                            shift = 0
+
+                        if shift:
+                            # Make the text smaller, then raise it by 40% of the size
+                            # (superscript) or lower it by 20% (subscript) with a
+                            # baseline offset if available, else the text distances
+                            small, up, down = _shift_sizes(_getFontSize(frame))
+                            _setFontSize(small, frame)
+                            baseline_set = False
+                            if _setBaseline is not None:
+                                try:
+                                    _setBaseline(-up if shift > 0 else down, frame)
+                                    baseline_set = True
+                                except _SCRIBUS_ERRORS:
+                                    pass
+                            if not baseline_set and _getTextDistances is not None:
+                                l, r, t, b = _getTextDistances(frame)
+                                if shift > 0:
+                                    t -= up
+                                else:
+                                    b += down
+                                _setTextDistances(l, r, t, b, frame)
+                                _td_cache[frame] = (l, r, t, b)
+                    except _SCRIBUS_ERRORS:
+                        pass
                 
-        except Exception as e:
-            # If any issue with applying styles to this segment, continue with the next
+            except _SCRIBUS_ERRORS:
+                # If Scribus rejects this segment's styles, continue with the next
+                pass
+
+def _configure_pdf(pdf, out):
+    """Point pdf at out and apply the configured export settings."""
+    pdf.file = out
+    for attr, value in (("compress", bool(PDF_COMPRESS)),
+                        ("quality", PDF_IMAGE_QUALITY),
+                        ("resolution", PDF_RESOLUTION),
+                        ("downsample", PDF_DOWNSAMPLE),
+                        ("embedPDF", False)):
+        # Older Scribus builds reject unknown options; keep their defaults
+        try:
+            setattr(pdf, attr, value)
+        except Exception:
             pass
+    return pdf
 
 def create_pages_from_json(json_path=None, include_quizzes=True, filter_mode="all"):
     """
@@ -3696,19 +3579,20 @@ def create_pages_from_json(json_path=None, include_quizzes=True, filter_mode="al
         include_quizzes (bool): Whether to include quizzes in the PDF
         filter_mode (str): Filter mode for quizzes - "all", "true_only", or "false_only"
     """
-    global y_offset, global_template_count, limit_reached, current_topic_text, current_topic_color, PRINT_QUIZZES, QUIZ_FILTER_MODE
+    global y_offset, global_template_count, limit_reached, current_topic_text, current_topic_color, PRINT_QUIZZES, QUIZ_FILTER_MODE, _COLOR_NAMES_DIRTY
     
     # Set the global quiz printing flag and filter mode
     PRINT_QUIZZES = include_quizzes
     QUIZ_FILTER_MODE = filter_mode
     
     # Debug message to confirm filter settings
-    filter_msg = "ALL quizzes"
-    if filter_mode == "true_only":
-        filter_msg = "ONLY TRUE quizzes"
-    elif filter_mode == "false_only":
-        filter_msg = "ONLY FALSE quizzes"
-    scribus.messageBox("Quiz Filter", f"PDF will include {filter_msg}", scribus.ICON_INFORMATION)
+    if VERBOSE_DIALOGS:
+        filter_msg = "ALL quizzes"
+        if filter_mode == "true_only":
+            filter_msg = "ONLY TRUE quizzes"
+        elif filter_mode == "false_only":
+            filter_msg = "ONLY FALSE quizzes"
+        scribus.messageBox("Quiz Filter", f"PDF will include {filter_msg}", scribus.ICON_INFORMATION)
     
     # Use default path if none provided
     if json_path is None:
@@ -3724,15 +3608,22 @@ def create_pages_from_json(json_path=None, include_quizzes=True, filter_mode="al
     
     # Load and validate JSON
     try:
-        with open(json_path, encoding="utf-8") as f:
-            data = json.load(f)
+        with open(json_path, "rb") as f:
+            data = _json_loads(f.read())
     except Exception as e:
         scribus.messageBox("Error", str(e), scribus.ICON_WARNING)
         return
         
-    if not isinstance(data.get("areas"), list):
-        scribus.messageBox("Bad JSON", "'areas' missing/invalid", scribus.ICON_WARNING)
-        return
+    # A plan written by prepare_plan.py is already validated and flattened;
+    # anything else is checked in full before a document is created
+    if isinstance(data, dict) and data.get("plan_version") == PLAN_VERSION and isinstance(data.get("events"), list):
+        events = data["events"]
+    else:
+        err = _validate(data)
+        if err:
+            scribus.messageBox("Bad JSON", err, scribus.ICON_WARNING)
+            return
+        events = _flatten_areas(data)
     
     # Set up paths and create new document
     # Use the configured image path if it's an absolute path, otherwise make it relative to JSON file
@@ -3740,10 +3631,28 @@ def create_pages_from_json(json_path=None, include_quizzes=True, filter_mode="al
         base_pics = DEFAULT_IMAGES_PATH
     else:
         base_pics = os.path.join(os.path.dirname(json_path), DEFAULT_IMAGES_PATH)
+    # Resolve the images folder once and list it, so templates look names up
+    # in a set instead of stat()-ing every file
+    base_pics = os.path.realpath(base_pics)
+    try:
+        pics_set = frozenset(os.listdir(base_pics)) if os.path.isdir(base_pics) else frozenset()
+    except OSError:
+        pics_set = None
+
+    # Read image sizes for the templates that will be drawn in parallel while
+    # nothing else is happening; layout then hits the cache
+    events = list(events)
+    prefetch_image_sizes(
+        (os.path.join(base_pics, rel)
+         for rel in _template_images(events, GLOBAL_TEMPLATE_LIMIT)),
+        IMAGE_PREFETCH_WORKERS)
         
     scribus.newDocument((PAGE_WIDTH, PAGE_HEIGHT), MARGINS,
                         scribus.PORTRAIT, 1, scribus.UNIT_POINTS,
                         scribus.PAGE_1, 0, 1)
+    # New document, new color table and frame names
+    _COLOR_NAMES_DIRTY = True
+    _td_cache.clear()
     
     # Add page number to first page - exactly like copy 6
     add_page_number()
@@ -3754,70 +3663,74 @@ def create_pages_from_json(json_path=None, include_quizzes=True, filter_mode="al
     current_topic_text = None
     current_topic_color = None
     
-    # Process content hierarchy
-    for area in data["areas"]:
+    # Handlers for the flattened content events (see _flatten_areas)
+    def _add_spacing(amount):
+        global y_offset
+        y_offset += amount
+
+    def _start_topic(name):
+        global current_topic_text
+        # A topic continuing under the same name keeps the banner already on
+        # the page (new_page redraws it), so only a new name draws one
+        same_topic = name == current_topic_text
+        current_topic_text = name
+        create_topic_header(name)
+        if not same_topic:
+            add_vertical_topic_banner(name)
+
+    def _start_module(name):
+        global y_offset
+        create_module_header(name)
+        # Add minimal spacing between module name and template content
+        y_offset += MODULE_TO_TEMPLATE_SPACING
+
+    modules_since_balance = 0
+
+    def _end_module():
+        nonlocal modules_since_balance
+        # Re-apply balancing every BALANCE_INTERVAL modules; frames are created
+        # balanced, and the final pass below covers whatever is left
+        modules_since_balance += 1
+        if modules_since_balance >= BALANCE_INTERVAL:
+            modules_since_balance = 0
+            if column_mgr.use_columns and not column_mgr.quiz_mode:
+                column_mgr.ensure_consistent_balancing()
+
+    dispatch = {
+        "area": lambda name: create_styled_header(name, 11, True, "None", "Black", 5),
+        "area_desc": lambda desc: place_text_block_flow(desc, AREA_DESC_FONT_SIZE, balanced_columns=True, custom_spacing=HEADER_TO_DESC_SPACING),
+        "chap": lambda name: create_styled_header(name, 11, True, "None", "Black", 5),
+        "topic": _start_topic,
+        "topic_desc": lambda desc: place_text_block_flow(desc, TOPIC_DESC_FONT_SIZE, balanced_columns=True, custom_spacing=HEADER_TO_DESC_SPACING),
+        "module": _start_module,
+        "template": lambda tmpl: process_template(tmpl, base_pics, pics_set),
+        "module_end": _end_module,
+        "spacing": _add_spacing,
+    }
+
+    # Process content hierarchy in one flat pass. Once the template limit is
+    # hit, the rest of the open module's templates are skipped but its
+    # module_end still runs; everything after that module is skipped
+    module_open = False
+    for event in events:
+        kind = event[0]
         if global_template_count >= GLOBAL_TEMPLATE_LIMIT:
-            break
-            
-        create_styled_header(f"{area.get('name','Unnamed')}", 11, True, "None", "Black", 5)
-        # Area description
-        desc_text = area.get("desc","")
-        if desc_text:
-            place_text_block_flow(desc_text, AREA_DESC_FONT_SIZE, balanced_columns=True, custom_spacing=HEADER_TO_DESC_SPACING)
-
-        chapter_list = area.get("chapters", [])
-        for chap_index, chap in enumerate(chapter_list):
-            if global_template_count >= GLOBAL_TEMPLATE_LIMIT:
+            if not module_open:
                 break
+            if kind != "module_end":
+                continue
+        dispatch[kind](*event[1:])
+        if kind == "module":
+            module_open = True
+        elif kind == "module_end":
+            module_open = False
 
-            # Add spacing between chapters (but not before first chapter)
-            if chap_index > 0:
-                y_offset += SECTION_TO_SECTION_SPACING
-
-            create_styled_header(f"{chap.get('name','Unnamed')}", 11, True, "None", "Black", 5)
-
-            topic_list = chap.get("topics", [])
-            for topic_index, topic in enumerate(topic_list):
-                if global_template_count >= GLOBAL_TEMPLATE_LIMIT:
-                    break
-
-                # Add spacing between topics (but not before first topic)
-                if topic_index > 0:
-                    y_offset += SECTION_TO_SECTION_SPACING
-
-                # Clear previous topic banner and set new one
-                current_topic_text = topic.get('name', 'Unnamed')
-                create_topic_header(current_topic_text)
-                add_vertical_topic_banner(current_topic_text)
-
-                # Topic description
-                desc_text = topic.get("desc","")
-                if desc_text:
-                    place_text_block_flow(desc_text, TOPIC_DESC_FONT_SIZE, balanced_columns=True, custom_spacing=HEADER_TO_DESC_SPACING)
-                
-                for mod in topic.get("modules", []):
-                    if global_template_count >= GLOBAL_TEMPLATE_LIMIT:
-                        break
-                        
-                    create_module_header(mod.get('name','Unnamed'))
-                    # Add minimal spacing between module name and template content
-                    y_offset += MODULE_TO_TEMPLATE_SPACING
-
-                    for tmpl in mod.get("templates", []):
-                        if global_template_count >= GLOBAL_TEMPLATE_LIMIT:
-                            break
-                        process_template(tmpl, base_pics)
-
-                    # Apply balancing after each module to ensure consistency
-                    if column_mgr.use_columns and not column_mgr.quiz_mode:
-                        column_mgr.ensure_consistent_balancing()
+    # Clamp anything still queued (e.g. trailing headers) before final balancing
+    flush_pending_constraints()
 
     # Apply final uniform balancing to all text frames
     column_mgr.ensure_consistent_balancing()
 
-    # Force final refresh to ensure all content is displayed
-    scribus.redrawAll()
-
     # Determine output PDF path
     pdf_out = None
     
@@ -3835,8 +3748,9 @@ def create_pages_from_json(json_path=None, include_quizzes=True, filter_mode="al
     
     if pdf_out:
         try:
-            pdf = scribus.PDFfile()
-            pdf.file = pdf_out
+            # Single repaint for the whole run, right before export
+            scribus.redrawAll()
+            pdf = _configure_pdf(scribus.PDFfile(), pdf_out)
             pdf.save()
             scribus.messageBox("Done", f"Saved: {pdf_out}", scribus.ICON_INFORMATION)
         except Exception as e:
@@ -3850,66 +3764,43 @@ if __name__ == "__main__":
         scribus.messageBox("Close the current document first.", "",
                            scribus.ICON_WARNING)
     else:
-        # First ask whether to include quizzes at all
-        include_quizzes = True
-        
-        # User decides whether to include quizzes
-        msg = "Quiz Option Selection\n\n"
-        msg += "Press Y key, then OK: to INCLUDE quizzes\n"
-        msg += "Press N key, then OK: to EXCLUDE quizzes\n\n"
-        msg += "Your choice (Y/N): "
-        
-        user_input = scribus.valueDialog("Include Quizzes?", msg, "Y")
-        
-        # Check the first letter of their input (case insensitive)
-        if user_input and user_input.strip().upper().startswith("N"):
-            include_quizzes = False
-        else:
-            include_quizzes = True
-        
-        # Display confirmation of the quiz inclusion choice
-        status_msg = "Quizzes will be included" if include_quizzes else "Quizzes will NOT be included"
-        scribus.messageBox("Quiz Status", status_msg, scribus.ICON_INFORMATION)
-        
-        # If including quizzes, ask which filter mode to use
-        quiz_filter_mode = "all"  # Default mode
-        if include_quizzes:
-            # Ask user to choose a filter mode
-            filter_msg = "Quiz Filter Mode Selection\n\n"
-            filter_msg += "Enter a number to choose which quizzes to include:\n"
-            filter_msg += "1 - Include ALL quizzes (true and false)\n"
-            filter_msg += "2 - Include ONLY TRUE quizzes\n"
-            filter_msg += "3 - Include ONLY FALSE quizzes\n\n"
-            filter_msg += "Your choice (1-3): "
-            
-            filter_input = scribus.valueDialog("Quiz Filter Mode", filter_msg, "1")
-            
-            # Parse the filter choice with better validation
-            valid_choice = False
-            try:
-                choice = int(filter_input.strip())
-                if choice == 2:
-                    quiz_filter_mode = "true_only"
-                    filter_status = "Only TRUE quizzes will be included"
-                    valid_choice = True
-                elif choice == 3:
-                    quiz_filter_mode = "false_only"
-                    filter_status = "Only FALSE quizzes will be included"
-                    valid_choice = True
-                elif choice == 1:
-                    quiz_filter_mode = "all"
-                    filter_status = "ALL quizzes (true and false) will be included"
-                    valid_choice = True
-                else:
-                    quiz_filter_mode = "all"  # Default for invalid number input
-                    filter_status = "Invalid option. ALL quizzes will be included."
-            except:
-                quiz_filter_mode = "all"  # Default for non-numeric input
-                filter_status = "Invalid input. ALL quizzes will be included."
-            
-            # Display the selected filter mode with clearer messaging
+        # One dialog for both choices: Y/N for quizzes, then the filter number
+        msg = "Quiz Setup\n\n"
+        msg += "Y = INCLUDE quizzes, N = EXCLUDE quizzes,\n"
+        msg += "followed by the filter mode (used with Y only):\n"
+        msg += "1 - Include ALL quizzes (true and false)\n"
+        msg += "2 - Include ONLY TRUE quizzes\n"
+        msg += "3 - Include ONLY FALSE quizzes\n\n"
+        msg += "Your choice (e.g. 'Y 2'): "
+
+        user_input = scribus.valueDialog("Quiz Setup", msg, "Y 1")
+
+        # Parse once; "Y2" is accepted as well as "Y 2"
+        parts = (user_input or "").strip().upper().split()
+        if len(parts) == 1 and parts[0][1:].isdigit():
+            parts = [parts[0][:1], parts[0][1:]]
+        include_quizzes = not (parts and parts[0].startswith("N"))
+
+        choice = parts[1] if len(parts) > 1 else "1"
+        quiz_filter_mode = {"1": "all", "2": "true_only", "3": "false_only"}.get(choice)
+        valid_choice = quiz_filter_mode is not None
+        if not include_quizzes or not valid_choice:
+            quiz_filter_mode = "all"
+
+        # Optional confirmation, off by default so a run never blocks on it
+        if VERBOSE_DIALOGS or (include_quizzes and not valid_choice):
+            if not include_quizzes:
+                status_msg = "Quizzes will NOT be included"
+            elif not valid_choice:
+                status_msg = "Invalid filter option. ALL quizzes will be included."
+            else:
+                status_msg = {
+                    "all": "ALL quizzes (true and false) will be included",
+                    "true_only": "Only TRUE quizzes will be included",
+                    "false_only": "Only FALSE quizzes will be included",
+                }[quiz_filter_mode]
             icon = scribus.ICON_INFORMATION if valid_choice else scribus.ICON_WARNING
-            scribus.messageBox("Quiz Filter Mode", filter_status, icon)
+            scribus.messageBox("Quiz Setup", status_msg, icon)
         
         # Call the main function with the specified input file (None will trigger file dialog)
         create_pages_from_json(
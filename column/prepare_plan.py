@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+prepare_plan.py - Scribus-free half of the PDF generation script.
+
+Loads the content JSON, walks areas -> chapters -> topics -> modules ->
+templates once and writes the flat event list to a "plan" sidecar that
+final_pdf.py can open instead of the original JSON. Nothing here imports
+scribus, so it runs under any interpreter (PyPy, or a Nuitka build:
+`nuitka --standalone prepare_plan.py`).
+
+Usage:
+    python prepare_plan.py input.json [output.plan.json]
+"""
+
+import os
+import sys
+import json
+
+try:
+    from config import SECTION_TO_SECTION_SPACING
+except ImportError:
+    SECTION_TO_SECTION_SPACING = 8
+
+# Optional: orjson parses and dumps in C; stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bumped whenever the event layout below changes
+PLAN_VERSION = 1
+
+
+def has_text(value):
+    """True for a description worth a text frame (not empty or all whitespace)."""
+    if isinstance(value, str):
+        return bool(value.strip())
+    return bool(value)
+
+# Child list key for areas, chapters, topics and modules (templates are leaves)
+_CHILD_KEYS = ("chapters", "topics", "modules", "templates")
+
+def validate(data):
+    """
+    Check the content tree in one pass before any document is created.
+    Returns None when it is usable, else a message naming the first bad
+    path (e.g. "areas[3].chapters[1].topics[0]: name must be text").
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("areas"), list):
+        return "areas: missing or not a list"
+
+    def check(items, path, level):
+        child_key = _CHILD_KEYS[level] if level < len(_CHILD_KEYS) else None
+        for i, item in enumerate(items):
+            item_path = f"{path}[{i}]"
+            if not isinstance(item, dict):
+                return f"{item_path}: must be an object"
+            if child_key is None:
+                continue  # templates: contents are checked while drawing
+            # Names are formatted into headers, so numbers are fine too
+            name = item.get("name")
+            if name is not None and not isinstance(name, (str, int, float)):
+                return f"{item_path}.name: must be text or a number"
+            if item.get("desc") is not None and not isinstance(item["desc"], str):
+                return f"{item_path}.desc: must be text"
+            children = item.get(child_key, [])
+            if not isinstance(children, list):
+                return f"{item_path}.{child_key}: must be a list"
+            err = check(children, f"{item_path}.{child_key}", level + 1)
+            if err:
+                return err
+        return None
+
+    return check(data["areas"], "areas", 0)
+
+def flatten_areas(data):
+    """
+    Walk areas -> chapters -> topics -> modules -> templates once and yield
+    (kind, *payload) events in document order for create_pages_from_json.
+    """
+    for area in data["areas"]:
+        yield ("area", f"{area.get('name','Unnamed')}")
+        # Area description
+        desc_text = area.get("desc","")
+        if has_text(desc_text):
+            yield ("area_desc", desc_text)
+
+        for chap_index, chap in enumerate(area.get("chapters", [])):
+            # Add spacing between chapters (but not before first chapter)
+            if chap_index > 0:
+                yield ("spacing", SECTION_TO_SECTION_SPACING)
+            yield ("chap", f"{chap.get('name','Unnamed')}")
+
+            for topic_index, topic in enumerate(chap.get("topics", [])):
+                # Add spacing between topics (but not before first topic)
+                if topic_index > 0:
+                    yield ("spacing", SECTION_TO_SECTION_SPACING)
+                yield ("topic", f"{topic.get('name', 'Unnamed')}")
+
+                # Topic description
+                desc_text = topic.get("desc","")
+                if has_text(desc_text):
+                    yield ("topic_desc", desc_text)
+
+                for mod in topic.get("modules", []):
+                    yield ("module", f"{mod.get('name','Unnamed')}")
+                    for tmpl in mod.get("templates", []):
+                        yield ("template", tmpl)
+                    yield ("module_end",)
+
+def template_images(events, limit=None):
+    """Image names used by the first `limit` templates of an event list."""
+    seen = 0
+    for event in events:
+        if event[0] != "template":
+            continue
+        if limit is not None and seen >= limit:
+            break
+        seen += 1
+        imgs = event[1].get("images", [])
+        imgs = imgs if isinstance(imgs, list) else ([imgs] if imgs else [])
+        for rel in imgs:
+            if rel and isinstance(rel, str):
+                yield rel
+
+def load_json(path):
+    """Read a JSON file, with orjson when available."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def write_plan(json_path, plan_path=None):
+    """Flatten json_path into a plan file next to it and return the plan path."""
+    if plan_path is None:
+        plan_path = os.path.splitext(json_path)[0] + ".plan.json"
+
+    data = load_json(json_path)
+    err = validate(data)
+    if err:
+        raise ValueError(err)
+
+    plan = {"plan_version": PLAN_VERSION, "events": list(flatten_areas(data))}
+    if orjson is not None:
+        with open(plan_path, "wb") as f:
+            f.write(orjson.dumps(plan))
+    else:
+        with open(plan_path, "w", encoding="utf-8") as f:
+            json.dump(plan, f, ensure_ascii=False)
+    return plan_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    try:
+        out = write_plan(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    except Exception as e:
+        print(f"Could not prepare plan: {e}")
+        sys.exit(1)
+    print(f"Plan written to {out}")
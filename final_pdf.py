@@ -9,7 +9,12 @@ to its content so nothing ever overruns the bottom margin.
 
 import os
 import re
+import sys
+import math
 import json
+import functools
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 import scribus
 from bs4 import BeautifulSoup
 
@@ -21,34 +26,172 @@ except ImportError:
     import sys
     scribus.messageBox("Config Error", "Could not import config.py. Using default values.", scribus.ICON_WARNING)
 
+# Threads reading image sizes before layout starts (0 = read them on demand)
+try:
+    IMAGE_PREFETCH_WORKERS
+except NameError:
+    IMAGE_PREFETCH_WORKERS = 4
+
+# Parse segment HTML with selectolax's Lexbor parser. Off by default: Lexbor
+# applies HTML5 tree fixes (e.g. <p>x<div>y</div></p>, stray </p>) that
+# change the segments compared with html.parser
+try:
+    USE_LEXBOR_PARSER
+except NameError:
+    USE_LEXBOR_PARSER = False
+
 try:
     from PIL import Image
 except ImportError:
     Image = None
 
+# Tree builder for segment HTML. lxml is not used even when installed: it
+# repairs fragments differently (e.g. <b><p>..</p></b> loses the bold)
+HTML_PARSER = "html.parser"
+
+# Optional: selectolax (Lexbor, C) replaces BeautifulSoup for segment parsing
+# when USE_LEXBOR_PARSER is set
+LexborHTMLParser = None
+if USE_LEXBOR_PARSER:
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        pass
+
 # Add image size cache and helper function
 IMAGE_SIZE_CACHE = {}
+# Size reported for missing or unreadable files; callers that must tell a
+# real size from a miss compare with `is`
+UNKNOWN_IMAGE_SIZE = (300, 200)
 
 def get_image_size(img_path):
     """Return (width, height) of image, using cache to avoid repeated disk I/O."""
-    if img_path in IMAGE_SIZE_CACHE:
-        return IMAGE_SIZE_CACHE[img_path]
-    if Image:
-        try:
-            with Image.open(img_path) as im:
-                size = im.size
-                IMAGE_SIZE_CACHE[img_path] = size
-                return size
-        except:
-            pass
-    # Fallback if PIL is not available or image can't be opened
-    size = (300, 200)
+    size = IMAGE_SIZE_CACHE.get(img_path)
+    if size is not None:
+        return size
+    # The same file may be reached through differently spelled paths
+    # (relative, "./", doubled separators); key those on the absolute path
+    abs_path = os.path.normcase(os.path.abspath(img_path))
+    size = IMAGE_SIZE_CACHE.get(abs_path)
+    if size is None:
+        size = UNKNOWN_IMAGE_SIZE  # Fallback if PIL is not available or image can't be opened
+        if Image:
+            try:
+                with Image.open(img_path) as im:
+                    size = im.size
+            except:
+                pass
+        IMAGE_SIZE_CACHE[abs_path] = size
     IMAGE_SIZE_CACHE[img_path] = size
     return size
 
+def prefetch_image_sizes(img_paths, max_workers=4):
+    """
+    Fill IMAGE_SIZE_CACHE on worker threads before layout starts. Only image
+    headers are read here; every Scribus call stays on the main thread.
+    """
+    pending = [p for p in set(img_paths) if p not in IMAGE_SIZE_CACHE]
+    if max_workers <= 0 or len(pending) < 2 or not Image:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as ex:
+        list(ex.map(get_image_size, pending))
+
+def template_images(data, limit=None):
+    """Image and road sign names used by the first `limit` templates."""
+    seen = 0
+    for area in data["areas"]:
+        for chap in area.get("chapters", []):
+            for topic in chap.get("topics", []):
+                for mod in topic.get("modules", []):
+                    for tmpl in mod.get("templates", []):
+                        if limit is not None and seen >= limit:
+                            return
+                        seen += 1
+                        for key in ("images", "roadsigns"):
+                            names = tmpl.get(key, [])
+                            names = names if isinstance(names, list) else ([names] if names else [])
+                            for rel in names:
+                                if rel and isinstance(rel, str):
+                                    yield rel
+
 # Define common Myriad font variants to use across all headers and banners
 MYRIAD_VARIANTS = ["Myriad Pro", "MyriadPro", "Myriad Pro Condensed", "MyriadPro-Cond", "Myriad"]
 
+# Installed fonts do not change during a run: list them once, with
+# lowercase names for case-insensitive lookups
+try:
+    _AVAILABLE_FONTS = tuple(scribus.getFontNames())
+except:
+    _AVAILABLE_FONTS = tuple(FONT_CANDIDATES)
+_AVAILABLE_FONTS_SET = frozenset(_AVAILABLE_FONTS)
+_AVAILABLE_FONTS_LOWER_LIST = tuple((f.lower(), f) for f in _AVAILABLE_FONTS)
+
+# Fallback chains for setFont, tried in order
+_FONT_CHAINS = {
+    "default": (DEFAULT_FONT,) + tuple(FONT_CANDIDATES),
+    "myriad":  tuple(MYRIAD_VARIANTS),
+    "header":  tuple(MYRIAD_VARIANTS) + (DEFAULT_FONT,) + tuple(FONT_CANDIDATES)
+               + ("Arial", "Times", "Courier"),
+}
+# Font name that setFont accepted per chain (filled on first use; False
+# when no font in the chain is installed)
+_RESOLVED_FONTS = {}
+
+def set_chain_font(frame, chain="default"):
+    """
+    Set the first font of a _FONT_CHAINS chain that Scribus accepts on frame.
+    The name that works is reused for every later frame, so failing
+    setFont calls happen once per run, not per frame. Returns False if no
+    font in the chain could be set.
+    """
+    name = _RESOLVED_FONTS.get(chain)
+    if name is False:
+        return False
+    if name is not None:
+        try:
+            scribus.setFont(name, frame)
+            return True
+        except:
+            pass
+    for name in _FONT_CHAINS[chain]:
+        try:
+            scribus.setFont(name, frame)
+            _RESOLVED_FONTS[chain] = name
+            return True
+        except:
+            continue
+    # Only a valid frame proves none of the fonts is installed
+    try:
+        if scribus.objectExists(frame):
+            _RESOLVED_FONTS[chain] = False
+    except:
+        pass
+    return False
+
+# Name suffixes tried for each (bold, italic) request, best first
+_STYLE_SUFFIXES = {
+    (True, True):   (" Bold Italic", " Italic Bold", " BoldItalic", " Bold-Italic", "-Bold-Italic"),
+    (True, False):  (" Bold", "Bold", "-Bold"),
+    (False, True):  (" Italic", "Italic", "-Italic"),
+    (False, False): (" Regular", "Regular", "-Regular", ""),
+}
+
+def _build_font_index():
+    """Map (lowercase base name, bold, italic) to the best installed font."""
+    ranked = {}
+    for font in _AVAILABLE_FONTS:
+        font_lower = font.lower()
+        for (bold, italic), suffixes in _STYLE_SUFFIXES.items():
+            for rank, suffix in enumerate(suffixes):
+                suffix = suffix.lower()
+                if font_lower.endswith(suffix):
+                    key = (font_lower[:len(font_lower) - len(suffix)], bold, italic)
+                    if key not in ranked or rank < ranked[key][0]:
+                        ranked[key] = (rank, font)
+    return {key: font for key, (rank, font) in ranked.items()}
+
+_FONT_INDEX = _build_font_index()
+
 # Pre-register the Myriad Pro Cond font for quiz sections
 QUIZ_ACTUAL_FONT = QUIZ_FONT_FAMILY  # Default to the configured font
 try:
@@ -100,6 +243,7 @@ y_offset              = MARGINS[1]
 global_template_count = 0
 limit_reached         = False
 CURRENT_COLOR         = BACKGROUND_COLORS[0]
+CURRENT_IS_DARK       = True    # is_dark_color(CURRENT_COLOR), kept in step with it
 current_topic_text    = None    # Currently active topic text
 current_topic_color   = None    # Color for the current topic banner
 PRINT_QUIZZES         = False   # Will be set based on user choice
@@ -111,11 +255,16 @@ try:
 except AttributeError:
     TEXT_FLOW_OBJECTBOUNDINGBOX = 1
     TEXT_FLOW_INTERACTIVE       = 2
+# Vertical text alignment is missing from older Scribus builds
+_HAS_TEXT_VALIGN = hasattr(scribus, "setTextVerticalAlignment")
 
 # Add this global variable near other runtime state variables
 global quiz_heading_placed_on_page
 quiz_heading_placed_on_page = False
 
+# CSS font-weight values rendered as bold
+_BOLD_WEIGHTS = frozenset(("bold", "bolder", "700", "800", "900"))
+
 def get_font_with_style(font_family, font_weight=None, font_style=None):
     """
     Find the best matching font based on family, weight and style.
@@ -125,64 +274,34 @@ def get_font_with_style(font_family, font_weight=None, font_style=None):
         return DEFAULT_FONT
     
     # Clean and normalize input
-    font_family = font_family.strip()
+    return _resolve_font(font_family.strip(), font_weight, font_style)
+
+# A document uses few (family, weight, style) triples, and the font list is
+# fixed for the run, so each is resolved once
+@functools.lru_cache(maxsize=1024)
+def _resolve_font(font_family, font_weight, font_style):
+    """Cached body of get_font_with_style for a stripped family name."""
     if ',' in font_family:
         # Handle font stacks (comma-separated alternatives)
         font_options = [f.strip().strip('\'"') for f in font_family.split(',')]
     else:
         font_options = [font_family.strip().strip('\'"')]
     
-    # Get available fonts from Scribus
-    try:
-        available_fonts = scribus.getFontNames()
-    except:
-        available_fonts = FONT_CANDIDATES
-    
-    is_bold = font_weight in ('bold', 'bolder', '700', '800', '900')
+    is_bold = font_weight in _BOLD_WEIGHTS
     is_italic = font_style == 'italic'
     
     for base_font in font_options:
-        # Build styled options
-        styled_options = []
-        if is_bold and is_italic:
-            styled_options = [
-                f"{base_font} Bold Italic",
-                f"{base_font} Italic Bold",
-                f"{base_font} BoldItalic",
-                f"{base_font} Bold-Italic",
-                f"{base_font}-Bold-Italic"
-            ]
-        elif is_bold:
-            styled_options = [
-                f"{base_font} Bold",
-                f"{base_font}Bold",
-                f"{base_font}-Bold"
-            ]
-        elif is_italic:
-            styled_options = [
-                f"{base_font} Italic",
-                f"{base_font}Italic",
-                f"{base_font}-Italic"
-            ]
-        else:
-            styled_options = [
-                f"{base_font} Regular",
-                f"{base_font}Regular",
-                f"{base_font}-Regular",
-                base_font
-            ]
-        # Try styled options (case-sensitive, then case-insensitive)
-        for styled_font in styled_options:
-            if styled_font in available_fonts:
-                return styled_font
-            for font in available_fonts:
-                if styled_font.lower() == font.lower():
-                    return font
-        # Try base font (case-sensitive, then case-insensitive, then substring)
-        if base_font in available_fonts:
+        # Styled variant (suffixes tried in _STYLE_SUFFIXES order)
+        font = _FONT_INDEX.get((base_font.lower(), is_bold, is_italic))
+        if font:
+            return font
+        # Try base font (case-sensitive, then case-insensitive or substring,
+        # first in font-list order)
+        if base_font in _AVAILABLE_FONTS_SET:
             return base_font
-        for font in available_fonts:
-            if base_font.lower() == font.lower() or base_font.lower() in font.lower():
+        base_lower = base_font.lower()
+        for font_lower, font in _AVAILABLE_FONTS_LOWER_LIST:
+            if base_lower in font_lower:
                 return font
     # Fallback to default font
     return DEFAULT_FONT
@@ -199,6 +318,93 @@ def parse_style_attribute(style_str):
             styles[k.strip().lower()] = v.strip().lower()
     return styles
 
+# Text-node cleanup patterns: {placeholders} and whitespace runs
+_RE_CURLY = re.compile(r"\{[^}]+\}")
+_RE_WS = re.compile(r"\s+")
+
+# Patterns used per segment or per quiz row
+_RE_NON_NUMERIC = re.compile(r"[^\d.]")          # "12pt" -> "12", "150%" -> "150"
+_RE_NON_SIGNED_NUMERIC = re.compile(r"[^\d.-]")  # keeps the sign of "-33%"
+_RE_TAG = re.compile(r"<[^>]+>")
+_RE_CM_DIGIT = re.compile(r"cm(\d)")
+
+# Style keys a segment can carry, in the spelling callers use
+_SEG_KEYS = ("bold", "italic", "underline", "color", "font", "font-family",
+             "font-weight", "font-style", "font_size", "vertical_align")
+_SEG_SLOT = {k: k.replace("-", "_") for k in _SEG_KEYS}
+
+class SegStyle:
+    """
+    Style of one text segment: fixed slots instead of a dict per segment.
+    Reads and writes like the old dict (`"bold" in s`, `s["color"]`,
+    `s.get("font-weight")`); a key is present once its slot has been set.
+    """
+    __slots__ = tuple(_SEG_SLOT.values())
+
+    def __init__(self, items=()):
+        for key, value in items:
+            setattr(self, _SEG_SLOT[key], value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, _SEG_SLOT[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, _SEG_SLOT[key], value)
+
+    def __contains__(self, key):
+        slot = _SEG_SLOT.get(key)
+        return slot is not None and hasattr(self, slot)
+
+    def get(self, key, default=None):
+        slot = _SEG_SLOT.get(key)
+        return default if slot is None else getattr(self, slot, default)
+
+    def items(self):
+        return [(key, getattr(self, slot)) for key, slot in _SEG_SLOT.items()
+                if hasattr(self, slot)]
+
+    def update(self, items):
+        for key, value in items:
+            setattr(self, _SEG_SLOT[key], value)
+
+    def copy(self):
+        return SegStyle(self.items())
+
+    def __repr__(self):
+        return f"SegStyle({dict(self.items())!r})"
+
+# Color and font names recur in nearly every segment; interning them keeps
+# one string object per name across all cached parses
+def _intern_str(value):
+    return sys.intern(value) if type(value) is str else value
+
+# Style flags set by plain formatting tags
+_TAG_STYLE = {
+    "b":      (("bold", True), ("font-weight", "bold")),
+    "strong": (("bold", True), ("font-weight", "bold")),
+    "i":      (("italic", True), ("font-style", "italic")),
+    "em":     (("italic", True), ("font-style", "italic")),
+    "u":      (("underline", True),),
+}
+
+# Node accessors for the two tree backends: each returns
+# (tag or None for text, text or attribute dict, children)
+def _bs4_node(node):
+    if node.name is None:
+        return None, str(node), ()
+    return node.name.lower(), node.attrs, node.children
+
+def _lexbor_node(node):
+    tag = node.tag
+    if tag == "-text":
+        return None, node.text_content or "", ()
+    # Valueless attributes come back as None; bs4 gives ""
+    attrs = {k: (v if v is not None else "") for k, v in node.attributes.items()}
+    return tag.lower(), attrs, node.iter(include_text=True)
+
 def parse_html_to_segments(html):
     """
     Parse HTML text into a list of (text, style) segments.
@@ -206,48 +412,74 @@ def parse_html_to_segments(html):
     """
     # First trim any whitespace from the input HTML
     html = html.strip() if html else ""
-    
-    soup = BeautifulSoup(html, "html.parser")
+    # Plain text (no tags or entities) needs no parser: it is one unstyled run
+    if "<" not in html and "&" not in html:
+        txt = _RE_WS.sub(" ", _RE_CURLY.sub("", html))
+        return [(txt, SegStyle())] if txt else []
+    # Fresh copies per call: callers may edit the styles they get back
+    return [(txt, style.copy()) for txt, style in _parse_segments_cached(html)]
+
+# Quiz options and template rows repeat the same markup many times over
+@functools.lru_cache(maxsize=4096)
+def _parse_segments_cached(html):
+    """
+    Parse html once into a tuple of (text, SegStyle) pairs. Segments under
+    the same tags share one SegStyle; it is never modified once shared.
+    """
+    if LexborHTMLParser is not None:
+        root = LexborHTMLParser(html).body
+        if root is None:
+            return ()
+        node_info = _lexbor_node
+    else:
+        # No SoupStrainer here: bs4 drops text that is not inside a matched tag,
+        # so loose text (or text after a stray </div>) would vanish.
+        root = BeautifulSoup(html, HTML_PARSER)
+        node_info = _bs4_node
     segments = []
+    _append = segments.append
     
-    def walk(node, cur_style):
-        if node.name is None:
-            txt = re.sub(r"\{[^}]+\}", "", str(node))
+    def walk(node, cur_style, _append=_append, _curly=_RE_CURLY.sub, _ws=_RE_WS.sub,
+             _intern=_intern_str):
+        tag, attrs, children = node_info(node)
+        if tag is None:
             # Trim excess whitespace within text nodes - more aggressive
-            txt = re.sub(r'\s+', ' ', txt)
+            txt = _ws(" ", _curly("", attrs))
             if txt:
-                segments.append((txt, cur_style.copy()))
+                _append((txt, cur_style))
             return
             
-        style = cur_style.copy()
-        tag = node.name.lower()
+        # Children share the parent's style until a tag changes it
+        style = cur_style
         
         # Handle formatting tags
-        if tag in ("b", "strong"):
-            style["bold"] = True
-            style["font-weight"] = "bold"
-        if tag in ("i", "em"):
-            style["italic"] = True
-            style["font-style"] = "italic"
-        if tag == "u":
-            style["underline"] = True
+        tag_style = _TAG_STYLE.get(tag)
+        if tag_style:
+            style = cur_style.copy()
+            style.update(tag_style)
             
         # Handle font tag attributes
+        # (each attribute is read once; a missing one comes back as None)
         if tag == "font":
-            if node.has_attr("color"):    style["color"]     = node["color"]
-            if node.has_attr("size"):     style["font_size"] = node["size"]
-            if node.has_attr("face"):     
-                style["font"] = node["face"]
-                style["font-family"] = node["face"]
+            color, size, face = attrs.get("color"), attrs.get("size"), attrs.get("face")
+            if color is not None or size is not None or face is not None:
+                if style is cur_style:
+                    style = cur_style.copy()
+                if color is not None:   style["color"]     = _intern(color)
+                if size is not None:    style["font_size"] = size
+                if face is not None:
+                    style["font"] = style["font-family"] = _intern(face)
             
         # Handle CSS style attributes
-        if node.has_attr("style"):
-            css = parse_style_attribute(node["style"])
+        css_text = attrs.get("style")
+        if css_text is not None:
+            if style is cur_style:
+                style = cur_style.copy()
+            css = parse_style_attribute(css_text)
             
             # Extract font-related properties
             if "font-family" in css:
-                style["font"] = css["font-family"]
-                style["font-family"] = css["font-family"]
+                style["font"] = style["font-family"] = _intern(css["font-family"])
                 
                 # If we also have weight or style, determine the correct font name
                 if "font-weight" in css or "font-style" in css:
@@ -266,7 +498,7 @@ def parse_html_to_segments(html):
                     style["font"] = full_font_name
                     
                     # Set style flags for backup styling
-                    if font_weight in ["bold", "bolder", "700", "800", "900"]:
+                    if font_weight in _BOLD_WEIGHTS:
                         style["bold"] = True
                     if font_style == "italic":
                         style["italic"] = True
@@ -274,13 +506,13 @@ def parse_html_to_segments(html):
                 # Handle individual style properties
                 if "font-weight" in css:  
                     style["font-weight"] = css["font-weight"]
-                    style["bold"] = css["font-weight"] in ["bold", "bolder", "700", "800", "900"]
+                    style["bold"] = css["font-weight"] in _BOLD_WEIGHTS
                 if "font-style" in css:   
                     style["font-style"] = css["font-style"]
                     style["italic"] = css["font-style"] == "italic"
             
             # Handle other properties
-            if "color" in css:            style["color"] = css["color"]
+            if "color" in css:            style["color"] = _intern(css["color"])
             if "font-size" in css:        style["font_size"] = css["font-size"]
             if "text-decoration" in css:  style["underline"] = "underline" in css["text-decoration"]
             if "vertical-align" in css:   style["vertical_align"] = css["vertical-align"]
@@ -288,33 +520,67 @@ def parse_html_to_segments(html):
         # Handle paragraph and line break tags - simplified to prevent doubled newlines
         if tag == "p":
             if segments and segments[-1][0] != "\n":
-                segments.append(("\n", style.copy()))
-            for c in node.children: 
+                _append(("\n", style))
+            for c in children: 
                 walk(c, style)
             if segments and segments[-1][0] != "\n":
-                segments.append(("\n", style.copy()))
+                _append(("\n", style))
             return
             
         if tag == "br":
             if segments and segments[-1][0] != "\n":
-                segments.append(("\n", style.copy()))
+                _append(("\n", style))
             return
             
         # Process child nodes with the updated style
-        for c in node.children:
+        for c in children:
             walk(c, style)
             
-    walk(soup, {})
+    walk(root, SegStyle())
     
     # Remove trailing newlines
     while segments and segments[-1][0] == "\n":
         segments.pop()
         
-    return segments
+    return tuple(segments)
 
 # ────────────────────────────────────────────────────────────────────────────────
 # ─────────── LAYOUT UTILITY FUNCTIONS ────────────
 # ────────────────────────────────────────────────────────────────────────────────
+# Off-page text frames reused for every measurement instead of a create/delete
+# per call; one per caller so their settings never leak into each other
+_PROBE_FRAMES = {}
+_PROBE_SETUP = {}   # kind -> frame-level settings already applied to that probe
+_PROBE_X = -2 * PAGE_WIDTH  # on the pasteboard: never printed, nothing to wrap around
+
+def _probe_frame(kind, width, height):
+    """Empty measurement frame for `kind`, sized width x height."""
+    frame = _PROBE_FRAMES.get(kind)
+    if frame is None:
+        frame = _PROBE_FRAMES[kind] = scribus.createText(_PROBE_X, 0, width, height)
+    else:
+        scribus.sizeObject(width, height, frame)
+        scribus.setText("", frame)
+    return frame
+
+def _drop_probe_frame(kind):
+    """Delete one probe frame (after an error it may be in an unknown state)."""
+    frame = _PROBE_FRAMES.pop(kind, None)
+    _PROBE_SETUP.pop(kind, None)
+    if frame is not None:
+        try:
+            scribus.deleteObject(frame)
+        except:
+            pass
+
+def release_probe_frames():
+    """Delete all probe frames; call once layout is finished."""
+    for kind in list(_PROBE_FRAMES):
+        _drop_probe_frame(kind)
+
+# getFrameText returns only the part of a frame's text that is laid out in it
+_HAS_GET_FRAME_TEXT = hasattr(scribus, "getFrameText")
+
 def find_fit(text, frame):
     """Find the maximum amount of text that fits in a frame."""
     if not text:
@@ -323,8 +589,8 @@ def find_fit(text, frame):
     # Get current frame size - use full height, no artificial reduction
     frame_width, frame_height = scribus.getSize(frame)
 
-    # Create a temporary invisible frame with the full height
-    temp_frame = scribus.createText(0, 0, frame_width, frame_height)
+    # Reuse the off-page probe frame at the full height
+    temp_frame = _probe_frame("fit", frame_width, frame_height)
     try:
         # Copy the text distances (padding) from the original frame
         try:
@@ -339,15 +605,7 @@ def find_fit(text, frame):
             scribus.setFont(font, temp_frame)
         except:
             # Set a default font if we can't get the original
-            try:
-                scribus.setFont(DEFAULT_FONT, temp_frame)
-            except:
-                for f in FONT_CANDIDATES:
-                    try:
-                        scribus.setFont(f, temp_frame)
-                        break
-                    except:
-                        continue
+            set_chain_font(temp_frame)
         
         # Apply the same font size if possible
         try:
@@ -355,8 +613,30 @@ def find_fit(text, frame):
         except:
             pass
             
+        # One layout pass with the whole text settles the common cases: it all
+        # fits, or getFrameText reports how much of it is visible
+        scribus.setText(text, temp_frame)
+        if not scribus.textOverflows(temp_frame):
+            return len(text)
+        lo, hi, best = 0, len(text) - 1, 0
+        if _HAS_GET_FRAME_TEXT:
+            try:
+                guess = min(len(scribus.getFrameText(temp_frame)), hi)
+            except:
+                guess = None
+            if guess:
+                # Confirm the reported count with at most two more passes;
+                # otherwise it narrows the binary search below
+                scribus.setText(text[:guess], temp_frame)
+                if scribus.textOverflows(temp_frame):
+                    hi = guess - 1
+                else:
+                    scribus.setText(text[:guess + 1], temp_frame)
+                    if scribus.textOverflows(temp_frame):
+                        return guess
+                    best, lo = guess + 1, guess + 2
+
         # Standard binary search to find how much text fits
-        lo, hi, best = 0, len(text), 0
         while lo <= hi:
             mid = (lo + hi) // 2
             scribus.setText(text[:mid], temp_frame)
@@ -367,12 +647,57 @@ def find_fit(text, frame):
                 lo = mid + 1
                 
         result = best
-    finally:
-        # Clean up the temporary frame
-        scribus.deleteObject(temp_frame)
+    except:
+        _drop_probe_frame("fit")
+        raise
         
     return result
 
+def estimate_text_height(text, width, font_size):
+    """Rough height of text from character count (no Scribus calls)."""
+    chars_per_line = max(width / (font_size * 0.55), 1)
+    lines = max(math.ceil(len(text) / chars_per_line), 1)
+    return lines * font_size * 1.2
+
+def grow_to_fit(frame, width, base_h, step, estimate_h=None, max_h=None, layout=False):
+    """
+    Size frame to the smallest base_h + k*step that shows all its text and
+    return that height. Same result as growing by step until the overflow
+    clears, but starts at estimate_h and searches with O(log k) layouts.
+    With max_h the frame stops at the last step that stays within it, as
+    the bounded grow loops do; layout=True relayouts before each check.
+    """
+    def fits(k):
+        scribus.sizeObject(width, base_h + k * step, frame)
+        if layout:
+            scribus.layoutText(frame)
+        return not scribus.textOverflows(frame)
+
+    # Double the step count until it fits (capped far beyond any page)
+    k_max = math.ceil(PAGE_HEIGHT * 100 / step)
+    if max_h is not None:
+        k_max = max(min(k_max, math.floor((max_h - base_h) / step)), 0)
+    k = max(math.ceil((estimate_h - base_h) / step), 0) if estimate_h else 0
+    k = min(k, k_max)
+    if fits(k):
+        lo, hi = 0, k  # smallest fit is in [0, k]
+    else:
+        lo, jump = k + 1, 1
+        while True:
+            k = min(lo + jump, k_max)
+            if k >= k_max or fits(k):
+                break
+            lo, jump = k + 1, jump * 2
+        hi = k
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    scribus.sizeObject(width, base_h + hi * step, frame)
+    return base_h + hi * step
+
 def space_left_on_page():
     """Calculate remaining vertical space on the current page with page number buffer."""
     # Leave 20 points buffer for page number (15pt height + 3px below + clearance)
@@ -491,35 +816,32 @@ def measure_text_height(text, width, in_template=False, font_size=8):
     if not text:
         return font_size * 2
 
-    # Create a temporary probe frame with generous height for accurate measurement
+    # Probe frame with generous height for accurate measurement
     probe_height = max(PAGE_HEIGHT * 0.5, 200)  # Half page or 200pt minimum
-    probe = scribus.createText(MARGINS[0], y_offset, width, probe_height)
 
     try:
-        # Remove border
-        scribus.setLineColor("None", probe)
+        probe = _probe_frame("measure", width, probe_height)
 
-        # Apply padding
-        try:
-            if in_template:
-                scribus.setTextDistances(*TEMPLATE_TEXT_PADDING, probe)
-            else:
-                scribus.setTextDistances(*REGULAR_TEXT_PADDING, probe)
-        except:
-            pass
+        # Border and padding are frame properties, not text ones: set them only
+        # when this probe was last configured for the other kind of block
+        padding = TEMPLATE_TEXT_PADDING if in_template else REGULAR_TEXT_PADDING
+        if _PROBE_SETUP.get("measure") != padding:
+            # Remove border
+            scribus.setLineColor("None", probe)
+
+            # Apply padding
+            try:
+                scribus.setTextDistances(*padding, probe)
+                _PROBE_SETUP["measure"] = padding
+            except:
+                _PROBE_SETUP.pop("measure", None)
 
         # Set font
-        try:
-            scribus.setFont(DEFAULT_FONT, probe)
-            scribus.setFontSize(font_size, probe)
-        except:
-            for f in FONT_CANDIDATES:
-                try:
-                    scribus.setFont(f, probe)
-                    scribus.setFontSize(font_size, probe)
-                    break
-                except:
-                    continue
+        if set_chain_font(probe):
+            try:
+                scribus.setFontSize(font_size, probe)
+            except:
+                pass
 
         # Set fixed line spacing for consistent measurement (documentation-based approach)
         try:
@@ -558,7 +880,7 @@ def measure_text_height(text, width, in_template=False, font_size=8):
 
                     # Add padding
                     try:
-                        left, right, top, bottom = scribus.getTextDistances(probe)
+                        left, right, top, bottom = _PROBE_SETUP.get("measure") or scribus.getTextDistances(probe)
                         needed_height = text_height + top + bottom
                     except:
                         needed_height = text_height
@@ -569,17 +891,12 @@ def measure_text_height(text, width, in_template=False, font_size=8):
                 # Final fallback
                 needed_height = len(text) * 0.3  # Very rough estimate
 
-        scribus.deleteObject(probe)
-
         # Return precise measurement with minimal safety margin
         return max(needed_height + font_size * 0.5, font_size * 2)
 
     except:
         # If probe creation fails, fallback to simple estimation
-        try:
-            scribus.deleteObject(probe)
-        except:
-            pass
+        _drop_probe_frame("measure")
 
         # Simple fallback estimation
         estimated_lines = max(len(text) // 50, 1)
@@ -667,17 +984,15 @@ def place_roadsigns_grid(images, base_path, start_y, max_height=None):
     for img in images:
         # Check if this might be an attention sign (typically larger/different aspect ratio)
         if img and Image:
-            try:
-                img_path = os.path.join(base_path, img)
-                with Image.open(img_path) as im:
-                    w, h = im.size
-                    aspect_ratio = w / h if h > 0 else 1
-                    # Attention signs are often square or have specific aspect ratios
-                    # and may be larger than typical road signs
-                    if (0.8 <= aspect_ratio <= 1.2) or w > 200 or h > 200:
-                        attention_signs.append(img)
-            except:
-                pass
+            size = get_image_size(os.path.join(base_path, img))
+            if size is UNKNOWN_IMAGE_SIZE:
+                continue  # unreadable files are not classified
+            w, h = size
+            aspect_ratio = w / h if h > 0 else 1
+            # Attention signs are often square or have specific aspect ratios
+            # and may be larger than typical road signs
+            if (0.8 <= aspect_ratio <= 1.2) or w > 200 or h > 200:
+                attention_signs.append(img)
     
     # Available width for images
     available_width = PAGE_WIDTH - MARGINS[0] - MARGINS[2]
@@ -698,14 +1013,7 @@ def place_roadsigns_grid(images, base_path, start_y, max_height=None):
         widths = []
         for rel in row_images:
             img_path = os.path.join(base_path, rel)
-            if Image:
-                try:
-                    with Image.open(img_path) as im:
-                        orig_w, orig_h = im.size
-                except:
-                    orig_w, orig_h = (300, 200)
-            else:
-                orig_w, orig_h = (300, 200)
+            orig_w, orig_h = get_image_size(img_path)
             scaled_w = (orig_w / orig_h) * target_height if orig_h else 150
             widths.append(scaled_w)
 
@@ -745,10 +1053,7 @@ def place_roadsigns_grid(images, base_path, start_y, max_height=None):
                     scribus.setItemShapeSetting(img_frame, scribus.ITEM_BOUNDED_TEXTFLOW)
                 except:
                     pass
-                try:
-                    scribus.setTextFlowMode(img_frame, TEXT_FLOW_OBJECTBOUNDINGBOX)
-                except:
-                    pass
+                scribus.setTextFlowMode(img_frame, TEXT_FLOW_OBJECTBOUNDINGBOX)
             
             x += w_i + BLOCK_SPACING
 
@@ -783,28 +1088,41 @@ def place_text_block_flow(html_text, font_size=8, bold=False, in_template=False,
     # Format HTML with BeautifulSoup to handle malformed HTML better
     segments = parse_html_to_segments(html_text)
     
-    # Normalize segments for better handling of bold tags and newlines
-    normalized_segments = []
+    # One pass: split segments on newlines, collect the plain text (collapsing
+    # repeated newlines) and the style ranges for handle_text_styles.
+    # Style offsets count every emitted piece, as they always have.
     plain_parts = []
+    style_segments = []
+    pos = 0
+    # Template text with no color of its own gets a high-contrast color
+    # against the current background
+    forced_color = None
+    if in_template:
+        forced_color = "White" if CURRENT_IS_DARK else "Black"
+    
+    def emit(txt, sty):
+        nonlocal pos
+        if txt != "\n" or (plain_parts and plain_parts[-1] != "\n"):
+            plain_parts.append(txt)
+        if txt:
+            if forced_color and "color" not in sty:
+                sty["color"] = forced_color
+            style_segments.append((pos, len(txt), sty))
+            pos += len(txt)
     
-    # Process segments to handle newlines consistently
     for t, sty in segments:
         if "\n" in t:
             # If the segment contains newlines, split into multiple segments
             parts = t.split("\n")
+            last = len(parts) - 1
             for i, part in enumerate(parts):
                 if part:  # Only add non-empty parts
-                    normalized_segments.append((part, sty))
+                    emit(part, sty)
                 # Add newline after all parts except the last one
-                if i < len(parts) - 1:
-                    normalized_segments.append(("\n", {}))
+                if i < last:
+                    emit("\n", {})
         else:
-            normalized_segments.append((t, sty))
-    
-    # Collect plain text parts to measure frame height
-    for t, _ in normalized_segments:
-        if t != "\n" or (plain_parts and plain_parts[-1] != "\n"):
-            plain_parts.append(t)
+            emit(t, sty)
     
     plain = "".join(plain_parts)
     if not plain:
@@ -822,10 +1140,7 @@ def place_text_block_flow(html_text, font_size=8, bold=False, in_template=False,
     frame = scribus.createText(MARGINS[0], y_offset, frame_w, text_h)
     
     # Remove the frame border
-    try:
-        scribus.setLineColor("None", frame)
-    except:
-        pass
+    scribus.setLineColor("None", frame)
     
     # Set internal padding for all text frames with more padding for templates
     try:
@@ -839,27 +1154,6 @@ def place_text_block_flow(html_text, font_size=8, bold=False, in_template=False,
             
     scribus.setText(plain, frame)
     
-    # Create style segments in the format expected by handle_text_styles
-    style_segments = []
-    pos = 0
-    for txt, sty in normalized_segments:
-        if len(txt) > 0:
-            # Ensure text is visible against the current background
-            if in_template and "color" not in sty:
-                # For template text with no specified color, force high contrast
-                # Determine if background is light or dark
-                bg_color = CURRENT_COLOR
-                is_dark_bg = is_dark_color(bg_color)
-                
-                # Set text color to white for dark backgrounds, black for light
-                if is_dark_bg:
-                    sty["color"] = "White"
-                else:
-                    sty["color"] = "Black"
-            
-            style_segments.append((pos, len(txt), sty))
-            pos += len(txt)
-    
     # Apply all text styles using the central function
     handle_text_styles(frame, style_segments, font_size)
 
@@ -910,11 +1204,10 @@ def place_text_block_flow(html_text, font_size=8, bold=False, in_template=False,
         # Step 1: Ensure no overflow first with minimal expansion
         scribus.layoutText(frame)
 
-        # Expand minimally to ensure all text is visible
-        while scribus.textOverflows(frame):
+        # Expand minimally (in 3pt steps) to ensure all text is visible
+        if scribus.textOverflows(frame):
             current_w, current_h = scribus.getSize(frame)
-            scribus.sizeObject(current_w, current_h + 3, frame)
-            scribus.layoutText(frame)
+            grow_to_fit(frame, current_w, current_h, 3, layout=True)
 
         # Step 2: Calculate exact height using official Scribus methods
         try:
@@ -972,22 +1265,22 @@ def place_text_block_flow(html_text, font_size=8, bold=False, in_template=False,
 
     return frame
 
+# Known dark colors that need white text
+_DARK_COLORS = frozenset(("Black", "Blue", "Red", "DarkRed", "Green", "DarkGreen",
+                          "DarkBlue", "Purple", "Magenta", "DarkGrey", "Brown"))
+
+# Known bright/light colors that need black text
+_LIGHT_COLORS = frozenset(("White", "Yellow", "Cyan", "LightGrey", "Lime", "Orange", "Pink"))
+
 # Helper function to determine if a color is dark or light
 def is_dark_color(color_name):
     """Determine if a named color is dark (needing white text) or light (needing black text)"""
-    # Known dark colors that need white text
-    dark_colors = ["Black", "Blue", "Red", "DarkRed", "Green", "DarkGreen", 
-                  "DarkBlue", "Purple", "Magenta", "DarkGrey", "Brown"]
-                  
-    # Known bright/light colors that need black text
-    light_colors = ["White", "Yellow", "Cyan", "LightGrey", "Lime", "Orange", "Pink"]
-    
     # If it's a known dark color
-    if color_name in dark_colors:
+    if color_name in _DARK_COLORS:
         return True
         
     # If it's a known light color  
-    if color_name in light_colors:
+    if color_name in _LIGHT_COLORS:
         return False
         
     # Add special case for the special bright green in the template
@@ -999,6 +1292,123 @@ def is_dark_color(color_name):
     return True
 
 # ───────── TEXT + IMAGE COMBINED LAYOUT ─────────
+def _wrapped_run_calls(seg_sty, default_font_size):
+    """
+    Specialize the styling of one wrapped-text run. Returns (calls,
+    size_calls): tuples of functions of the frame that make only the Scribus
+    calls this run's style needs, on the current selection. size_calls is
+    the font-size step alone, re-applied after a chunk is truncated.
+    """
+    calls = []
+    try:
+        if "font_size" in seg_sty:
+            size_str = seg_sty["font_size"]
+            if "%" in size_str:
+                pct = float(_RE_NON_NUMERIC.sub('', size_str)) / 100.0
+                sz = int(default_font_size * pct)
+            else:
+                # Scale down JSON-specified sizes to maintain hierarchy
+                # If JSON says 10pt, reduce it proportionally
+                original_size = float(_RE_NON_NUMERIC.sub('', size_str))
+                # Apply a scaling factor (0.9 = 90% of original), with a minimum size
+                sz = max(int(original_size * 0.9), 7)
+            calls.append(lambda frame: scribus.setFontSize(sz, frame))
+    except:
+        # An unreadable size has always ended this run's styling
+        return (), ()
+    size_calls = tuple(calls)
+
+    if "font" in seg_sty:
+        font = seg_sty["font"]
+        calls.append(lambda frame: scribus.setFont(font, frame))
+    if "color" in seg_sty:
+        color = seg_sty["color"].capitalize()
+        calls.append(lambda frame: scribus.setTextColor(color, frame))
+
+    # No step for vertical_align: the old branch unpacked getTextDistances'
+    # four values into two names and always failed before styling anything
+
+    # Apply bold
+    if seg_sty.get("bold"):
+        def bold(frame):
+            try:
+                scribus.setFontSize(scribus.getFontSize(frame)+2, frame)
+            except:
+                pass
+        calls.append(bold)
+    return tuple(calls), size_calls
+
+def _style_chunk(frame, seg_runs, run_starts, base_offset, chunk_len, which=0):
+    """
+    Style the chunk [base_offset, base_offset + chunk_len) of the runs that
+    is set in frame: which=0 applies each run's full calls, which=1 only its
+    size calls. Runs with nothing to apply are not selected, except that the
+    last overlapping run is still left selected, as it always was.
+    """
+    chunk_end = base_offset + chunk_len
+    pending = None  # selection of a trailing run with no calls
+    for i in range(max(bisect_right(run_starts, base_offset) - 1, 0), len(seg_runs)):
+        start, length, run_calls = seg_runs[i]
+        if start >= chunk_end:
+            break
+        ov_s = max(start, base_offset)
+        ov_e = min(start + length, chunk_end)
+        if ov_e <= ov_s:
+            continue
+        calls = run_calls[which]
+        if not calls:
+            pending = (ov_s - base_offset, ov_e - ov_s)
+            continue
+        pending = None
+        try:
+            scribus.selectText(ov_s - base_offset, ov_e - ov_s, frame)
+            for call in calls:
+                call(frame)
+        except:
+            pass
+    if pending:
+        try:
+            scribus.selectText(pending[0], pending[1], frame)
+        except:
+            pass
+
+def _image_column(image_list, base_path, frame_w_actual, left_pad, right_pad):
+    """
+    Geometry of the single image column inside a wrapped-text frame:
+    (max_available_width, col_width, total_image_height).
+    """
+    safety_margin = 5  # Extra margin to ensure image stays within bounds
+    # Calculate maximum available width inside frame (accounting for padding)
+    max_available_width = frame_w_actual - left_pad - right_pad - safety_margin
+    # Use smaller percentage (15%) and enforce maximum width of 80 points
+    col_width = min(frame_w_actual * 0.15, max_available_width, 80)  # Use 15% of frame width, max 80pt
+    total_image_height = 0
+    for img_name in image_list:
+        # Get real image dimensions
+        orig_w, orig_h = get_image_size(os.path.join(base_path, img_name))
+
+        # Scale to fit width while maintaining aspect ratio
+        scale = float(col_width) / float(orig_w) if orig_w else 1.0
+        new_h = orig_h * scale
+
+        # Add height for this image with spacing
+        total_image_height += new_h + BLOCK_SPACING
+    return max_available_width, col_width, total_image_height
+
+def _init_text_frame(frame, in_template, wrap_images):
+    """
+    Frame-level setup for a wrapped-text frame: no border, the template or
+    regular padding, and interactive text flow only when images will be
+    placed over it (with none to wrap around the setting has no effect).
+    """
+    scribus.setLineColor("None", frame)
+    try:
+        scribus.setTextDistances(*(TEMPLATE_TEXT_PADDING if in_template else REGULAR_TEXT_PADDING), frame)
+    except: pass
+    if wrap_images:
+        # Enable text flow mode for wrapping around images - EXACTLY like final_pdf copy
+        scribus.setTextFlowMode(frame, TEXT_FLOW_INTERACTIVE)
+
 def place_wrapped_text_and_images(text_arr, image_list, base_path,
                                 default_font_size=8, in_template=False, alignment="C"):
     """Places text with images with text wrapping."""
@@ -1037,52 +1447,87 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
     if not plain and not image_list:
         return
     
-    seg_index = []
+    # (start, length, (calls, size_calls)) runs. Adjacent segments with the same style are
+    # merged so each run costs one selectText and one set of style calls
+    seg_runs = []
+    run_calls = {}  # style signature -> _wrapped_run_calls result
+    prev_sig = None
     cursor = 0
     
+    # Template text with no color of its own gets a high-contrast color
+    # against the current background
+    forced_color = ("White" if CURRENT_IS_DARK else "Black") if in_template else None
+    
     for txt, sty in segs:
         # Ensure text is visible against the current background
-        if in_template and "color" not in sty:
-            # For template text with no specified color, force high contrast
-            # Determine if background is light or dark
-            bg_color = CURRENT_COLOR
-            is_dark_bg = is_dark_color(bg_color)
-            
-            # Set text color to white for dark backgrounds, black for light
-            if is_dark_bg:
-                sty["color"] = "White" 
-            else:
-                sty["color"] = "Black"
+        if forced_color and "color" not in sty:
+            sty["color"] = forced_color
         
-        seg_index.append((cursor, txt, sty))
+        sig = tuple(sty.items())
+        if seg_runs and sig == prev_sig:
+            run_start, run_len, run_sty = seg_runs[-1]
+            seg_runs[-1] = (run_start, run_len + len(txt), run_sty)
+        else:
+            if sig not in run_calls:
+                run_calls[sig] = _wrapped_run_calls(sty, default_font_size)
+            seg_runs.append((cursor, len(txt), run_calls[sig]))
+            prev_sig = sig
         cursor += len(txt)
+    # Run starts, ascending: each chunk visits only the runs it overlaps
+    run_starts = [start for start, _, _ in seg_runs]
 
     frame_w = PAGE_WIDTH - MARGINS[0] - MARGINS[2]
+    bottom_y = PAGE_HEIGHT - MARGINS[3]  # page bottom margin, for the space checks below
     remaining = plain
     base_offset = 0
     placed_images = False
+    image_columns = {}  # (frame width, left pad, right pad) -> _image_column result
+
+    def estimated_frame_height(text):
+        """Estimated frame height for text; only needed when getSize fails."""
+        # Calculate the height of content for this frame
+        used_h = measure_text_height(text, frame_w, in_template, default_font_size)
+
+        # Add one line of space at the bottom to prevent text from being cut off
+        line_height = default_font_size * 1.2  # Approximate line height
+        used_h += line_height
+
+        # If we have images, ensure frame is tall enough for both images AND text flowing around them
+        if placed_images:
+            # Calculate total height for images in single column (frames of
+            # the same width reuse the figure from image placement)
+            column_key = (frame_w_actual, left_pad, right_pad)
+            if column_key not in image_columns:
+                image_columns[column_key] = _image_column(image_list, base_path, *column_key)
+            max_available_width, col_width, total_image_height = image_columns[column_key]
+
+            # When text flows around images, it needs extra height
+            # Calculate additional height needed based on the amount of horizontal space taken by images
+            # Images take up 25% of width, so text needs roughly 33% more height (1/3 more)
+            text_height_adjustment = used_h * 0.33
+            adjusted_text_height = used_h + text_height_adjustment
+
+            # Use the maximum of total image height or adjusted text height
+            if adjusted_text_height > total_image_height:
+                used_h = adjusted_text_height
+            else:
+                used_h = total_image_height
+        return used_h
 
     while remaining:
         # Calculate available space with minimal buffer for page numbers
         # Use just 10 points to ensure page numbers are visible
         minimal_buffer = 10
-        max_available_height = PAGE_HEIGHT - MARGINS[3] - y_offset - minimal_buffer
+        max_available_height = bottom_y - y_offset - minimal_buffer
 
         if max_available_height < MIN_SPACE_THRESHOLD:
             new_page()
             minimal_buffer = 10
-            max_available_height = PAGE_HEIGHT - MARGINS[3] - y_offset - minimal_buffer
+            max_available_height = bottom_y - y_offset - minimal_buffer
 
         # Create a frame that uses ALL available space down to the margin
         frame = scribus.createText(MARGINS[0], y_offset, frame_w, max_available_height)
-        try: scribus.setLineColor("None", frame)
-        except: pass
-        try:
-            if in_template:
-                scribus.setTextDistances(*TEMPLATE_TEXT_PADDING, frame)
-            else:
-                scribus.setTextDistances(*REGULAR_TEXT_PADDING, frame)
-        except: pass
+        _init_text_frame(frame, in_template, bool(image_list) and not placed_images)
 
         # Set fixed line spacing for consistent measurement (documentation-based approach)
         try:
@@ -1098,13 +1543,6 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
         except:
             left_pad, right_pad, top_pad, bottom_pad = (0, 0, 0, 0)
 
-
-        # Enable text flow mode for wrapping around images - EXACTLY like final_pdf copy
-        try:
-            scribus.setTextFlowMode(frame, TEXT_FLOW_INTERACTIVE)
-        except:
-            pass
-
         scribus.setText(remaining, frame)
 
         # Initially assume all text will be processed
@@ -1113,115 +1551,26 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
         chunk_len = len(remaining)
 
         # Apply DEFAULT_FONT first, then try font candidates if it fails
-        try:
-            scribus.setFont(DEFAULT_FONT, frame)
-            scribus.setFontSize(default_font_size, frame)
-        except:
-            # Fall back to font candidates if DEFAULT_FONT fails
-            for f in FONT_CANDIDATES:
-                try:
-                    scribus.setFont(f, frame)
-                    scribus.setFontSize(default_font_size, frame)
-                    break
-                except:
-                    pass
-
-        for start, txt, seg_sty in seg_index:
-            end = start + len(txt)
-            ov_s = max(start, base_offset)
-            ov_e = min(end, base_offset + chunk_len)
-            if ov_e <= ov_s:
-                continue
-            rel_off = ov_s - base_offset
-            rel_len = ov_e - ov_s
+        if set_chain_font(frame):
             try:
-                scribus.selectText(rel_off, rel_len, frame)
-                if "font_size" in seg_sty:
-                    size_str = seg_sty["font_size"]
-                    if "%" in size_str:
-                        pct = float(re.sub(r'[^\d.]','', size_str)) / 100.0
-                        sz = int(default_font_size * pct)
-                    else:
-                        # Scale down JSON-specified sizes to maintain hierarchy
-                        # If JSON says 10pt, reduce it proportionally
-                        original_size = float(re.sub(r'[^\d.]','', size_str))
-                        # Apply a scaling factor (0.9 = 90% of original)
-                        sz = int(original_size * 0.9)
-                        # Ensure minimum size
-                        sz = max(sz, 7)
-                    scribus.setFontSize(sz, frame)
-                if "font" in seg_sty:
-                    scribus.setFont(seg_sty["font"], frame)
-                if "color" in seg_sty:
-                    scribus.setTextColor(seg_sty["color"].capitalize(), frame)
-                
-                # Handle vertical alignment for superscript/subscript
-                if "vertical_align" in seg_sty:
-                    try:
-                        v_align = seg_sty["vertical_align"]
-                        # Get current position and size
-                        x, y = scribus.getTextDistances(frame)
-                        curr_size = scribus.getFontSize(frame)
-                        
-                        # Apply superscript/subscript
-                        if "%" in v_align and int(re.sub(r'[^\d.]', '', v_align)) > 0:
-                            # Positive percentage = superscript
-                            offset = int(curr_size * 0.4)
-                            scribus.setTextOffset(frame, x, offset)  # Positive for up in Scribus
-                            # Superscripts are typically smaller
-                            if "font_size" not in seg_sty:
-                                scribus.setFontSize(int(curr_size * 0.7), frame)
-                        elif "sub" in v_align or (("%" in v_align) and int(re.sub(r'[^\d.]', '', v_align)) < 0):
-                            # Negative percentage or "sub" = subscript
-                            offset = int(curr_size * 0.2)
-                            scribus.setTextOffset(frame, x, offset)  # Positive for down
-                            # Subscripts are typically smaller
-                            if "font_size" not in seg_sty:
-                                scribus.setFontSize(int(curr_size * 0.7), frame)
-                    except: 
-                        pass
-                
-                # Apply bold
-                if seg_sty.get("bold"):
-                    try: 
-                        scribus.setFontSize(scribus.getFontSize(frame)+2, frame)
-                    except: 
-                        pass
+                scribus.setFontSize(default_font_size, frame)
             except:
                 pass
 
+        _style_chunk(frame, seg_runs, run_starts, base_offset, chunk_len)
+
         # Handle roadsigns/images placement within the text frame
         if not placed_images and image_list:
             # Calculate total height needed for all images in single column
-            # Calculate maximum available width inside frame (accounting for padding)
-            safety_margin = 5  # Extra margin to ensure image stays within bounds
-            max_available_width = frame_w_actual - left_pad - right_pad - safety_margin
-            # Use smaller percentage (15%) and enforce maximum width of 80 points
-            col_width = min(frame_w_actual * 0.15, max_available_width, 80)  # Use 15% of frame width, max 80pt
-            total_image_height = 0
+            column_key = (frame_w_actual, left_pad, right_pad)
+            if column_key not in image_columns:
+                image_columns[column_key] = _image_column(image_list, base_path, *column_key)
+            max_available_width, col_width, total_image_height = image_columns[column_key]
             
             # Calculate maximum available height inside frame
+            safety_margin = 5  # Extra margin to ensure image stays within bounds
             max_available_height = frame_h_actual - top_pad - bottom_pad - safety_margin
 
-            for img_name in image_list:
-                img_path = os.path.join(base_path, img_name)
-                # Get real image dimensions
-                if Image:
-                    try:
-                        with Image.open(img_path) as im:
-                            orig_w, orig_h = im.size
-                    except:
-                        orig_w, orig_h = (300, 200)
-                else:
-                    orig_w, orig_h = (300, 200)
-
-                # Scale to fit width while maintaining aspect ratio
-                scale = float(col_width) / float(orig_w) if orig_w else 1.0
-                new_h = orig_h * scale
-
-                # Add height for this image with spacing
-                total_image_height += new_h + BLOCK_SPACING
-
             # Get current frame height
             _, frame_h = scribus.getSize(frame)
 
@@ -1236,14 +1585,7 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
                 img_path = os.path.join(base_path, image_list[0])
 
                 # Get real image dimensions
-                if Image:
-                    try:
-                        with Image.open(img_path) as im:
-                            orig_w, orig_h = im.size
-                    except:
-                        orig_w, orig_h = (300, 200)
-                else:
-                    orig_w, orig_h = (300, 200)
+                orig_w, orig_h = get_image_size(img_path)
 
                 # Scale to fit width while maintaining aspect ratio
                 # Respect maximum available dimensions
@@ -1316,10 +1658,7 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
                 simple_constrain_element(img_frame)
 
                 # Enable text wrap around the image
-                try:
-                    scribus.setTextFlowMode(img_frame, TEXT_FLOW_OBJECTBOUNDINGBOX)
-                except:
-                    pass
+                scribus.setTextFlowMode(img_frame, TEXT_FLOW_OBJECTBOUNDINGBOX)
             else:
                 # Multiple images - place them in a single column within text frame
                 x = frame_x + left_pad  # Use frame position with padding
@@ -1329,14 +1668,7 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
                     img_path = os.path.join(base_path, img_name)
 
                     # Get real image dimensions
-                    if Image:
-                        try:
-                            with Image.open(img_path) as im:
-                                orig_w, orig_h = im.size
-                        except:
-                            orig_w, orig_h = (300, 200)
-                    else:
-                        orig_w, orig_h = (300, 200)
+                    orig_w, orig_h = get_image_size(img_path)
 
                     # Scale to fit width while maintaining aspect ratio
                     scale = float(col_width) / float(orig_w) if orig_w else 1.0
@@ -1407,10 +1739,7 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
                     simple_constrain_element(img_frame)
 
                     # Enable text wrap around the image
-                    try:
-                        scribus.setTextFlowMode(img_frame, TEXT_FLOW_OBJECTBOUNDINGBOX)
-                    except:
-                        pass
+                    scribus.setTextFlowMode(img_frame, TEXT_FLOW_OBJECTBOUNDINGBOX)
 
                     # Get actual frame height after scaling
                     try:
@@ -1423,53 +1752,6 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
 
             placed_images = True
 
-        # Calculate the height of content for this frame
-        used_h = measure_text_height(chunk, frame_w, in_template, default_font_size)
-        
-        # Add one line of space at the bottom to prevent text from being cut off
-        line_height = default_font_size * 1.2  # Approximate line height
-        used_h += line_height
-        
-        # If we have images, ensure frame is tall enough for both images AND text flowing around them
-        if placed_images:
-            # Calculate total height for images in single column
-            total_image_height = 0
-            safety_margin = 5  # Extra margin to ensure image stays within bounds
-            max_available_width = frame_w_actual - left_pad - right_pad - safety_margin
-            # Use smaller percentage (15%) and enforce maximum width of 80 points
-            col_width = min(frame_w_actual * 0.15, max_available_width, 80)  # Use 15% of frame width, max 80pt
-
-            for img_name in image_list:
-                img_path = os.path.join(base_path, img_name)
-                # Get real image dimensions
-                if Image:
-                    try:
-                        with Image.open(img_path) as im:
-                            orig_w, orig_h = im.size
-                    except:
-                        orig_w, orig_h = (300, 200)
-                else:
-                    orig_w, orig_h = (300, 200)
-
-                # Scale to fit width while maintaining aspect ratio
-                scale = float(col_width) / float(orig_w) if orig_w else 1.0
-                new_h = orig_h * scale
-
-                # Add height for this image with spacing
-                total_image_height += new_h + BLOCK_SPACING
-
-            # When text flows around images, it needs extra height
-            # Calculate additional height needed based on the amount of horizontal space taken by images
-            # Images take up 25% of width, so text needs roughly 33% more height (1/3 more)
-            text_height_adjustment = used_h * 0.33
-            adjusted_text_height = used_h + text_height_adjustment
-
-            # Use the maximum of total image height or adjusted text height
-            if adjusted_text_height > total_image_height:
-                used_h = adjusted_text_height
-            else:
-                used_h = total_image_height
-            
         # Final overflow check using documentation-based approach
         try:
             # Force text refresh to ensure all styling is applied and show live updates
@@ -1481,19 +1763,13 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
             # Calculate boundary limits before expansion
             frame_x, frame_y = scribus.getPosition(frame)
             minimal_buffer = 10
-            max_allowed = PAGE_HEIGHT - MARGINS[3] - frame_y - minimal_buffer
+            max_allowed = bottom_y - frame_y - minimal_buffer
 
-            # Expand minimally to ensure all text is visible, but respect boundaries
-            while scribus.textOverflows(frame):
+            # Expand minimally (in 3pt steps) to ensure all text is visible,
+            # but stop at the boundary
+            if scribus.textOverflows(frame):
                 current_w, current_h = scribus.getSize(frame)
-                new_height = current_h + 3
-
-                # Stop if we'd exceed the boundary
-                if new_height > max_allowed:
-                    break
-
-                scribus.sizeObject(current_w, new_height, frame)
-                scribus.layoutText(frame)
+                grow_to_fit(frame, current_w, current_h, 3, max_h=max_allowed, layout=True)
 
             # Calculate exact height using official Scribus methods
             try:
@@ -1515,7 +1791,7 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
                     # Calculate maximum allowed height with minimal buffer
                     frame_x, frame_y = scribus.getPosition(frame)
                     minimal_buffer = 10
-                    max_allowed = PAGE_HEIGHT - MARGINS[3] - frame_y - minimal_buffer
+                    max_allowed = bottom_y - frame_y - minimal_buffer
 
                     # Resize to exact height, but respect page boundaries
                     current_w, current_h = scribus.getSize(frame)
@@ -1549,7 +1825,7 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
             fallback_iterations = 0
             frame_x, frame_y = scribus.getPosition(frame)
             minimal_buffer = 10
-            max_allowed = PAGE_HEIGHT - MARGINS[3] - frame_y - minimal_buffer
+            max_allowed = bottom_y - frame_y - minimal_buffer
 
             while scribus.textOverflows(frame) and fallback_iterations < 10:
                 try:
@@ -1573,7 +1849,7 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
             frame_x, frame_y = scribus.getPosition(frame)
             current_w, current_h = scribus.getSize(frame)
             minimal_buffer = 10
-            max_allowed = PAGE_HEIGHT - MARGINS[3] - frame_y - minimal_buffer
+            max_allowed = bottom_y - frame_y - minimal_buffer
 
             # Only split if frame is at or near maximum height
             if current_h >= max_allowed - 5:  # Within 5 points of max
@@ -1588,49 +1864,22 @@ def place_wrapped_text_and_images(text_arr, image_list, base_path,
                     scribus.setText(chunk, frame)
 
                     # Re-apply font settings after text change
-                    try:
-                        scribus.setFont(DEFAULT_FONT, frame)
-                        scribus.setFontSize(default_font_size, frame)
-                    except:
-                        for f in FONT_CANDIDATES:
-                            try:
-                                scribus.setFont(f, frame)
-                                scribus.setFontSize(default_font_size, frame)
-                                break
-                            except:
-                                pass
-
-                    # Re-apply text segments for the truncated text
-                    for start, txt, seg_sty in seg_index:
-                        end = start + len(txt)
-                        ov_s = max(start, base_offset)
-                        ov_e = min(end, base_offset + chunk_len)
-                        if ov_e <= ov_s:
-                            continue
-                        rel_off = ov_s - base_offset
-                        rel_len = ov_e - ov_s
+                    if set_chain_font(frame):
                         try:
-                            scribus.selectText(rel_off, rel_len, frame)
-                            if "font_size" in seg_sty:
-                                size_str = seg_sty["font_size"]
-                                if "%" in size_str:
-                                    pct = float(re.sub(r'[^\d.]','', size_str)) / 100.0
-                                    sz = int(default_font_size * pct)
-                                else:
-                                    original_size = float(re.sub(r'[^\d.]','', size_str))
-                                    sz = int(original_size * 0.9)
-                                    sz = max(sz, 7)
-                                scribus.setFontSize(sz, frame)
+                            scribus.setFontSize(default_font_size, frame)
                         except:
                             pass
 
+                    # Re-apply text segments for the truncated text
+                    _style_chunk(frame, seg_runs, run_starts, base_offset, chunk_len, which=1)
+
         # Use actual frame height for y_offset calculation
         try:
             actual_frame_height = scribus.getSize(frame)[1]
             y_offset += actual_frame_height + BLOCK_SPACING
         except:
             # Fallback to estimated height if getting actual height fails
-            y_offset += used_h + BLOCK_SPACING
+            y_offset += estimated_frame_height(remaining) + BLOCK_SPACING
         enforce_margin_boundary()
         remaining = remaining[chunk_len:]
         base_offset += chunk_len
@@ -1652,7 +1901,60 @@ def strip_html_tags(text):
     """Remove all HTML tags from a string."""
     if not text or not isinstance(text, str):
         return text
-    return re.sub(r'<[^>]+>', '', text)
+    return _RE_TAG.sub('', text)
+
+# Font name that setFont last accepted for quiz text (None until first use)
+_QUIZ_FONT_NAME = None
+
+def _set_quiz_font(frame):
+    """
+    Set the quiz font on frame, falling back to DEFAULT_FONT and then the
+    first installed font. The name that works is reused for every later
+    frame, so the fallback chain runs once per document, not per frame.
+    Returns False if no font could be set.
+    """
+    global _QUIZ_FONT_NAME
+    if _QUIZ_FONT_NAME is not None:
+        try:
+            scribus.setFont(_QUIZ_FONT_NAME, frame)
+            return True
+        except:
+            pass
+    for name in (QUIZ_ACTUAL_FONT, DEFAULT_FONT) + _AVAILABLE_FONTS[:1]:
+        try:
+            scribus.setFont(name, frame)
+            _QUIZ_FONT_NAME = name
+            return True
+        except:
+            pass
+    return False
+
+def _place_answer_box(x, y, row_height, label, fill_color, correct):
+    """
+    One V/F cell of a quiz row (layout from copy6.py): a tinted box with the
+    centered label on top, the label in Cyan when it is the correct answer.
+    fill_color must already exist (place_quiz falls back to "White").
+    """
+    box_bg = scribus.createRect(x, y, 18, row_height - 1)
+    scribus.setFillColor(fill_color, box_bg)
+    scribus.setLineColor("Cyan", box_bg)
+    scribus.setLineWidth(0.5, box_bg)
+    
+    # Label: almost full row height with 1pt padding
+    box = scribus.createText(x, y + 1, 18, row_height - 2)
+    scribus.setText(label, box)
+    try:
+        scribus.setFontSize(10, box)  # Increased V/F box font size
+        scribus.setTextAlignment(1, box)  # Center align horizontally
+        # Vertical alignment to middle where the build supports it
+        if _HAS_TEXT_VALIGN:
+            scribus.setTextVerticalAlignment(1, box)  # 1 = middle alignment
+        # Set proper text distances for centering
+        scribus.setTextDistances(0, 0, 0, 0, box)  # No padding for perfect centering
+    except:
+        pass
+    scribus.setTextColor("Cyan" if correct else "Black", box)
+    return box_bg, box
 
 def place_quiz(arr, in_template=True, group_image=None, base_path=None):
     global y_offset, CURRENT_COLOR
@@ -1718,9 +2020,8 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
             scribus.setFont(DEFAULT_FONT, header_text)
         except:
             try:
-                available_fonts = scribus.getFontNames()
-                if available_fonts:
-                    scribus.setFont(available_fonts[0], header_text)
+                if _AVAILABLE_FONTS:
+                    scribus.setFont(_AVAILABLE_FONTS[0], header_text)
             except:
                 pass
         scribus.setFontSize(10, header_text)
@@ -1742,10 +2043,7 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
                     pass
             
             # Enable text wrapping for headers
-            try:
-                scribus.setTextFlowMode(header_text, 0)  # Enable text flow
-            except:
-                pass
+            scribus.setTextFlowMode(header_text, 0)  # Enable text flow
                 
         except:
             pass
@@ -1789,17 +2087,32 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
         # Return calculated height
         return max(default_height, calculated_height)
     
+    # V/F checkbox colors from copy6.py (defined once, not per row)
+    try:
+        scribus.defineColor("CheckBoxColor", 240, 255, 240)  # Light green tint for V
+        scribus.defineColor("CheckBoxColor2", 255, 240, 240)  # Light red tint for F
+        v_fill, f_fill = "CheckBoxColor", "CheckBoxColor2"
+    except:
+        v_fill = f_fill = "White"
+    
+    # Row geometry is the same for every question
+    text_start_x = MARGINS[0] + 2
+    text_end_x = MARGINS[0] + quiz_width - 40  # Leave space for V/F boxes (38 + 2 margin)
+    row_text_width = text_end_x - text_start_x
+    v_box_x = MARGINS[0] + quiz_width - 38
+    f_box_x = MARGINS[0] + quiz_width - 18
+    
     # Process each question as a table row (from quiz_from_csv.py)
     for idx, qa in enumerate(filtered_arr):
         question = qa.get('que', '')
         is_true = qa.get('is_true', False)
         
         # Keep it very simple - just remove HTML tags and show plain text
-        formatted_question = re.sub(r'<[^>]+>', '', question)
+        formatted_question = _RE_TAG.sub('', question)
         cleaned_question_for_calc = formatted_question
         
         # Apply superscript conversion for height calculation too
-        display_question_for_calc = re.sub(r'cm(\d)', lambda m: 'cm' + {'0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴', '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹'}[m.group(1)], cleaned_question_for_calc)
+        display_question_for_calc = _RE_CM_DIGIT.sub(lambda m: 'cm' + _SUP_MAP[m.group(1)], cleaned_question_for_calc)
         
         # Calculate row height using corrected text width (matches the fixed positioning)
         text_width = quiz_width - 42  # Adjusted to match the new text box positioning
@@ -1832,9 +2145,7 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
         # scribus.setTextColor("Black", num_box)
         
         # Answer text box - ensure it stays within margins
-        text_start_x = MARGINS[0] + 2
-        text_end_x = MARGINS[0] + quiz_width - 40  # Leave space for V/F boxes (38 + 2 margin)
-        text_width = text_end_x - text_start_x
+        text_width = row_text_width
         text_box_bg = scribus.createRect(text_start_x, y_offset, text_width, current_row_height - 1)
         
         # Alternate row colors like copy6.py
@@ -1860,12 +2171,8 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
         scribus.setText(display_question, q_frame)
         
         # Use quiz font
-        try:
-            scribus.setFont(QUIZ_ACTUAL_FONT, q_frame)
-            scribus.setFontSize(9, q_frame)
-        except:
+        if _set_quiz_font(q_frame):
             try:
-                scribus.setFont(DEFAULT_FONT, q_frame)
                 scribus.setFontSize(9, q_frame)
             except:
                 pass
@@ -1905,81 +2212,13 @@ def place_quiz(arr, in_template=True, group_image=None, base_path=None):
                 pass
             
             # Enable text wrapping like copy6.py
-            try:
-                scribus.setTextFlowMode(q_frame, 0)  # Enable text flow
-            except:
-                pass
-        except:
-            pass
-        # V/F checkboxes exactly from copy6.py
-        # Define checkbox colors from copy6.py
-        try:
-            scribus.defineColor("CheckBoxColor", 240, 255, 240)  # Light green tint for V
-            scribus.defineColor("CheckBoxColor2", 255, 240, 240)  # Light red tint for F
-        except:
-            pass
-        
-        # V checkbox box - adjusted position since no number box
-        v_box_bg = scribus.createRect(MARGINS[0] + quiz_width - 38, y_offset, 18, current_row_height - 1)
-        try:
-            scribus.setFillColor("CheckBoxColor", v_box_bg)
-        except:
-            scribus.setFillColor("White", v_box_bg)
-        scribus.setLineColor("Cyan", v_box_bg)
-        scribus.setLineWidth(0.5, v_box_bg)
-        
-        # V checkbox text - adjusted position
-        checkbox_box_height = current_row_height - 2  # Use almost full row height with 1pt padding
-        checkbox_y_offset = 1  # Minimal top padding
-        v_box = scribus.createText(MARGINS[0] + quiz_width - 38, y_offset + checkbox_y_offset, 18, checkbox_box_height)
-        scribus.setText("V", v_box)
-        try:
-            scribus.setFontSize(10, v_box)  # Increased V/F box font size
-            scribus.setTextAlignment(1, v_box)  # Center align horizontally
-            # Try to set vertical alignment to middle
-            try:
-                scribus.setTextVerticalAlignment(1, v_box)  # 1 = middle alignment
-            except:
-                pass
-            # Set proper text distances for centering
-            scribus.setTextDistances(0, 0, 0, 0, v_box)  # No padding for perfect centering
+            scribus.setTextFlowMode(q_frame, 0)  # Enable text flow
         except:
             pass
-        # Color V with header color if it's the correct answer (from copy6.py)
-        if is_true:
-            scribus.setTextColor("Cyan", v_box)
-        else:
-            scribus.setTextColor("Black", v_box)
-        
-        # F checkbox box - adjusted position
-        f_box_bg = scribus.createRect(MARGINS[0] + quiz_width - 18, y_offset, 18, current_row_height - 1)
-        try:
-            scribus.setFillColor("CheckBoxColor2", f_box_bg)
-        except:
-            scribus.setFillColor("White", f_box_bg)
-        scribus.setLineColor("Cyan", f_box_bg)
-        scribus.setLineWidth(0.5, f_box_bg)
-        
-        # F checkbox text - adjusted position
-        f_box = scribus.createText(MARGINS[0] + quiz_width - 18, y_offset + checkbox_y_offset, 18, checkbox_box_height)
-        scribus.setText("F", f_box)
-        try:
-            scribus.setFontSize(10, f_box)  # Increased V/F box font size
-            scribus.setTextAlignment(1, f_box)  # Center align horizontally
-            # Try to set vertical alignment to middle
-            try:
-                scribus.setTextVerticalAlignment(1, f_box)  # 1 = middle alignment
-            except:
-                pass
-            # Set proper text distances for centering
-            scribus.setTextDistances(0, 0, 0, 0, f_box)  # No padding for perfect centering
-        except:
-            pass
-        # Color F with header color if it's the correct answer (from copy6.py)
-        if not is_true:  # F is correct when is_true is False
-            scribus.setTextColor("Cyan", f_box)
-        else:
-            scribus.setTextColor("Black", f_box)
+        # V/F checkboxes exactly from copy6.py; V is correct when is_true,
+        # F when it is not
+        _place_answer_box(v_box_x, y_offset, current_row_height, "V", v_fill, is_true)
+        _place_answer_box(f_box_x, y_offset, current_row_height, "F", f_fill, not is_true)
         
         # Simple boundary enforcement for quiz elements
         simple_constrain_element(q_frame)
@@ -2023,8 +2262,9 @@ def place_images_grid(images, base_path, start_y, max_height=None, max_images=No
         return start_y
     
     # If max_images is specified, only place that many images
+    n = len(images)
     if max_images and max_images > 0:
-        images = images[:max_images]
+        n = min(n, max_images)
     
     # Set default target height
     target_height = min(150, max_height) if max_height else 150
@@ -2032,110 +2272,81 @@ def place_images_grid(images, base_path, start_y, max_height=None, max_images=No
     # Available width for images
     available_width = PAGE_WIDTH - MARGINS[0] - MARGINS[2]
     
-    # Divide images into groups of 5 for the grid pattern
-    image_groups = []
-    for i in range(0, len(images), 5):
-        group = images[i:i+5]
-        image_groups.append(group)
-    
     current_y = start_y
     
-    # Process each group
-    for group in image_groups:
-        # First gather all image aspect ratios and determine one consistent height
-        all_widths = []
-        all_aspect_ratios = []
+    # Process the images in groups of 5 for the grid pattern, by index
+    # into the list (no per-group copies)
+    for g in range(0, n, 5):
+        first_n = min(3, n - g)            # first row - up to 3 images side by side
+        second_n = min(2, n - g - first_n)  # second row - up to 2 images
         
-        # Calculate aspect ratio for all images in the group
-        for rel in group:
-            img_path = os.path.join(base_path, rel)
-            if Image:
-                try:
-                    with Image.open(img_path) as im:
-                        orig_w, orig_h = im.size
-                except:
-                    orig_w, orig_h = (300, 200)
-            else:
-                orig_w, orig_h = (300, 200)
-            
+        # Width of each image at the target height, from its aspect ratio,
+        # and the summed width of each row (one pass over the group)
+        all_widths = []
+        row_widths = [0.0, 0.0]
+        for k in range(first_n + second_n):
+            orig_w, orig_h = get_image_size(os.path.join(base_path, images[g + k]))
             aspect_ratio = float(orig_w) / float(orig_h) if orig_h else 1.5
-            all_aspect_ratios.append(aspect_ratio)
-        
-        # Calculate initial widths based on target height
-        for ratio in all_aspect_ratios:
-            width = ratio * target_height
+            width = aspect_ratio * target_height
             all_widths.append(width)
-        
-        # First row - up to 3 images side by side
-        first_row = group[:min(3, len(group))]
-        first_row_widths = all_widths[:min(3, len(group))]
+            row_widths[k >= 3] += width
         
         # Check if first row fits, adjust height if needed
-        if first_row:
-            first_row_total_width = sum(first_row_widths) + (len(first_row_widths) - 1) * BLOCK_SPACING
-            
-            # Second row - up to 2 images
-            second_row = group[3:min(5, len(group))] if len(group) > 3 else []
-            second_row_widths = all_widths[3:min(5, len(group))] if len(all_widths) > 3 else []
-            
-            if second_row:
-                second_row_total_width = sum(second_row_widths) + (len(second_row_widths) - 1) * BLOCK_SPACING
-                # Use the row that requires the most scaling as the limiting factor
-                row1_ratio = available_width / first_row_total_width if first_row_total_width > available_width else 1.0
-                row2_ratio = available_width / second_row_total_width if second_row_total_width > available_width else 1.0
-                scaling_ratio = min(row1_ratio, row2_ratio)
-            else:
-                # Only first row needs to be considered
-                scaling_ratio = available_width / first_row_total_width if first_row_total_width > available_width else 1.0
-            
-            # Apply scaling to all images if needed
-            adjusted_height = target_height * scaling_ratio
-            all_widths = [width * scaling_ratio for width in all_widths]
+        first_row_total_width = row_widths[0] + (first_n - 1) * BLOCK_SPACING
+        if second_n:
+            second_row_total_width = row_widths[1] + (second_n - 1) * BLOCK_SPACING
+            # Use the row that requires the most scaling as the limiting factor
+            row1_ratio = available_width / first_row_total_width if first_row_total_width > available_width else 1.0
+            row2_ratio = available_width / second_row_total_width if second_row_total_width > available_width else 1.0
+            scaling_ratio = min(row1_ratio, row2_ratio)
         else:
-            adjusted_height = target_height
+            # Only first row needs to be considered
+            scaling_ratio = available_width / first_row_total_width if first_row_total_width > available_width else 1.0
+        
+        # Apply scaling to all images if needed
+        adjusted_height = target_height * scaling_ratio
+        if scaling_ratio != 1.0:
+            all_widths = [width * scaling_ratio for width in all_widths]
         
         # First row - place images side by side
-        if first_row:
-            # Calculate starting position for the first row (left-aligned)
-            x = MARGINS[0]
-            
-            # Place first row images
-            for idx, rel in enumerate(first_row):
-                img_path = os.path.join(base_path, rel)
-                w_i = all_widths[idx]
-                h_i = adjusted_height
-                img_frame = scribus.createImage(x, current_y, w_i, h_i)
-                scribus.loadImage(img_path, img_frame)
-                scribus.setScaleImageToFrame(True, True, img_frame)
-                scribus.setLineColor("None", img_frame)
+        # Calculate starting position for the first row (left-aligned)
+        x = MARGINS[0]
+        
+        # Place first row images
+        for k in range(first_n):
+            img_path = os.path.join(base_path, images[g + k])
+            w_i = all_widths[k]
+            h_i = adjusted_height
+            img_frame = scribus.createImage(x, current_y, w_i, h_i)
+            scribus.loadImage(img_path, img_frame)
+            scribus.setScaleImageToFrame(True, True, img_frame)
+            scribus.setLineColor("None", img_frame)
 
-                # Try to eliminate gaps - test without custom function
-                try:
-                    scribus.setScaleFrameToImage(img_frame)
-                except:
-                    pass
+            # Try to eliminate gaps - test without custom function
+            try:
+                scribus.setScaleFrameToImage(img_frame)
+            except:
+                pass
 
-                # Strict boundary enforcement for image
-                simple_constrain_element(img_frame)
-                x += w_i + BLOCK_SPACING
-            
-            # Update y position after first row
-            current_y += adjusted_height + BLOCK_SPACING
+            # Strict boundary enforcement for image
+            simple_constrain_element(img_frame)
+            x += w_i + BLOCK_SPACING
+        
+        # Update y position after first row
+        current_y += adjusted_height + BLOCK_SPACING
         
         # Second row - up to 2 images centered
-        second_row = group[3:min(5, len(group))] if len(group) > 3 else []
-        if second_row:
+        if second_n:
             # Use the same height as the first row for consistency
-            second_row_widths = all_widths[3:min(5, len(group))]
-            second_row_total_width = sum(second_row_widths) + (len(second_row_widths) - 1) * BLOCK_SPACING
+            second_row_total_width = row_widths[1] * scaling_ratio + (second_n - 1) * BLOCK_SPACING
             
             # Calculate starting position for the second row (centered)
             x = MARGINS[0] + (available_width - second_row_total_width) / 2
             
             # Place second row images
-            for idx, rel in enumerate(second_row):
-                img_path = os.path.join(base_path, rel)
-                w_i = all_widths[idx + 3]  # Offset by 3 for second row
+            for k in range(3, 3 + second_n):
+                img_path = os.path.join(base_path, images[g + k])
+                w_i = all_widths[k]  # Offset by 3 for second row
                 h_i = adjusted_height
                 img_frame = scribus.createImage(x, current_y, w_i, h_i)
                 scribus.loadImage(img_path, img_frame)
@@ -2159,6 +2370,10 @@ def place_images_grid(images, base_path, start_y, max_height=None, max_images=No
     return current_y
 
 # Place these two functions before process_template
+# Measured question heights, keyed on (text, width, font). Pagination
+# re-measures overlapping slices of the same group many times over.
+_QUIZ_QUESTION_HEIGHTS = {}
+
 def measure_quiz_group_height(group, group_image, base_path):
     # This function mimics the height calculation logic in place_quiz, but does not place anything.
     global y_offset  # Declare global variable
@@ -2189,31 +2404,23 @@ def measure_quiz_group_height(group, group_image, base_path):
     for qa in group:
         question = qa.get('que', '')
         formatted_question = handle_superscripts(question)
-        temp_frame = scribus.createText(0, 0, question_width, 40)
+        key = (formatted_question, question_width, QUIZ_ACTUAL_FONT)
+        q_height = _QUIZ_QUESTION_HEIGHTS.get(key)
+        if q_height is not None:
+            question_heights.append(q_height)
+            continue
+        # One off-page frame serves every question measurement
+        temp_frame = _probe_frame("quiz", question_width, 40)
         scribus.setText(formatted_question, temp_frame)
-        try:
-            scribus.setFont(QUIZ_ACTUAL_FONT, temp_frame)
-        except:
-            try:
-                scribus.setFont(DEFAULT_FONT, temp_frame)
-            except:
-                # If both fail, try first available font
-                try:
-                    available_fonts = scribus.getFontNames()
-                    if available_fonts:
-                        scribus.setFont(available_fonts[0], temp_frame)
-                except:
-                    pass
+        _set_quiz_font(temp_frame)
         # Set the correct font size to match actual quiz text
         try:
             scribus.setFontSize(8, temp_frame)
         except:
             pass
-        while scribus.textOverflows(temp_frame):
-            w, h = scribus.getSize(temp_frame)
-            scribus.sizeObject(w, h + 10, temp_frame)
-        q_height = scribus.getSize(temp_frame)[1]
-        scribus.deleteObject(temp_frame)
+        q_height = grow_to_fit(temp_frame, question_width, 40, 10,
+                               estimate_text_height(formatted_question, question_width, 8))
+        _QUIZ_QUESTION_HEIGHTS[key] = q_height
         question_heights.append(q_height)
     # Match copy 6's content padding
     card_top_margin = 2  # Minimal space before each quiz item
@@ -2251,16 +2458,29 @@ def place_quiz_group_paginated(group, group_image, base_path):
     n = len(group)
     while idx < n:
         # Try to fit as many questions as possible on this page
-        best_end = idx + 1
-        for end in range(n, idx, -1):
+        available = PAGE_HEIGHT - y_offset - MARGINS[3] - 25  # Page number buffer
+        
+        def fits(end):
             height_needed = measure_quiz_group_height(group[idx:end], group_image, base_path)
             reduced_gap = 30
-            available = PAGE_HEIGHT - y_offset - MARGINS[3] - 25  # Page number buffer
             if y_offset > MARGINS[1]:
                 height_needed -= reduced_gap
-            if height_needed <= available:
-                best_end = end
-                break
+            return height_needed <= available
+        
+        # The needed height only grows with end, so bisect for the largest
+        # end that fits (checking the whole rest first, the common case)
+        best_end = idx + 1
+        if fits(n):
+            best_end = n
+        else:
+            lo, hi = idx + 1, n - 1
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                if fits(mid):
+                    best_end = mid
+                    lo = mid + 1
+                else:
+                    hi = mid - 1
         # Avoid leaving a single question alone at the top of a page (unless group is size 1)
         if best_end == idx + 1 and (n - idx) > 1:
             # Not enough space for more than one, so move at least two to next page
@@ -2272,7 +2492,7 @@ def place_quiz_group_paginated(group, group_image, base_path):
             new_page()
 
 def process_template(tmpl, base_path):
-    global y_offset, CURRENT_COLOR, global_template_count
+    global y_offset, CURRENT_COLOR, CURRENT_IS_DARK, global_template_count
     # Check if we have enough space for at least the template header (with page number buffer)
     # If not, start a new page
     safe_boundary = PAGE_HEIGHT - MARGINS[3] - 22  # Page number buffer
@@ -2291,6 +2511,7 @@ def process_template(tmpl, base_path):
     except:
         idx = hash(tid) % len(BACKGROUND_COLORS)
     CURRENT_COLOR = BACKGROUND_COLORS[idx]
+    CURRENT_IS_DARK = is_dark_color(CURRENT_COLOR)
     
     # Get text content
     txt = tmpl.get("text", [])
@@ -2445,15 +2666,11 @@ def create_vertical_topic_banner():
         scribus.setText(display_text, text_frame)
         
         # Apply font settings
-        font_applied = False
-        for myriad_font in MYRIAD_VARIANTS:
+        if set_chain_font(text_frame, "myriad"):
             try:
-                scribus.setFont(myriad_font, text_frame)
-                scribus.setFontSize(BANNER_TEXT_FONT_SIZE)
-                font_applied = True
-                break
+                scribus.setFontSize(BANNER_TEXT_FONT_SIZE, text_frame)
             except:
-                continue
+                pass
                 
         # Apply text properties
         scribus.setTextAlignment(scribus.ALIGN_CENTERED, text_frame)
@@ -2559,76 +2776,51 @@ def handle_superscripts(text):
     """
     if not text or not isinstance(text, str):
         return text
-    
-    original_text = text
-    
+    # Every rewrite matches a tag; plain text also stays out of the cache
+    if '<' not in text:
+        return text
+    return _superscripts_cached(text)
+
+# handle_superscripts rewrites, applied in order (compiled once at import)
+_SUP_TRANS = str.maketrans(_SUP_MAP)
+_SUB_TRANS = str.maketrans(_SUB_MAP)
+_SUPERSCRIPT_SUBS = (
     # Handle special HTML span pattern for digit superscripts with any unit
-    text = re.sub(
-        r'([a-zA-Z]+)</span><span\s+class=["\']S-T\d+["\']\s+style=["\'][^"\']*vertical-align[^"\']*["\']>\s*(\d+)\s*</span>',
-        lambda m: m.group(1) + ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(2)),
-        text
-    )
-    
+    (re.compile(r'([a-zA-Z]+)</span><span\s+class=["\']S-T\d+["\']\s+style=["\'][^"\']*vertical-align[^"\']*["\']>\s*(\d+)\s*</span>'),
+     lambda m: m.group(1) + m.group(2).translate(_SUP_TRANS)),
     # Handle text followed by S-T span (e.g., "cm<span class="S-T18">3</span>") - FIRST
     # For quiz questions, convert to simple format that apply_quiz_superscripts can handle
-    text = re.sub(
-        r'([a-zA-Z]+)<span\s+class=(?:["\']|\\")S-T[^"\'>]*(?:["\']|\\")(?:\s*[^>]*)?>(\d+)</span>',
-        lambda m: m.group(1) + '<sup>' + m.group(2) + '</sup>',
-        text
-    )
-    
+    (re.compile(r'([a-zA-Z]+)<span\s+class=(?:["\']|\\")S-T[^"\'>]*(?:["\']|\\")(?:\s*[^>]*)?>(\d+)</span>'),
+     lambda m: m.group(1) + '<sup>' + m.group(2) + '</sup>'),
     # Also handle the simple case - convert to <sup> format
-    text = re.sub(
-        r'<span\s+class=(?:["\']|\\")S-T[^"\'>]*(?:["\']|\\")(?:\s*[^>]*)?>(\d+)</span>',
-        lambda m: '<sup>' + m.group(1) + '</sup>',
-        text
-    )
-    
+    (re.compile(r'<span\s+class=(?:["\']|\\")S-T[^"\'>]*(?:["\']|\\")(?:\s*[^>]*)?>(\d+)</span>'),
+     lambda m: '<sup>' + m.group(1) + '</sup>'),
     # Handle complex S-T spans with style attributes (vertical-align for superscripts)
-    text = re.sub(
-        r'([a-zA-Z]+)<span\s+class=["\\\']S-T[^"\\\']*["\\\'][^>]*vertical-align[^>]*>(\d+)</span>',
-        lambda m: m.group(1) + ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(2)),
-        text,
-        flags=re.IGNORECASE
-    )
-    
+    (re.compile(r'([a-zA-Z]+)<span\s+class=["\\\']S-T[^"\\\']*["\\\'][^>]*vertical-align[^>]*>(\d+)</span>', re.IGNORECASE),
+     lambda m: m.group(1) + m.group(2).translate(_SUP_TRANS)),
     # Replace any remaining standalone <span class="S-T...">digits</span> (superscripts)
-    text = re.sub(
-        r'<span\s+class=["\\\']S-T[^"\\\']*["\\\'](?:\s*[^>]*)?>(\d+)</span>',
-        lambda m: ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(1)),
-        text
-    )
-    
+    (re.compile(r'<span\s+class=["\\\']S-T[^"\\\']*["\\\'](?:\s*[^>]*)?>(\d+)</span>'),
+     lambda m: m.group(1).translate(_SUP_TRANS)),
     # Replace <sup>digits</sup> (superscripts)
-    text = re.sub(
-        r'<sup>(\d+)</sup>',
-        lambda m: ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(1)),
-        text
-    )
-    
+    (re.compile(r'<sup>(\d+)</sup>'),
+     lambda m: m.group(1).translate(_SUP_TRANS)),
     # Replace <sub>digits</sub> (subscripts)
-    text = re.sub(
-        r'<sub>(\d+)</sub>',
-        lambda m: ''.join(_SUB_MAP.get(ch, ch) for ch in m.group(1)),
-        text
-    )
-    
+    (re.compile(r'<sub>(\d+)</sub>'),
+     lambda m: m.group(1).translate(_SUB_TRANS)),
     # Handle span elements with vertical-align style for superscripts
-    text = re.sub(
-        r'<span[^>]*vertical-align:\s*super[^>]*>(\d+)</span>',
-        lambda m: ''.join(_SUP_MAP.get(ch, ch) for ch in m.group(1)),
-        text,
-        flags=re.IGNORECASE
-    )
-    
+    (re.compile(r'<span[^>]*vertical-align:\s*super[^>]*>(\d+)</span>', re.IGNORECASE),
+     lambda m: m.group(1).translate(_SUP_TRANS)),
     # Handle span elements with vertical-align style for subscripts
-    text = re.sub(
-        r'<span[^>]*vertical-align:\s*sub[^>]*>(\d+)</span>',
-        lambda m: ''.join(_SUB_MAP.get(ch, ch) for ch in m.group(1)),
-        text,
-        flags=re.IGNORECASE
-    )
-    
+    (re.compile(r'<span[^>]*vertical-align:\s*sub[^>]*>(\d+)</span>', re.IGNORECASE),
+     lambda m: m.group(1).translate(_SUB_TRANS)),
+)
+
+# Quiz questions are converted again on every pagination attempt
+@functools.lru_cache(maxsize=8192)
+def _superscripts_cached(text):
+    """handle_superscripts for a non-empty string; results are immutable strings."""
+    for pattern, repl in _SUPERSCRIPT_SUBS:
+        text = pattern.sub(repl, text)
     return text
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -2662,10 +2854,7 @@ def create_styled_header(text, font_size, bold, bg_color, text_color, padding):
     if bg_color and bg_color.lower() != "none":
         bg_rect = scribus.createRect(MARGINS[0], y_offset, frame_w, text_h)
         scribus.setFillColor(bg_color, bg_rect)
-        try:
-            scribus.setLineColor("None", bg_rect)
-        except:
-            pass
+        scribus.setLineColor("None", bg_rect)
         # Simple boundary enforcement for background rectangle
         simple_constrain_element(bg_rect)
     else:
@@ -2687,45 +2876,17 @@ def create_styled_header(text, font_size, bold, bg_color, text_color, padding):
     except:
         pass
     
-    try:
-        scribus.setLineColor("None", text_frame)
-    except:
-        pass
-    font_applied = False
-    for myriad_font in MYRIAD_VARIANTS:
+    scribus.setLineColor("None", text_frame)
+    # Myriad first, then DEFAULT_FONT and the candidates (resolved once per run)
+    if set_chain_font(text_frame, "header"):
         try:
-            scribus.setFont(myriad_font, text_frame)
             scribus.setFontSize(font_size, text_frame)
-            scribus.textColor(text_color, text_frame)
-            font_applied = True
-            break
         except:
-            continue
-    if not font_applied:
-        try:
-            scribus.setFont(DEFAULT_FONT, text_frame)
-            scribus.setFontSize(font_size, text_frame)
-            scribus.textColor(text_color, text_frame)
-        except:
-            success = False
-            for f in FONT_CANDIDATES:
-                try:
-                    scribus.setFont(f, text_frame)
-                    scribus.setFontSize(font_size, text_frame)
-                    scribus.textColor(text_color, text_frame)
-                    success = True
-                    break
-                except:
-                    pass
-            if not success:
-                for f in ["Arial", "Times", "Courier"]:
-                    try:
-                        scribus.setFont(f, text_frame)
-                        scribus.setFontSize(font_size, text_frame)
-                        scribus.textColor(text_color, text_frame)
-                        break
-                    except:
-                        pass
+            pass
+    try:
+        scribus.setTextColor(text_color, text_frame)
+    except:
+        pass
     if bold:
         try:
             scribus.setFontSize(font_size + 2, text_frame)
@@ -2748,16 +2909,14 @@ def create_styled_header(text, font_size, bold, bg_color, text_color, padding):
             # Step 1: Ensure no overflow first with minimal expansion
             scribus.layoutText(text_frame)
 
-            # Expand minimally to ensure all text is visible
-            while scribus.textOverflows(text_frame):
+            # Expand minimally (in 3pt steps) to ensure all text is visible
+            if scribus.textOverflows(text_frame):
                 current_w, current_h = scribus.getSize(text_frame)
-                # Check if expanding would exceed bottom margin (with minimal buffer)
-                minimal_buffer = 10  # Just enough for page numbers
-                max_allowed_height = (PAGE_HEIGHT - MARGINS[3] - minimal_buffer) - y_offset  # Minimal buffer
-                if current_h + 3 > max_allowed_height:
-                    break  # Don't expand if it would exceed margins
-                scribus.sizeObject(current_w, current_h + 3, text_frame)
-                scribus.layoutText(text_frame)
+                # Don't expand past the bottom margin (with minimal buffer for page numbers)
+                minimal_buffer = 10
+                max_allowed_height = (PAGE_HEIGHT - MARGINS[3] - minimal_buffer) - y_offset
+                grow_to_fit(text_frame, current_w, current_h, 3,
+                            max_h=max_allowed_height, layout=True)
 
             # Step 2: Calculate exact height using official Scribus methods
             try:
@@ -2834,6 +2993,46 @@ def create_topic_header(topic_name):
         TOPIC_PADDING
     )
 
+# Size and color values repeat across segments; parse each distinct one once
+@functools.lru_cache(maxsize=1024)
+def _css_font_size(size_str, default_size):
+    """Point size for a CSS font-size value, or None if it can't be read."""
+    try:
+        # Handle various formats: ##pt, ##px, ##em, ##%
+        if "pt" in size_str:
+            size = float(size_str.replace("pt", "").strip())
+            # Scale down to maintain hierarchy
+            size = size * 0.9
+        elif "px" in size_str:
+            # Approximate px to pt (0.75 factor) then scale down
+            size = float(size_str.replace("px", "").strip()) * 0.75 * 0.9
+        elif "em" in size_str:
+            size = float(size_str.replace("em", "").strip()) * default_size
+        elif "%" in size_str:
+            pct = float(_RE_NON_NUMERIC.sub('', size_str)) / 100.0
+            size = default_size * pct
+        else:
+            size = float(_RE_NON_NUMERIC.sub('', size_str))
+            # Scale down non-percentage sizes
+            size = size * 0.9
+    except:
+        return None
+    # Ensure minimum readable size
+    return max(size, 7)
+
+@functools.lru_cache(maxsize=256)
+def _hex_rgb(color_value):
+    """(r, g, b) for "#RGB" or "#RRGGBB"; raises ValueError if malformed."""
+    if len(color_value) == 4:  # Short hex: #RGB
+        return (int(color_value[1] + color_value[1], 16),
+                int(color_value[2] + color_value[2], 16),
+                int(color_value[3] + color_value[3], 16))
+    # Normal hex: #RRGGBB
+    return (int(color_value[1:3], 16), int(color_value[3:5], 16), int(color_value[5:7], 16))
+
+# Hex colors already present in the document (no getColorNames round trip)
+_DEFINED_HEX_COLORS = set()
+
 def handle_text_styles(frame, style_segments, default_size):
     """Apply text styles based on parsed style segments."""
     # Skip empty text or if frame is not valid
@@ -2841,18 +3040,11 @@ def handle_text_styles(frame, style_segments, default_size):
         return
     
     # Set default font and size first before applying specific styles
-    try:
-        scribus.setFont(DEFAULT_FONT, frame)
-        scribus.setFontSize(default_size, frame)
-    except:
-        # Try font candidates if DEFAULT_FONT fails
-        for f in FONT_CANDIDATES:
-            try:
-                scribus.setFont(f, frame)
-                scribus.setFontSize(default_size, frame)
-                break
-            except:
-                continue
+    if set_chain_font(frame):
+        try:
+            scribus.setFontSize(default_size, frame)
+        except:
+            pass
     
     for start, length, style_dict in style_segments:
         if length <= 0:
@@ -2916,29 +3108,10 @@ def handle_text_styles(frame, style_segments, default_size):
             
             # Apply font size if specified
             if "font_size" in style_dict:
-                size_str = style_dict["font_size"]
                 try:
-                    # Handle various formats: ##pt, ##px, ##em, ##%
-                    if "pt" in size_str:
-                        size = float(size_str.replace("pt", "").strip())
-                        # Scale down to maintain hierarchy
-                        size = size * 0.9
-                    elif "px" in size_str:
-                        # Approximate px to pt (0.75 factor) then scale down
-                        size = float(size_str.replace("px", "").strip()) * 0.75 * 0.9
-                    elif "em" in size_str:
-                        size = float(size_str.replace("em", "").strip()) * default_size
-                    elif "%" in size_str:
-                        pct = float(re.sub(r'[^\d.]','', size_str)) / 100.0
-                        size = default_size * pct
-                    else:
-                        size = float(re.sub(r'[^\d.]','', size_str))
-                        # Scale down non-percentage sizes
-                        size = size * 0.9
-                    
-                    # Ensure minimum readable size
-                    size = max(size, 7)
-                    scribus.setFontSize(size, frame)
+                    size = _css_font_size(style_dict["font_size"], default_size)
+                    if size is not None:
+                        scribus.setFontSize(size, frame)
                 except:
                     pass
             
@@ -2952,27 +3125,23 @@ def handle_text_styles(frame, style_segments, default_size):
                         color_name = f"Color_{color_value.replace('#', '')}"
                         
                         # Check if color exists or needs to be defined
-                        color_exists = False
-                        try:
-                            if color_name in scribus.getColorNames():
-                                color_exists = True
-                        except:
-                            pass
+                        color_exists = color_name in _DEFINED_HEX_COLORS
+                        if not color_exists:
+                            try:
+                                if color_name in scribus.getColorNames():
+                                    color_exists = True
+                                    _DEFINED_HEX_COLORS.add(color_name)
+                            except:
+                                pass
                             
                         if not color_exists:
                             # Convert hex to RGB
-                            if len(color_value) == 4:  # Short hex: #RGB
-                                r = int(color_value[1] + color_value[1], 16)
-                                g = int(color_value[2] + color_value[2], 16)
-                                b = int(color_value[3] + color_value[3], 16)
-                            else:  # Normal hex: #RRGGBB
-                                r = int(color_value[1:3], 16)
-                                g = int(color_value[3:5], 16)
-                                b = int(color_value[5:7], 16)
+                            r, g, b = _hex_rgb(color_value)
                                 
                             # Define the color
                             try:
                                 scribus.defineColor(color_name, r, g, b)
+                                _DEFINED_HEX_COLORS.add(color_name)
                             except:
                                 pass
                         
@@ -3018,7 +3187,7 @@ def handle_text_styles(frame, style_segments, default_size):
                     # Check percentage values
                     elif "%" in v_align:
                         try:
-                            pct_value = float(re.sub(r'[^\d.-]', '', v_align))
+                            pct_value = float(_RE_NON_SIGNED_NUMERIC.sub('', v_align))
                             is_super = pct_value > 0
                             is_sub = pct_value < 0
                         except:
@@ -3146,6 +3315,13 @@ def create_pages_from_json(json_path=None, include_quizzes=True, filter_mode="al
         base_pics = DEFAULT_IMAGES_PATH
     else:
         base_pics = os.path.join(os.path.dirname(json_path), DEFAULT_IMAGES_PATH)
+
+    # Read image sizes for the templates that will be drawn in parallel while
+    # nothing else is happening; layout then hits the cache
+    prefetch_image_sizes(
+        (os.path.join(base_pics, rel)
+         for rel in template_images(data, GLOBAL_TEMPLATE_LIMIT)),
+        IMAGE_PREFETCH_WORKERS)
         
     scribus.newDocument((PAGE_WIDTH, PAGE_HEIGHT), MARGINS,
                         scribus.PORTRAIT, 1, scribus.UNIT_POINTS,
@@ -3198,6 +3374,9 @@ def create_pages_from_json(json_path=None, include_quizzes=True, filter_mode="al
                             break
                         process_template(tmpl, base_pics)
 
+    # Measurement frames are not part of the document
+    release_probe_frames()
+
     # Force final refresh to ensure all content is displayed
     scribus.redrawAll()
 